@@ -0,0 +1,147 @@
+"""Concurrent /ask throughput against a local stub LLM.
+
+Drives the real app's async /ask and, for comparison, a sync handler that
+calls ``handle_question`` the way the endpoint used to (FastAPI runs it in
+its 40-thread pool). The stub LLM sleeps ``--latency`` seconds per call, so
+throughput is bounded by how many requests can wait on the LLM at once.
+Runs fully offline with FAISS and HashEmbeddingService.
+
+    python -m benchmarks.ask_load [--latency 2.0] [--concurrency 10 50 100 200]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+
+from codeatlas.app.di import get_agent_orchestrator
+from codeatlas.app.main import app
+from codeatlas.models.repository import Repository
+from codeatlas.schemas.ask import AskRequest, AskResponse
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.intent_router import IntentRouter
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.planner_agent import PlannerAgent
+from codeatlas.services.agents.retrieval_agent import RetrievalAgent
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.parsing.tree_sitter_parser import TreeSitterAstParser
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.faiss_retriever import FaissCodeRetriever
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+from codeatlas.services.retrieval.indexing import CodeIndexService
+
+QUESTIONS = [
+    "Where is the FAISS index persisted?",
+    "Where is the plan cache defined?",
+    "Where are LLM calls rate limited?",
+]
+
+
+def build_orchestrator(source_dir: Path, latency: float) -> tuple[AgentOrchestrator, StubChatModel]:
+    repo = Repository(
+        repo_id="bench",
+        name="bench",
+        url="",
+        root_path=str(source_dir),
+        ingested_at=datetime.now(timezone.utc),
+    )
+    parsed = TreeSitterAstParser().parse_repository(repo)
+    embedder = HashEmbeddingService()
+    retriever = FaissCodeRetriever()
+    CodeIndexService(embedder=embedder, retriever=retriever).index_repository(repo, parsed)
+
+    llm = StubChatModel(latency_seconds=latency)
+    answer_service = AnswerService(retriever=retriever, embedder=embedder, llm=llm)
+    orchestrator = AgentOrchestrator(
+        planner=PlannerAgent(llm=llm),
+        retrieval_agent=RetrievalAgent(answer_service=answer_service),
+        analyst_agent=None,
+        mentor_agent=CodingMentorAgent(answer_service=answer_service, llm=llm),
+        memory_agent=None,
+        intent_router=IntentRouter(),
+    )
+    return orchestrator, llm
+
+
+def sync_app(orchestrator: AgentOrchestrator) -> FastAPI:
+    """The pre-async /ask handler: a plain ``def`` run in FastAPI's threadpool."""
+    baseline = FastAPI()
+
+    @baseline.post("/ask", response_model=AskResponse)
+    def ask(request: AskRequest) -> AskResponse:
+        result = orchestrator.handle_question(request.question, request.repo_id)
+        return AskResponse(
+            answer=result.answer,
+            citations=result.citations,
+            reasoning_steps=result.reasoning_steps,
+        )
+
+    return baseline
+
+
+async def drive(target: FastAPI, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int) -> tuple[int, float]:
+            started = time.perf_counter()
+            response = await client.post(
+                "/ask",
+                json={"repo_id": "bench", "question": f"{QUESTIONS[i % len(QUESTIONS)]} ({i})"},
+                timeout=120,
+            )
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    return {
+        "requests": concurrency,
+        "errors": sum(1 for status, _ in results if status != 200),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(concurrency / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+    }
+
+
+async def run(source_dir: Path, latency: float, levels: list[int]) -> dict:
+    orchestrator, llm = build_orchestrator(source_dir, latency)
+    app.dependency_overrides[get_agent_orchestrator] = lambda: orchestrator
+    baseline = sync_app(orchestrator)
+    try:
+        report = {"llm_latency_seconds": latency, "async": [], "threadpool": []}
+        for concurrency in levels:
+            report["async"].append(await drive(app, concurrency))
+            report["threadpool"].append(await drive(baseline, concurrency))
+        report["llm_calls"] = llm.call_count
+        return report
+    finally:
+        app.dependency_overrides.pop(get_agent_orchestrator, None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source-dir",
+        type=Path,
+        default=Path(__file__).resolve().parents[1] / "codeatlas",
+        help="Directory to index (defaults to this package)",
+    )
+    parser.add_argument("--latency", type=float, default=2.0, help="Stub LLM seconds per call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    print(json.dumps(asyncio.run(run(args.source_dir, args.latency, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
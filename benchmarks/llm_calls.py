@@ -0,0 +1,108 @@
+"""Count LLM calls and vector searches per fast-path /ask request.
+
+Compares the pre-change call sequence (RetrievalAgent.run, then a mentor that
+re-ran AnswerService.answer before its own LLM call) with the current
+retrieval-once fast path. Runs fully offline with StubChatModel and
+HashEmbeddingService.
+
+    python -m benchmarks.llm_calls [--source-dir PATH]
+"""
+
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from codeatlas.models.repository import Repository
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.retrieval_agent import RetrievalAgent
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.parsing.tree_sitter_parser import TreeSitterAstParser
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.faiss_retriever import FaissCodeRetriever
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+from codeatlas.services.retrieval.indexing import CodeIndexService
+from codeatlas.services.retrieval.interfaces import CodeRetriever
+
+QUESTIONS = [
+    "Where is the FAISS index persisted?",
+    "How does the planner build a plan?",
+    "What does the answer service cite?",
+]
+
+
+class CountingRetriever(CodeRetriever):
+    def __init__(self, inner: CodeRetriever) -> None:
+        self._inner = inner
+        self.searches = 0
+
+    def index(self, repo_id, records) -> None:
+        self._inner.index(repo_id, records)
+
+    def search(self, repo_id, query_vector, top_k):
+        self.searches += 1
+        return self._inner.search(repo_id, query_vector, top_k)
+
+
+def _legacy_fast_path(answer_service: AnswerService, llm: StubChatModel, question: str, repo_id: str) -> None:
+    """The call sequence handle_question_fast made before retrieval-only mode."""
+    retrieval = answer_service.answer(repo_id=repo_id, question=question)
+    mentor_goal = f"{question}\n\nRetrieved context:\n{retrieval.answer}"
+    mentor_retrieval = answer_service.answer(repo_id=repo_id, question=mentor_goal, top_k=3)
+    llm.invoke(f"Goal: {mentor_goal}\n\nExisting Code Context:\n{mentor_retrieval.answer}")
+
+
+def run(source_dir: Path) -> dict:
+    repo = Repository(
+        repo_id="bench",
+        name="bench",
+        url="",
+        root_path=str(source_dir),
+        ingested_at=datetime.now(timezone.utc),
+    )
+    parsed = TreeSitterAstParser().parse_repository(repo)
+    embedder = HashEmbeddingService()
+    retriever = CountingRetriever(FaissCodeRetriever())
+    CodeIndexService(embedder=embedder, retriever=retriever).index_repository(repo, parsed)
+
+    llm = StubChatModel()
+    answer_service = AnswerService(retriever=retriever, embedder=embedder, llm=llm)
+    orchestrator = AgentOrchestrator(
+        planner=None,
+        retrieval_agent=RetrievalAgent(answer_service=answer_service),
+        analyst_agent=None,
+        mentor_agent=CodingMentorAgent(answer_service=answer_service, llm=llm),
+        memory_agent=None,
+    )
+
+    def measure(fn) -> dict:
+        llm.call_count = retriever.searches = 0
+        for question in QUESTIONS:
+            fn(question)
+        return {
+            "llm_calls_per_request": llm.call_count / len(QUESTIONS),
+            "searches_per_request": retriever.searches / len(QUESTIONS),
+        }
+
+    return {
+        "requests": len(QUESTIONS),
+        "before": measure(lambda q: _legacy_fast_path(answer_service, llm, q, repo.repo_id)),
+        "after": measure(lambda q: orchestrator.handle_question_fast(q, repo.repo_id)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source-dir",
+        type=Path,
+        default=Path(__file__).resolve().parents[1] / "codeatlas",
+        help="Directory to index (defaults to this package)",
+    )
+    args = parser.parse_args()
+    print(json.dumps(run(args.source_dir), indent=2))
+
+
+if __name__ == "__main__":
+    main()
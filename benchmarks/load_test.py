@@ -0,0 +1,466 @@
+"""Open-loop load test of /ask, /ask/stream, /search and /analyze-repo at a target RPS.
+
+Requests are sent on a fixed (or Poisson) schedule regardless of how fast
+responses come back, so queueing shows up as latency instead of silently
+lowering the offered load. The repo under test is a synthetic git fixture
+served over git's smart HTTP protocol from 127.0.0.1, so /analyze-repo clones
+it like any remote. By default the app runs in-process with the stub LLM and
+stub embedder (see the CODEATLAS_LLM_STUB_* and CODEATLAS_EMBEDDING_STUB_*
+settings, which can be overridden from the environment); pass ``--base-url``
+to load a running server instead (it must be able to reach the fixture).
+
+Reports throughput, error rate, status codes, latency percentiles and a
+latency histogram per endpoint, plus time to first token for /ask/stream.
+In-process, /analyze-repo latency includes the background indexing task.
+
+    python -m benchmarks.load_test [--rps 20] [--duration 30]
+        [--mix ask=3,ask_stream=3,search=4,analyze=0.1] [--arrival poisson]
+        [--llm-latency 1.0] [--llm-distribution lognormal] [--llm-failure-rate 0.01]
+        [--base-url http://localhost:8000] [--output report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+
+from benchmarks.synthetic_repo import generate_repo
+from codeatlas.utils.stats import percentile
+
+ENDPOINTS = ("ask", "ask_stream", "search", "analyze")
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+@dataclass(frozen=True)
+class Outcome:
+    endpoint: str
+    status: int | None
+    seconds: float
+    first_token_seconds: float | None = None
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or self.status is None or self.status >= 400
+
+
+# ---------- local git fixture ----------
+class _GitHttpHandler(BaseHTTPRequestHandler):
+    """Runs ``git http-backend`` (smart HTTP, so shallow clones work) as a CGI."""
+
+    project_root = ""
+
+    def do_GET(self) -> None:
+        self._backend()
+
+    def do_POST(self) -> None:
+        self._backend()
+
+    def _backend(self) -> None:
+        path, _, query = self.path.partition("?")
+        body = self._read_body()
+        env = {
+            **os.environ,
+            "GIT_PROJECT_ROOT": self.project_root,
+            "GIT_HTTP_EXPORT_ALL": "1",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "REQUEST_METHOD": self.command,
+            "CONTENT_TYPE": self.headers.get("Content-Type", ""),
+            "CONTENT_LENGTH": str(len(body)),
+            "REMOTE_ADDR": self.client_address[0],
+            "HTTP_CONTENT_ENCODING": self.headers.get("Content-Encoding", ""),
+            "HTTP_GIT_PROTOCOL": self.headers.get("Git-Protocol", ""),
+        }
+        result = subprocess.run(
+            ["git", "http-backend"], input=body, env=env, capture_output=True, check=False
+        )
+        head, _, payload = result.stdout.replace(b"\r\n", b"\n").partition(b"\n\n")
+        status = 200
+        headers = []
+        for line in head.decode("latin-1").splitlines():
+            name, _, value = line.partition(":")
+            if name.lower() == "status":
+                status = int(value.split()[0])
+            elif name:
+                headers.append((name, value.strip()))
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if size == 0:
+                self.rfile.readline()
+                return b"".join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def log_message(self, format: str, *args) -> None:
+        return None
+
+
+@contextmanager
+def git_fixture(workdir: Path, files: int, seed: int) -> Iterator[tuple[str, list[str]]]:
+    """Serve a synthetic repo; yields its clone URL and questions about its functions."""
+    source = workdir / "fixture-src"
+    synthetic = generate_repo(source, files=files, seed=seed)
+    git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+    subprocess.run([*git, "init", "-q"], cwd=source, check=True)
+    subprocess.run([*git, "add", "-A"], cwd=source, check=True)
+    subprocess.run([*git, "commit", "-qm", "fixture"], cwd=source, check=True)
+    served = workdir / "git"
+    subprocess.run(
+        ["git", "clone", "-q", "--bare", str(source), str(served / "fixture.git")], check=True
+    )
+
+    handler = type("Handler", (_GitHttpHandler,), {"project_root": str(served)})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, name="git fixture", daemon=True)
+    thread.start()
+    rng = random.Random(seed)
+    questions = [
+        f"Where do we {function.description.lower().rstrip('.')}?"
+        for function in rng.sample(synthetic.functions, min(50, len(synthetic.functions)))
+    ]
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/fixture.git", questions
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ---------- requests ----------
+@dataclass(frozen=True)
+class Target:
+    repo_id: str
+    fixture_url: str
+    questions: list[str]
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, index: int, target: Target) -> Outcome:
+    question = target.questions[index % len(target.questions)]
+    started = time.perf_counter()
+    try:
+        if endpoint == "ask_stream":
+            return await _stream(client, question, index, target, started)
+        if endpoint == "ask":
+            # The request number keeps the LLM and plan caches from answering
+            payload = {"repo_id": target.repo_id, "question": f"{question} (#{index})"}
+            response = await client.post("/ask", json=payload)
+        elif endpoint == "search":
+            payload = {"repo_id": target.repo_id, "query": question, "top_k": 5}
+            response = await client.post("/search", json=payload)
+        else:
+            response = await client.post("/analyze-repo", json={"repo_url": target.fixture_url})
+        return Outcome(endpoint, response.status_code, time.perf_counter() - started)
+    except Exception as exc:
+        return Outcome(endpoint, None, time.perf_counter() - started, error=repr(exc))
+
+
+async def _stream(
+    client: httpx.AsyncClient, question: str, index: int, target: Target, started: float
+) -> Outcome:
+    payload = {"repo_id": target.repo_id, "question": f"{question} (#{index})"}
+    first_token = None
+    error = None
+    async with client.stream("POST", "/ask/stream", json=payload) as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:])
+            if event.get("type") == "token" and first_token is None:
+                first_token = time.perf_counter() - started
+            elif event.get("type") == "error":
+                error = event.get("content") or "error event"
+    return Outcome(
+        "ask_stream",
+        response.status_code,
+        time.perf_counter() - started,
+        first_token_seconds=first_token,
+        error=error,
+    )
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    target: Target,
+    mix: dict[str, float],
+    rps: float,
+    duration: float,
+    max_in_flight: int,
+    arrival: str,
+    seed: int,
+) -> dict:
+    rng = random.Random(seed)
+    endpoints, weights = list(mix), list(mix.values())
+    outcomes: list[Outcome] = []
+    in_flight: set[asyncio.Task] = set()
+    dropped = 0
+    max_lag = 0.0
+    scheduled_at = 0.0
+    index = 0
+
+    def finished(task: asyncio.Task) -> None:
+        in_flight.discard(task)
+        outcomes.append(task.result())
+
+    start = time.perf_counter()
+    while scheduled_at < duration:
+        delay = start + scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+        if len(in_flight) >= max_in_flight:
+            dropped += 1
+        else:
+            endpoint = rng.choices(endpoints, weights)[0]
+            task = asyncio.create_task(send(client, endpoint, index, target))
+            in_flight.add(task)
+            task.add_done_callback(finished)
+        index += 1
+        scheduled_at += rng.expovariate(rps) if arrival == "poisson" else 1 / rps
+    if in_flight:
+        await asyncio.wait(set(in_flight))
+    elapsed = time.perf_counter() - start
+
+    failed = sum(outcome.failed for outcome in outcomes)
+    return {
+        "target_rps": rps,
+        "duration_seconds": duration,
+        "elapsed_seconds": round(elapsed, 3),
+        "scheduled": index,
+        "completed": len(outcomes),
+        "dropped_at_max_in_flight": dropped,
+        "max_schedule_lag_ms": round(max_lag * 1000, 1),
+        "throughput_rps": round((len(outcomes) - failed) / elapsed, 2),
+        "error_rate": round(failed / len(outcomes), 4) if outcomes else 0.0,
+        "endpoints": {
+            endpoint: summarize([o for o in outcomes if o.endpoint == endpoint], elapsed)
+            for endpoint in endpoints
+        },
+    }
+
+
+def summarize(outcomes: list[Outcome], elapsed: float) -> dict:
+    if not outcomes:
+        return {"requests": 0}
+    failed = [outcome for outcome in outcomes if outcome.failed]
+    latencies = [outcome.seconds * 1000 for outcome in outcomes if not outcome.failed]
+    statuses: dict[str, int] = {}
+    for outcome in outcomes:
+        key = str(outcome.status) if outcome.status is not None else "transport_error"
+        statuses[key] = statuses.get(key, 0) + 1
+    summary = {
+        "requests": len(outcomes),
+        "errors": len(failed),
+        "error_rate": round(len(failed) / len(outcomes), 4),
+        "status_codes": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": _percentiles(latencies),
+        "histogram_ms": _histogram(latencies),
+        "sample_errors": sorted({outcome.error for outcome in failed if outcome.error})[:5],
+    }
+    first_tokens = [
+        outcome.first_token_seconds * 1000
+        for outcome in outcomes
+        if outcome.first_token_seconds is not None
+    ]
+    if first_tokens:
+        summary["first_token_ms"] = _percentiles(first_tokens)
+    return summary
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    return {
+        "p50": round(percentile(values, 50), 1),
+        "p90": round(percentile(values, 90), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def _histogram(values: list[float]) -> dict[str, int]:
+    """Requests per latency bucket (upper bounds in ms, not cumulative)."""
+    counts = {f"<={bound}": 0 for bound in LATENCY_BUCKETS_MS}
+    counts["+Inf"] = 0
+    for value in values:
+        bound = next((bound for bound in LATENCY_BUCKETS_MS if value <= bound), None)
+        counts[f"<={bound}" if bound is not None else "+Inf"] += 1
+    return counts
+
+
+# ---------- setup ----------
+def parse_mix(raw: str) -> dict[str, float]:
+    mix = {}
+    for item in raw.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}; use {ENDPOINTS}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def configure_stubs(args: argparse.Namespace, workdir: Path) -> None:
+    """Point an in-process app at stub models; variables already set win."""
+    defaults = {
+        "CODEATLAS_LLM_PROVIDER": "stub",
+        "CODEATLAS_EMBEDDING_PROVIDER": "stub",
+        "CODEATLAS_LLM_CACHE": "none",
+        "CODEATLAS_AUTH_ENABLED": "false",
+        "CODEATLAS_LLM_STUB_LATENCY_SECONDS": str(args.llm_latency),
+        "CODEATLAS_LLM_STUB_LATENCY_DISTRIBUTION": args.llm_distribution,
+        "CODEATLAS_LLM_STUB_TOKEN_LATENCY_SECONDS": str(args.llm_token_latency),
+        "CODEATLAS_LLM_STUB_RESPONSE_TOKENS": str(args.llm_response_tokens),
+        "CODEATLAS_LLM_STUB_FAILURE_RATE": str(args.llm_failure_rate),
+        "CODEATLAS_EMBEDDING_STUB_LATENCY_SECONDS": str(args.embed_latency),
+        "CODEATLAS_EMBEDDING_STUB_SECONDS_PER_TEXT": str(args.embed_seconds_per_text),
+        "CODEATLAS_INDEX_DIR": str(workdir / "indexes"),
+        "CODEATLAS_STATE_DIR": str(workdir / "state"),
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+    # Clones go to .codeatlas/repos under the working directory
+    os.chdir(workdir)
+
+
+async def wait_until_indexed(client: httpx.AsyncClient, repo_id: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = await client.post("/search", json={"repo_id": repo_id, "query": "def"})
+        if response.status_code == 200 and response.json()["results"]:
+            return
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"Repo {repo_id} was not indexed within {timeout} s")
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> dict:
+    with git_fixture(workdir, args.fixture_files, args.seed) as (fixture_url, questions):
+        if args.base_url:
+            transport = None
+            base_url = args.base_url
+        else:
+            configure_stubs(args, workdir)
+            from codeatlas.app.main import app
+
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://load-test"
+        headers = {"X-API-Key": args.api_key} if args.api_key else {}
+        limits = httpx.Limits(max_connections=args.max_in_flight)
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url=base_url,
+            headers=headers,
+            limits=limits,
+            timeout=args.timeout,
+        ) as client:
+            response = await client.post("/analyze-repo", json={"repo_url": fixture_url})
+            response.raise_for_status()
+            repo_id = response.json()["repository_id"]
+            await wait_until_indexed(client, repo_id, args.timeout)
+            target = Target(repo_id=repo_id, fixture_url=fixture_url, questions=questions)
+            report = await drive(
+                client,
+                target,
+                args.mix,
+                args.rps,
+                args.duration,
+                args.max_in_flight,
+                args.arrival,
+                args.seed,
+            )
+    report["target"] = args.base_url or "in-process"
+    report["mix"] = args.mix
+    report["arrival"] = args.arrival
+    if not args.base_url:
+        report["stubs"] = {
+            name: value
+            for name, value in sorted(os.environ.items())
+            if name.startswith(("CODEATLAS_LLM_STUB_", "CODEATLAS_EMBEDDING_STUB_"))
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=20.0, help="offered requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("ask=3,ask_stream=3,search=4,analyze=0.1"),
+        help="endpoint weights, e.g. ask=1,search=1",
+    )
+    parser.add_argument("--arrival", choices=["uniform", "poisson"], default="poisson")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--fixture-files", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base-url", help="load a running server instead of the in-process app")
+    parser.add_argument("--api-key", help="X-API-Key for servers with auth enabled")
+    stubs = parser.add_argument_group("in-process stub models")
+    stubs.add_argument("--llm-latency", type=float, default=1.0, help="mean seconds per call")
+    stubs.add_argument(
+        "--llm-distribution",
+        choices=["fixed", "uniform", "exponential", "lognormal"],
+        default="lognormal",
+    )
+    stubs.add_argument("--llm-token-latency", type=float, default=0.02)
+    stubs.add_argument("--llm-response-tokens", type=int, default=200)
+    stubs.add_argument("--llm-failure-rate", type=float, default=0.0)
+    stubs.add_argument("--embed-latency", type=float, default=0.005)
+    stubs.add_argument("--embed-seconds-per-text", type=float, default=0.0005)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+    output = args.output.resolve() if args.output else None
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory(prefix="codeatlas-load-") as tmp:
+        cwd = os.getcwd()
+        try:
+            report = asyncio.run(run(args, Path(tmp)))
+        finally:
+            os.chdir(cwd)
+
+    text = json.dumps(report, indent=2)
+    if output:
+        output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    summary = ", ".join(
+        f"{name} p99 {stats.get('latency_ms', {}).get('p99')} ms"
+        for name, stats in report["endpoints"].items()
+    )
+    print(
+        f"{report['throughput_rps']} ok rps at {report['target_rps']} offered, "
+        f"error rate {report['error_rate']}; {summary}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Memory held by ParsedRepository: dataclass lists vs the columnar layout.
+
+Builds a synthetic repo whose paths look like cloned checkouts
+(``.codeatlas/repos/<uuid>/...``) with ~200-char signatures, then measures
+with tracemalloc how much each representation keeps alive once built.
+
+    python -m benchmarks.parsed_repo_memory [--functions 500000] [--functions-per-file 25]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import uuid
+from collections.abc import Iterator
+
+from codeatlas.models.function_node import FunctionNode
+from codeatlas.models.parsed_repository import ParsedRepository, ParsedRepositoryBuilder
+from codeatlas.models.source_file import SourceFile
+
+
+def synthetic_records(root: str, functions: int, per_file: int) -> Iterator[tuple]:
+    """Yield ("file", ...) and ("function", ...) rows with freshly built strings.
+
+    The parser creates new path and signature strings for every node, so the
+    generator does too; otherwise both layouts would share the same objects.
+    """
+    params = ", ".join(f"argument_{i}: Mapping[str, Sequence[int]]" for i in range(5))
+    for index in range(functions):
+        file_index = index // per_file
+        path = f"{root}/src/package_{file_index % 97}/module_{file_index}.py"
+        if index % per_file == 0:
+            yield "file", path, "python", 4096 + file_index
+        name = f"handler_{index}"
+        line = (index % per_file) * 40 + 1
+        signature = f"def {name}(self, {params}) -> dict:"[:200]
+        yield "function", name, path, line, line + 30, signature
+
+
+def measure(build) -> tuple[object, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current, elapsed
+
+
+def build_dataclasses(rows: Iterator[tuple]) -> tuple[list[SourceFile], list[FunctionNode]]:
+    files: list[SourceFile] = []
+    functions: list[FunctionNode] = []
+    for kind, *fields in rows:
+        if kind == "file":
+            files.append(SourceFile(*fields))
+        else:
+            functions.append(FunctionNode(*fields))
+    return files, functions
+
+
+def build_columnar(rows: Iterator[tuple]) -> ParsedRepository:
+    builder = ParsedRepositoryBuilder("bench")
+    for kind, *fields in rows:
+        if kind == "file":
+            builder.add_file(*fields)
+        else:
+            builder.add_function(*fields)
+    return builder.build()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=500_000)
+    parser.add_argument("--functions-per-file", type=int, default=25)
+    args = parser.parse_args()
+
+    root = f"/srv/app/.codeatlas/repos/{uuid.uuid4()}"
+
+    def rows() -> Iterator[tuple]:
+        return synthetic_records(root, args.functions, args.functions_per_file)
+
+    lists, list_bytes, list_seconds = measure(lambda: build_dataclasses(rows()))
+    del lists
+    columnar, columnar_bytes, columnar_seconds = measure(lambda: build_columnar(rows()))
+
+    started = time.perf_counter()
+    scanned = sum(1 for _ in columnar.functions)
+    scan_seconds = time.perf_counter() - started
+
+    print(
+        json.dumps(
+            {
+                "functions": args.functions,
+                "files": len(columnar.files),
+                "dataclass_lists_mb": round(list_bytes / 2**20, 1),
+                "columnar_mb": round(columnar_bytes / 2**20, 1),
+                "reduction": round(list_bytes / max(columnar_bytes, 1), 1),
+                "build_seconds": {
+                    "dataclass_lists": round(list_seconds, 2),
+                    "columnar": round(columnar_seconds, 2),
+                },
+                "full_scan_seconds": round(scan_seconds, 2),
+                "scanned": scanned,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Per-stage timings of the analysis and answer pipeline on a synthetic repo.
+
+Generates a repo with ``benchmarks.synthetic_repo`` and times parse, import
+graph, indexing (HashEmbeddingService + FAISS), FAISS search and
+AnswerService.answer with a stub LLM. Each stage reports throughput, p50/p99
+latency and the process's peak RSS after the stage, as JSON, so runs on
+different commits can be compared with ``--compare``. Runs fully offline.
+
+    python -m benchmarks.pipeline [--files 500] [--functions-per-file 10]
+        [--languages python javascript] [--repeats 3] [--queries 200]
+        [--output results.json] [--compare baseline.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.synthetic_repo import LANGUAGES, generate_repo
+from codeatlas.models.repository import Repository
+from codeatlas.services.dependency.import_graph_builder import ImportGraphBuilder
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.parsing.tree_sitter_parser import TreeSitterAstParser
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.faiss_retriever import FaissCodeRetriever
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+from codeatlas.services.retrieval.indexing import CodeIndexService
+from codeatlas.utils.stats import percentile
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def time_stage(
+    name: str, runs: int, work: Callable[[int], object], units_per_run: int, unit: str
+) -> dict:
+    """Call ``work(i)`` ``runs`` times; throughput counts ``units_per_run`` per call."""
+    durations = []
+    for index in range(runs):
+        started = time.perf_counter()
+        work(index)
+        durations.append(time.perf_counter() - started)
+    total = sum(durations)
+    result = {
+        "stage": name,
+        "runs": runs,
+        "total_seconds": round(total, 4),
+        "throughput": round(units_per_run * runs / total, 2) if total else None,
+        "throughput_unit": f"{unit}/s",
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(
+        f"{name:>13}: {result['throughput']} {unit}/s, "
+        f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms",
+        file=sys.stderr,
+    )
+    return result
+
+
+def run_suite(
+    root: Path,
+    files: int,
+    functions_per_file: int,
+    languages: tuple[str, ...],
+    repeats: int,
+    queries: int,
+    top_k: int = 5,
+    seed: int = 0,
+) -> dict:
+    synthetic = generate_repo(root, files, functions_per_file, languages, seed=seed)
+    repo = Repository(
+        repo_id="bench",
+        name="bench",
+        url="",
+        root_path=str(root),
+        ingested_at=datetime.now(timezone.utc),
+    )
+    parser = TreeSitterAstParser()
+    graph_builder = ImportGraphBuilder()
+    embedder = HashEmbeddingService()
+    stages = []
+
+    parsed = parser.parse_repository(repo)
+    stages.append(
+        time_stage("parse", repeats, lambda _: parser.parse_repository(repo), files, "files")
+    )
+    stages.append(
+        time_stage(
+            "import_graph",
+            repeats,
+            lambda _: graph_builder.build_import_graph(parsed),
+            files,
+            "files",
+        )
+    )
+
+    records = len(parsed.files) + len(parsed.functions)
+    retrievers: list[FaissCodeRetriever] = []
+
+    def index(_: int) -> None:
+        retriever = FaissCodeRetriever()
+        CodeIndexService(embedder=embedder, retriever=retriever).index_repository(repo, parsed)
+        retrievers[:] = [retriever]
+
+    stages.append(time_stage("index", repeats, index, records, "records"))
+    retriever = retrievers[0]
+
+    rng = random.Random(seed)
+    picks = [rng.choice(synthetic.functions) for _ in range(queries)]
+    questions = [f"Where do we {pick.description.lower()}" for pick in picks]
+    vectors = embedder.embed_texts(questions)
+    stages.append(
+        time_stage(
+            "faiss_search",
+            queries,
+            lambda i: retriever.search("bench", vectors[i], top_k),
+            1,
+            "queries",
+        )
+    )
+
+    answer_service = AnswerService(retriever=retriever, embedder=embedder, llm=StubChatModel())
+    stages.append(
+        time_stage(
+            "answer",
+            queries,
+            lambda i: answer_service.answer("bench", questions[i], top_k),
+            1,
+            "queries",
+        )
+    )
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "files": files,
+            "functions_per_file": functions_per_file,
+            "languages": list(languages),
+            "repeats": repeats,
+            "queries": queries,
+            "top_k": top_k,
+            "seed": seed,
+        },
+        "repo": {
+            "files": len(parsed.files),
+            "functions": len(parsed.functions),
+            "records": records,
+        },
+        "stages": stages,
+    }
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """One line per stage: p50 and throughput relative to ``baseline``."""
+    before = {stage["stage"]: stage for stage in baseline.get("stages", [])}
+    lines = [f"baseline commit {baseline.get('commit')} -> {current.get('commit')}"]
+    for stage in current["stages"]:
+        old = before.get(stage["stage"])
+        if old is None or not old["p50_ms"] or not old["throughput"]:
+            continue
+        lines.append(
+            f"{stage['stage']:>13}: p50 {old['p50_ms']} -> {stage['p50_ms']} ms "
+            f"({stage['p50_ms'] / old['p50_ms']:.2f}x), throughput "
+            f"{old['throughput']} -> {stage['throughput']} "
+            f"({stage['throughput'] / old['throughput']:.2f}x)"
+        )
+    return lines
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--functions-per-file", type=int, default=10)
+    parser.add_argument(
+        "--languages", nargs="+", default=["python", "javascript"], choices=sorted(LANGUAGES)
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="runs of parse/graph/index")
+    parser.add_argument("--queries", type=int, default=200, help="search and answer calls")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory(prefix="codeatlas-bench-") as tmp:
+        report = run_suite(
+            Path(tmp),
+            files=args.files,
+            functions_per_file=args.functions_per_file,
+            languages=tuple(args.languages),
+            repeats=args.repeats,
+            queries=args.queries,
+            top_k=args.top_k,
+            seed=args.seed,
+        )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
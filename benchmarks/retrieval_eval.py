@@ -0,0 +1,166 @@
+"""Compare retrieval configurations on recall@k, nDCG@k, MRR and search latency.
+
+Indexes a local source tree (or a generated synthetic one, whose queries and
+answers come from the function descriptions) once per FAISS index type, then
+scores each configuration on the same batch-embedded queries. A config name
+is an index type, ``flat`` or ``hnsw``, optionally followed by ``+hybrid``
+(BM25 fused with the dense results) and/or ``+rerank`` (AnswerService's
+identifier-overlap reranker over 10 candidates, as /ask does).
+
+    python -m benchmarks.retrieval_eval --repo PATH --queries queries.jsonl
+    python -m benchmarks.retrieval_eval --synthetic 500 [--k 1 5 10]
+        [--configs flat hnsw flat+hybrid flat+rerank] [--ef-search 64]
+        [--embedding hash|sentence] [--output report.json]
+
+See codeatlas/services/eval/retrieval_eval.py for the query-set format.
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.synthetic_repo import generate_repo
+from codeatlas.models.repository import Repository
+from codeatlas.services.eval.retrieval_eval import (
+    EvalCase,
+    RetrievalConfig,
+    dense_search,
+    evaluate_configs,
+    format_table,
+    hybrid_search,
+    load_eval_cases,
+    reranked_search,
+)
+from codeatlas.services.parsing.tree_sitter_parser import TreeSitterAstParser
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.services.retrieval.faiss_retriever import INDEX_TYPES, FaissCodeRetriever
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+from codeatlas.services.retrieval.indexing import CodeIndexService
+from codeatlas.services.retrieval.lexical import BM25Index
+
+DEFAULT_CONFIGS = ["flat", "hnsw", "flat+hybrid", "flat+rerank", "flat+hybrid+rerank"]
+
+
+def build_configs(
+    names: list[str],
+    root: Path,
+    embedder: EmbeddingService,
+    hnsw_m: int,
+    ef_search: int,
+) -> list[RetrievalConfig]:
+    repo = Repository(
+        repo_id="eval",
+        name=root.name,
+        url="",
+        root_path=str(root),
+        ingested_at=datetime.now(timezone.utc),
+    )
+    parsed = TreeSitterAstParser().parse_repository(repo)
+    retrievers: dict[str, FaissCodeRetriever] = {}
+    for index_type in sorted({name.split("+")[0] for name in names}):
+        if index_type not in INDEX_TYPES:
+            raise SystemExit(f"Unknown index type in config: {index_type}")
+        retriever = FaissCodeRetriever(
+            index_type=index_type, hnsw_m=hnsw_m, hnsw_ef_search=ef_search
+        )
+        CodeIndexService(embedder=embedder, retriever=retriever).index_repository(repo, parsed)
+        retrievers[index_type] = retriever
+
+    lexical = BM25Index()
+    if any("+hybrid" in name for name in names):
+        documents, records = CodeIndexService.build_documents(parsed)
+        lexical.index(records, documents)
+
+    configs = []
+    for name in names:
+        index_type, *modifiers = name.split("+")
+        retriever = retrievers[index_type]
+        search = dense_search(retriever, repo.repo_id)
+        if "hybrid" in modifiers:
+            search = hybrid_search(search, lexical)
+        if "rerank" in modifiers:
+            answer_service = AnswerService(retriever=retriever, embedder=embedder)
+            search = reranked_search(search, answer_service.rerank)
+        configs.append(RetrievalConfig(name=name, search=search))
+    return configs
+
+
+def synthetic_cases(root: Path, files: int, queries: int, seed: int) -> list[EvalCase]:
+    """Generate a repo under ``root``; each query paraphrases one function's description."""
+    synthetic = generate_repo(root, files=files, seed=seed)
+    rng = random.Random(seed)
+    cases = []
+    for function in rng.sample(synthetic.functions, min(queries, len(synthetic.functions))):
+        relative = Path(function.path).relative_to(root).as_posix()
+        cases.append(
+            EvalCase(
+                query=f"where do we {function.description.lower().rstrip('.')}",
+                relevant=(f"{relative}:{function.start_line}-{function.end_line}",),
+            )
+        )
+    return cases
+
+
+def make_embedder(name: str) -> EmbeddingService:
+    if name == "sentence":
+        from codeatlas.services.retrieval.sentence_transformer_embedder import (
+            SentenceTransformerEmbeddingService,
+        )
+
+        return SentenceTransformerEmbeddingService()
+    return HashEmbeddingService()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--repo", type=Path, help="local source tree to index")
+    source.add_argument("--synthetic", type=int, metavar="FILES", help="generate a repo")
+    parser.add_argument("--queries", help="JSONL query set (required with --repo)")
+    parser.add_argument("--synthetic-queries", type=int, default=200)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--embedding", choices=["hash", "sentence"], default="hash")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+    if args.repo and not args.queries:
+        parser.error("--repo needs --queries")
+
+    logging.disable(logging.INFO)
+    embedder = make_embedder(args.embedding)
+    with tempfile.TemporaryDirectory(prefix="codeatlas-eval-") as tmp:
+        if args.synthetic:
+            root = Path(tmp)
+            cases = synthetic_cases(root, args.synthetic, args.synthetic_queries, args.seed)
+        else:
+            root = args.repo.resolve()
+            cases = load_eval_cases(args.queries)
+        configs = build_configs(args.configs, root, embedder, args.hnsw_m, args.ef_search)
+        report = evaluate_configs(cases, embedder, configs, tuple(args.k), args.batch_size)
+
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": str(args.repo) if args.repo else f"synthetic:{args.synthetic}",
+        "embedding": args.embedding,
+        "queries": len(cases),
+        **report.to_dict(),
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    print(format_table(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
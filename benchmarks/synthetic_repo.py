@@ -0,0 +1,138 @@
+"""Synthetic source trees of configurable size for benchmarks.
+
+Every function gets a distinctive ``<verb>_<noun>_<index>`` name and a one
+line description, and modules import a few earlier modules, so the parser,
+import graph, index and retrieval all have realistic work to do. The tree
+is deterministic for a given seed.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+
+VERBS = [
+    "load", "parse", "render", "validate", "cache", "fetch", "merge", "compute", "index", "resolve"
+]
+NOUNS = [
+    "config", "user", "session", "graph", "token", "invoice", "report", "schema", "request", "message"
+]
+
+LANGUAGES = {"python": ".py", "javascript": ".js", "typescript": ".ts", "go": ".go"}
+
+
+@dataclass(frozen=True)
+class SyntheticFunction:
+    name: str
+    path: str
+    start_line: int
+    end_line: int
+    description: str
+
+
+@dataclass
+class SyntheticRepo:
+    root: Path
+    files: list[str] = field(default_factory=list)
+    functions: list[SyntheticFunction] = field(default_factory=list)
+
+
+def generate_repo(
+    root: Path,
+    files: int = 200,
+    functions_per_file: int = 10,
+    languages: tuple[str, ...] = ("python", "javascript"),
+    imports_per_file: int = 3,
+    seed: int = 0,
+) -> SyntheticRepo:
+    """Write ``files`` source files under ``root``, cycling through ``languages``."""
+    unknown = [language for language in languages if language not in LANGUAGES]
+    if unknown:
+        raise ValueError(f"Unsupported languages: {unknown}; choose from {sorted(LANGUAGES)}")
+    rng = random.Random(seed)
+    repo = SyntheticRepo(root=root)
+    counter = 0
+    for file_index in range(files):
+        language = languages[file_index % len(languages)]
+        package = f"pkg_{file_index % 20}"
+        path = root / package / f"module_{file_index}{LANGUAGES[language]}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        earlier = [rng.randrange(file_index) for _ in range(min(imports_per_file, file_index))]
+        lines = _header(language, package, file_index, sorted(set(earlier)))
+        for _ in range(functions_per_file):
+            verb, noun = rng.choice(VERBS), rng.choice(NOUNS)
+            name = f"{verb}_{noun}_{counter}"
+            description = (
+                f"{verb.capitalize()} {noun} records for batch {counter} and return the total size."
+            )
+            # Lines as the parser reports them: the definition line to the closing line
+            start = len(lines) + (1 if language == "python" else 2)
+            lines.extend(_function(language, name, description))
+            repo.functions.append(
+                SyntheticFunction(name, str(path), start, len(lines), description)
+            )
+            lines.append("")
+            counter += 1
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        repo.files.append(str(path))
+    return repo
+
+
+def _header(language: str, package: str, file_index: int, imports: list[int]) -> list[str]:
+    if language == "python":
+        return [f'"""Module {file_index} of {package}."""', ""] + [
+            f"import pkg_{target % 20}.module_{target}" for target in imports
+        ] + [""]
+    if language in ("javascript", "typescript"):
+        return [
+            f'import {{ helper{target} }} from "../pkg_{target % 20}/module_{target}";'
+            for target in imports
+        ] + [""]
+    return [f"package {package}", ""]
+
+
+def _function(language: str, name: str, description: str) -> list[str]:
+    camel = name.split("_")[0] + "".join(part.capitalize() for part in name.split("_")[1:])
+    if language == "python":
+        return [
+            f"def {name}(items, limit=10):",
+            f'    """{description}"""',
+            "    total = 0",
+            "    for item in items[:limit]:",
+            "        total += len(str(item))",
+            "    return total",
+        ]
+    if language == "javascript":
+        return [
+            f"// {description}",
+            f"export function {camel}(items, limit = 10) {{",
+            "  let total = 0;",
+            "  for (const item of items.slice(0, limit)) {",
+            "    total += String(item).length;",
+            "  }",
+            "  return total;",
+            "}",
+        ]
+    if language == "typescript":
+        return [
+            f"// {description}",
+            f"export function {camel}(items: unknown[], limit: number = 10): number {{",
+            "  let total = 0;",
+            "  for (const item of items.slice(0, limit)) {",
+            "    total += String(item).length;",
+            "  }",
+            "  return total;",
+            "}",
+        ]
+    exported = camel[0].upper() + camel[1:]
+    return [
+        f"// {exported}: {description}",
+        f"func {exported}(items []string, limit int) int {{",
+        "\ttotal := 0",
+        "\tfor i := 0; i < len(items) && i < limit; i++ {",
+        "\t\ttotal += len(items[i])",
+        "\t}",
+        "\treturn total",
+        "}",
+    ]
@@ -1,7 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from pathlib import Path
 
+from codeatlas.observability.profiling import (
+    MemoryProfiler,
+    RequestProfiler,
+    RequestProfileStore,
+    SamplingProfiler,
+)
+from codeatlas.observability.tracing import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+    SpanExporter,
+)
+from codeatlas.services.agents.intent_router import IntentRouter
 from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.plan_cache import PlanCache
+from codeatlas.services.agents.validation import ValidationPolicy
 from codeatlas.services.agents.planner_agent import PlannerAgent
 from codeatlas.services.agents.retrieval_agent import RetrievalAgent
 from codeatlas.services.agents.repo_analyst_agent import RepoAnalystAgent
@@ -12,16 +27,18 @@ from codeatlas.services.ingestion.git_loader import GitRepositoryLoader
 from codeatlas.services.memory.in_memory_store import InMemoryStore
 from codeatlas.services.memory.interfaces import MemoryStore
 from codeatlas.services.llm.provider import LlmProvider
-from codeatlas.services.memory.json_store import JsonMemoryStore
+from codeatlas.services.memory.sqlite_store import SqliteMemoryStore
 from codeatlas.services.parsing.tree_sitter_parser import TreeSitterAstParser
 from codeatlas.services.qa.explain_service import CodeExplainService
 from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.embedding import EmbeddingService
 from codeatlas.services.retrieval.faiss_retriever import FaissCodeRetriever
 from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
 from codeatlas.services.retrieval.indexing import CodeIndexService
 from codeatlas.services.retrieval.sentence_transformer_embedder import (
     SentenceTransformerEmbeddingService,
 )
+from codeatlas.services.retrieval.stub_embedder import StubEmbeddingService
 from codeatlas.services.state.repo_state_store import RepoStateStore
 from codeatlas.utils.config import AppConfig, load_config
 
@@ -44,14 +61,24 @@ def get_dependency_graph_builder() -> ImportGraphBuilder:
 @lru_cache
 def get_code_retriever() -> FaissCodeRetriever:
     config = get_config()
-    return FaissCodeRetriever(base_dir=config.index_dir)
+    return FaissCodeRetriever(
+        base_dir=config.index_dir,
+        index_type=config.faiss_index_type,
+        hnsw_m=config.faiss_hnsw_m,
+        hnsw_ef_search=config.faiss_hnsw_ef_search,
+    )
 
 
 @lru_cache
-def get_embedder() -> SentenceTransformerEmbeddingService | HashEmbeddingService:
+def get_embedder() -> EmbeddingService:
     config = get_config()
     if config.embedding_provider == "hash":
         return HashEmbeddingService()
+    if config.embedding_provider == "stub":
+        return StubEmbeddingService(
+            latency_seconds=config.embedding_stub_latency_seconds,
+            seconds_per_text=config.embedding_stub_seconds_per_text,
+        )
     return SentenceTransformerEmbeddingService(model_name=config.embedding_model)
 
 
@@ -60,12 +87,24 @@ def get_index_service() -> CodeIndexService:
     return CodeIndexService(embedder=get_embedder(), retriever=get_code_retriever())
 
 
+@lru_cache
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Bounded pool for embedding and FAISS search called from async handlers."""
+    return ThreadPoolExecutor(
+        max_workers=max(1, get_config().cpu_workers), thread_name_prefix="codeatlas-cpu"
+    )
+
+
 @lru_cache
 def get_answer_service() -> AnswerService:
+    config = get_config()
     return AnswerService(
         retriever=get_code_retriever(),
         embedder=get_embedder(),
         llm=get_llm_provider().get_chat_model(),
+        executor=get_cpu_executor(),
+        context_token_budget=config.answer_context_token_budget,
+        context_window_lines=config.answer_context_window_lines,
     )
 
 
@@ -82,8 +121,36 @@ def get_memory_store() -> MemoryStore:
     config = get_config()
     # Ensure state directory exists
     Path(config.state_dir).mkdir(parents=True, exist_ok=True)
-    memory_file = Path(config.state_dir) / "agent_memory.json"
-    return JsonMemoryStore(file_path=str(memory_file))
+    return SqliteMemoryStore(
+        db_path=str(Path(config.state_dir) / "agent_memory.sqlite3"),
+        max_per_scope=config.memory_max_per_scope or None,
+        legacy_json_path=str(Path(config.state_dir) / "agent_memory.json"),
+        embedder=get_embedder(),
+        recall_min_similarity=config.memory_recall_min_similarity,
+    )
+
+
+@lru_cache
+def get_intent_router() -> IntentRouter | None:
+    config = get_config()
+    if not config.planner_router_enabled:
+        return None
+    return IntentRouter(
+        embedder=get_embedder(), min_confidence=config.planner_router_min_confidence
+    )
+
+
+@lru_cache
+def get_plan_cache() -> PlanCache | None:
+    config = get_config()
+    if config.plan_cache_max_entries <= 0:
+        return None
+    return PlanCache(
+        max_entries=config.plan_cache_max_entries,
+        ttl_seconds=config.plan_cache_ttl_seconds or None,
+        embedder=get_embedder(),
+        similarity_threshold=config.plan_cache_similarity_threshold,
+    )
 
 
 @lru_cache
@@ -95,9 +162,14 @@ def get_agent_orchestrator() -> AgentOrchestrator:
     
     planner = PlannerAgent(llm=llm)
     retrieval_agent = RetrievalAgent(answer_service=answer_service)
-    analyst_agent = RepoAnalystAgent(state_store=repo_state_store, llm=llm)
+    analyst_agent = RepoAnalystAgent(
+        state_store=repo_state_store, llm=llm, executor=get_cpu_executor()
+    )
     mentor_agent = CodingMentorAgent(answer_service=answer_service, llm=llm)
-    memory_agent = MemoryAgent(memory_store=memory_store)
+    config = get_config()
+    memory_agent = MemoryAgent(
+        memory_store=memory_store, page_size=config.memory_list_page_size
+    )
     
     return AgentOrchestrator(
         planner=planner,
@@ -106,6 +178,18 @@ def get_agent_orchestrator() -> AgentOrchestrator:
         mentor_agent=mentor_agent,
         memory_agent=memory_agent,
         memory_store=memory_store,
+        max_parallel_steps=config.agent_max_parallel_steps,
+        step_token_budget=config.agent_step_token_budget,
+        memory_recall_k=config.memory_recall_top_k,
+        executor=get_cpu_executor(),
+        intent_router=get_intent_router(),
+        plan_cache=get_plan_cache(),
+        validation_policy=ValidationPolicy(
+            mode=config.validation_mode,
+            min_answer_chars=config.validation_min_answer_chars,
+            min_citation_coverage=config.validation_min_citation_coverage,
+            token_budget=config.validation_token_budget,
+        ),
     )
 
 
@@ -115,6 +199,37 @@ def get_repo_state_store() -> RepoStateStore:
     return RepoStateStore(base_dir=config.state_dir)
 
 
+@lru_cache
+def get_span_exporter() -> SpanExporter | None:
+    config = get_config()
+    if config.trace_exporter == "memory":
+        return InMemorySpanExporter()
+    if config.trace_exporter == "file":
+        return FileSpanExporter(config.trace_file)
+    return None
+
+
+@lru_cache
+def get_sampling_profiler() -> SamplingProfiler:
+    config = get_config()
+    return SamplingProfiler(
+        interval_seconds=config.profile_sample_interval_seconds,
+        max_seconds=config.profile_max_seconds,
+    )
+
+
+@lru_cache
+def get_request_profiler() -> RequestProfiler:
+    return RequestProfiler(
+        store=RequestProfileStore(), slow_ms=get_config().profile_slow_request_ms
+    )
+
+
+@lru_cache
+def get_memory_profiler() -> MemoryProfiler:
+    return MemoryProfiler()
+
+
 @lru_cache
 def get_config() -> AppConfig:
     return load_config()
@@ -122,4 +237,4 @@ def get_config() -> AppConfig:
 
 @lru_cache
 def get_llm_provider() -> LlmProvider:
-    return LlmProvider(get_config())
+    return LlmProvider(get_config(), embedder=get_embedder(), executor=get_cpu_executor())
@@ -1,9 +1,11 @@
 import os
 
-from fastapi import Depends, FastAPI, Header
+from fastapi import Depends, FastAPI, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from codeatlas.app.di import get_config
+from fastapi.responses import JSONResponse
+from codeatlas.app.di import get_config, get_request_profiler, get_span_exporter
 from codeatlas.app.security import verify_api_key
+from codeatlas.controllers.admin_controller import router as admin_router
 from codeatlas.controllers.analyze_controller import router as analyze_router
 from codeatlas.controllers.ask_controller import router as ask_router
 from codeatlas.controllers.dependency_controller import router as dependency_router
@@ -15,6 +17,10 @@ from codeatlas.controllers.metrics_controller import router as metrics_router
 from codeatlas.controllers.overview_controller import router as overview_router
 from codeatlas.controllers.repos_controller import router as repos_router
 from codeatlas.controllers.search_controller import router as search_router
+from codeatlas.observability.http_metrics import RequestMetricsMiddleware
+from codeatlas.observability.profiling import RequestProfilerMiddleware
+from codeatlas.observability.tracing import tracer
+from codeatlas.services.llm.gateway import LlmGatewayTimeout
 from codeatlas.utils.logging import configure_logging
 from dotenv import load_dotenv
 
@@ -30,7 +36,17 @@ def _allowed_origins() -> list[str]:
 
 def create_app() -> FastAPI:
     configure_logging()
+    tracer.set_exporter(get_span_exporter())
     app = FastAPI(title="CodeAtlas", version="0.1.0")
+    config = get_config()
+
+    if config.admin_api_key:
+        # Innermost, so a request's profile is not diluted by the other middleware
+        app.add_middleware(
+            RequestProfilerMiddleware,
+            profiler=get_request_profiler(),
+            admin_key=config.admin_api_key,
+        )
 
     # Configure CORS
     app.add_middleware(
@@ -40,6 +56,11 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Added last so it is outermost and also sees CORS preflight responses
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        latency_buckets=config.request_latency_buckets,
+    )
 
     # Simplified dependency to bypass API key check for local frontend
     def auth_dep(x_api_key: str | None = Header(default=None)) -> None:
@@ -59,22 +80,14 @@ def create_app() -> FastAPI:
     app.include_router(generate_router, dependencies=[auth_dependency])
     app.include_router(eval_router, dependencies=[auth_dependency])
     app.include_router(metrics_router)
+    if config.admin_api_key:
+        app.include_router(admin_router)
 
-    @app.middleware("http")
-    async def record_metrics(request, call_next):
-        from time import perf_counter
-        from codeatlas.observability.metrics import REQUEST_COUNT, REQUEST_LATENCY
-
-        start = perf_counter()
-        response = await call_next(request)
-        elapsed = perf_counter() - start
-        REQUEST_COUNT.labels(
-            method=request.method,
-            path=request.url.path,
-            status=str(response.status_code),
-        ).inc()
-        REQUEST_LATENCY.labels(path=request.url.path).observe(elapsed)
-        return response
+    @app.exception_handler(LlmGatewayTimeout)
+    async def llm_saturated(request: Request, exc: LlmGatewayTimeout) -> JSONResponse:
+        return JSONResponse(
+            status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"}
+        )
 
     return app
 
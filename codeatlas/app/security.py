@@ -1,3 +1,5 @@
+import hmac
+
 from fastapi import Header, HTTPException
 
 from codeatlas.utils.config import AppConfig
@@ -12,3 +14,16 @@ def verify_api_key(
         raise HTTPException(status_code=500, detail="API key not configured")
     if x_api_key != config.api_key:
         raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+def verify_admin_key(
+    config: AppConfig, x_admin_key: str | None = Header(default=None)
+) -> None:
+    # Admin endpoints do not exist unless an admin key is configured
+    if not config.admin_api_key:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters
+    if not x_admin_key or not hmac.compare_digest(
+        x_admin_key.encode(), config.admin_api_key.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from codeatlas.app.di import (
+    get_config,
+    get_memory_profiler,
+    get_request_profiler,
+    get_sampling_profiler,
+)
+from codeatlas.app.security import verify_admin_key
+from codeatlas.observability.profiling import (
+    MemoryProfiler,
+    ProfilerBusy,
+    RequestProfiler,
+    SamplingProfiler,
+    collapsed_text,
+)
+from codeatlas.utils.config import AppConfig
+from codeatlas.utils.executors import run_blocking
+
+
+def require_admin(
+    x_admin_key: str | None = Header(default=None),
+    config: AppConfig = Depends(get_config),
+) -> None:
+    verify_admin_key(config, x_admin_key)
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile/sample")
+async def sample_profile(
+    seconds: float = Query(default=10.0, gt=0),
+    format: str = Query(default="collapsed", pattern="^(collapsed|json)$"),
+    profiler: SamplingProfiler = Depends(get_sampling_profiler),
+):
+    """Sample every thread's stack for ``seconds``; collapsed stacks feed flamegraph tools."""
+    try:
+        stacks = await run_blocking(None, profiler.sample, seconds)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if format == "json":
+        return {"samples": sum(stacks.values()), "stacks": dict(stacks.most_common())}
+    return PlainTextResponse(collapsed_text(stacks))
+
+
+@router.get("/profile/requests")
+def list_request_profiles(profiler: RequestProfiler = Depends(get_request_profiler)):
+    """Slow requests profiled via the ``X-Codeatlas-Profile`` header, newest first."""
+    return [
+        {
+            "profile_id": profile.profile_id,
+            "method": profile.method,
+            "path": profile.path,
+            "elapsed_ms": profile.elapsed_ms,
+            "created_at": profile.created_at,
+        }
+        for profile in profiler.store.list()
+    ]
+
+
+@router.get("/profile/requests/{profile_id}", response_class=PlainTextResponse)
+def get_request_profile(
+    profile_id: str, profiler: RequestProfiler = Depends(get_request_profiler)
+) -> str:
+    profile = profiler.store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return (
+        f"{profile.method} {profile.path} took {profile.elapsed_ms} ms\n\n{profile.summary}"
+    )
+
+
+@router.post("/memory/start")
+def start_memory_tracing(
+    frames: int = Query(default=10, ge=1, le=100),
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+):
+    profiler.start(frames)
+    return {"tracing": True}
+
+
+@router.get("/memory/snapshot")
+def memory_snapshot(
+    limit: int = Query(default=25, ge=1, le=500),
+    match: str | None = Query(default=None),
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+):
+    """Top allocation sites and growth since the previous snapshot.
+
+    ``match`` narrows to files containing it, e.g. ``faiss_retriever`` or
+    ``repo_state_store``.
+    """
+    if not profiler.is_tracing():
+        raise HTTPException(status_code=409, detail="Start memory tracing first")
+    return profiler.snapshot(limit=limit, match=match)
+
+
+@router.post("/memory/stop")
+def stop_memory_tracing(profiler: MemoryProfiler = Depends(get_memory_profiler)):
+    profiler.stop()
+    return {"tracing": False}
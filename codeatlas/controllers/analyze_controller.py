@@ -7,7 +7,9 @@ from codeatlas.app.di import (
     get_index_service,
     get_repo_state_store,
 )
+from codeatlas.observability.tracing import tracer
 from codeatlas.schemas.analyze import AnalyzeRepoRequest, AnalyzeRepoResponse
+from codeatlas.services.dependency.graph_analytics import compute_graph_analytics
 from codeatlas.services.dependency.interfaces import DependencyGraphBuilder
 from codeatlas.services.ingestion.interfaces import RepositoryLoader
 from codeatlas.services.parsing.interfaces import AstParser
@@ -27,9 +29,11 @@ def analyze_repo(
     index_service: CodeIndexService = Depends(get_index_service),
     state_store: RepoStateStore = Depends(get_repo_state_store),
 ) -> AnalyzeRepoResponse:
-    repo = loader.load(request.repo_url)
-    parsed = parser.parse_repository(repo)
-    dependency_graph = graph_builder.build_import_graph(parsed)
+    with tracer.span("analyze_repo"):
+        repo = loader.load(request.repo_url)
+        parsed = parser.parse_repository(repo)
+        dependency_graph = graph_builder.build_import_graph(parsed)
+        analytics = compute_graph_analytics(dependency_graph, parsed.files, repo.root_path)
     background_tasks.add_task(index_service.index_repository, repo, parsed)
     indexing_status = "queued"
     state_store.save(
@@ -40,6 +44,7 @@ def analyze_repo(
             root_path=repo.root_path,
             name=repo.name,
             url=repo.url,
+            analytics=analytics,
         ),
     )
     return AnalyzeRepoResponse(
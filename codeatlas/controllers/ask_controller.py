@@ -1,14 +1,16 @@
-import asyncio
 import json
 import time
+from dataclasses import asdict
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 
 from codeatlas.app.di import get_agent_orchestrator, get_llm_provider
+from codeatlas.observability.tracing import Span, tracer
 from codeatlas.observability.tracker import tracker
-from codeatlas.schemas.ask import AskRequest, AskResponse
+from codeatlas.schemas.ask import AskRequest, AskResponse, StepTokens
 from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.llm.interfaces import cache_config
 from codeatlas.services.llm.provider import LlmProvider
 
 router = APIRouter(prefix="/ask", tags=["qa"])
@@ -16,13 +18,21 @@ router = APIRouter(prefix="/ask", tags=["qa"])
 
 # ---------- normal (non-streaming) endpoint ----------
 @router.post("", response_model=AskResponse)
-def ask(
+async def ask(
     request: AskRequest,
     orchestrator: AgentOrchestrator = Depends(get_agent_orchestrator),
     llm_provider: LlmProvider = Depends(get_llm_provider),
 ) -> AskResponse:
     start = time.perf_counter()
+    with tracer.span("ask") as root:
+        resp = await _answer(request, orchestrator, llm_provider)
+    _track(request, resp, start, root)
+    return resp
+
 
+async def _answer(
+    request: AskRequest, orchestrator: AgentOrchestrator, llm_provider: LlmProvider
+) -> AskResponse:
     # General mode — no repo, just answer the coding question directly
     if not request.repo_id:
         llm = llm_provider.get_chat_model()
@@ -39,23 +49,22 @@ def ask(
             ]
         )
         chain = prompt | llm
-        response = chain.invoke({"question": request.question})
-        resp = AskResponse(
+        response = await chain.ainvoke(
+            {"question": request.question}, config=cache_config(request.question)
+        )
+        return AskResponse(
             answer=response.content,
             citations=[],
             reasoning_steps=["General mode: answered without repo context."],
         )
-        _track(request, resp, start)
-        return resp
 
-    result = orchestrator.handle_question(request.question, request.repo_id)
-    resp = AskResponse(
+    result = await orchestrator.ahandle_question(request.question, request.repo_id)
+    return AskResponse(
         answer=result.answer,
         citations=result.citations,
         reasoning_steps=result.reasoning_steps,
+        step_tokens=[StepTokens(**asdict(usage)) for usage in result.step_tokens],
     )
-    _track(request, resp, start)
-    return resp
 
 
 # ---------- streaming SSE endpoint ----------
@@ -65,7 +74,7 @@ async def ask_stream(
     orchestrator: AgentOrchestrator = Depends(get_agent_orchestrator),
     llm_provider: LlmProvider = Depends(get_llm_provider),
 ):
-    async def generate():
+    async def generate(root: Span):
         start = time.perf_counter()
         try:
             if not request.repo_id:
@@ -86,7 +95,9 @@ async def ask_stream(
                 )
                 chain = prompt | llm
                 full_answer = ""
-                for chunk in chain.stream({"question": request.question}):
+                async for chunk in chain.astream(
+                    {"question": request.question}, config=cache_config(request.question)
+                ):
                     token = chunk.content if hasattr(chunk, "content") else str(chunk)
                     if token:
                         full_answer += token
@@ -113,47 +124,32 @@ async def ask_stream(
                     {"type": "status", "content": "Retrieving context..."}
                 )
 
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(
-                    None,
-                    lambda: orchestrator.handle_question_fast(
-                        request.question, request.repo_id
-                    ),
-                )
-
-                yield _sse({"type": "status", "content": "Streaming answer..."})
-
-                # Stream answer in small chunks for natural feel
-                answer = result.answer
-                chunk_size = 4  # words per chunk
-                words = answer.split(" ")
-                for i in range(0, len(words), chunk_size):
-                    chunk = " ".join(words[i : i + chunk_size])
-                    if i + chunk_size < len(words):
-                        chunk += " "
-                    yield _sse({"type": "token", "content": chunk})
-                    await asyncio.sleep(0.008)
-
-                latency = (time.perf_counter() - start) * 1000
-                tracker.record_query(
-                    question=request.question,
-                    repo_id=request.repo_id,
-                    latency_ms=latency,
-                    citation_count=len(result.citations),
-                    agents_used=["retrieval", "mentor"],
-                )
-                yield _sse(
-                    {
-                        "type": "done",
-                        "citations": result.citations,
-                        "reasoning_steps": result.reasoning_steps,
-                    }
-                )
+                # Citations arrive as soon as retrieval finishes; tokens are
+                # forwarded as the mentor's LLM produces them.
+                async for event in orchestrator.astream_question_fast(
+                    request.question, request.repo_id
+                ):
+                    if event["type"] == "done":
+                        latency = (time.perf_counter() - start) * 1000
+                        tracker.record_query(
+                            question=request.question,
+                            repo_id=request.repo_id,
+                            latency_ms=latency,
+                            citation_count=len(event["citations"]),
+                            agents_used=["retrieval", "mentor"],
+                            agent_ms=root.totals_by("agent") or None,
+                        )
+                    yield _sse(event)
         except Exception as e:
             yield _sse({"type": "error", "content": str(e)})
 
+    async def traced():
+        with tracer.span("ask.stream") as root:
+            async for event in generate(root):
+                yield event
+
     return StreamingResponse(
-        generate(),
+        traced(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -168,17 +164,21 @@ def _sse(data: dict) -> str:
     return f"data: {json.dumps(data)}\n\n"
 
 
-def _track(request: AskRequest, resp: AskResponse, start: float) -> None:
+def _track(request: AskRequest, resp: AskResponse, start: float, root: Span) -> None:
     latency = (time.perf_counter() - start) * 1000
-    agents = (
-        ["mentor"]
-        if not request.repo_id
-        else ["planner", "retrieval", "mentor", "validator"]
-    )
+    # Time measured in each agent's spans; general mode has none and is all mentor
+    agent_ms = root.totals_by("agent") or None
+    if agent_ms is not None:
+        agents = list(agent_ms)
+    elif not request.repo_id:
+        agents = ["mentor"]
+    else:
+        agents = ["planner", "retrieval", "mentor", "validator"]
     tracker.record_query(
         question=request.question,
         repo_id=request.repo_id,
         latency_ms=latency,
         citation_count=len(resp.citations),
         agents_used=agents,
+        agent_ms=agent_ms,
     )
\ No newline at end of file
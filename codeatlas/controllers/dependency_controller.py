@@ -6,9 +6,13 @@ from codeatlas.app.di import get_repo_state_store
 from codeatlas.schemas.dependencies import (
     DependenciesRequest,
     DependenciesResponse,
+    DependencyMetricsRequest,
+    DependencyMetricsResponse,
     GraphEdge,
     GraphRequest,
     GraphResponse,
+    PackageMetrics,
+    RankedNode,
 )
 from codeatlas.services.state.repo_state_store import RepoStateStore
 
@@ -26,23 +30,15 @@ def get_dependencies(
     request: DependenciesRequest,
     state_store: RepoStateStore = Depends(get_repo_state_store),
 ) -> DependenciesResponse:
-    state = state_store.get(request.repo_id)
-    if state is None:
+    if state_store.get_info(request.repo_id) is None:
         raise HTTPException(status_code=404, detail="Repository not found")
-
-    graph = state.import_graph
-    if request.node_id not in graph:
+    if not state_store.has_node(request.repo_id, request.node_id):
         raise HTTPException(status_code=404, detail="Node not found")
 
-    if request.direction == "outbound":
-        neighbors = list(graph.successors(request.node_id))
-    else:
-        neighbors = list(graph.predecessors(request.node_id))
-
     return DependenciesResponse(
         node_id=request.node_id,
         direction=request.direction,
-        neighbors=sorted(neighbors),
+        neighbors=state_store.neighbors(request.repo_id, request.node_id, request.direction),
     )
 
 
@@ -51,13 +47,39 @@ def get_full_graph(
     request: GraphRequest,
     state_store: RepoStateStore = Depends(get_repo_state_store),
 ) -> GraphResponse:
-    state = state_store.get(request.repo_id)
-    if state is None:
+    if state_store.get_info(request.repo_id) is None:
         raise HTTPException(status_code=404, detail="Repository not found")
-    graph = state.import_graph
-    nodes = sorted({_clean_path(n) for n in graph.nodes})
+    nodes = sorted({_clean_path(n) for n in state_store.list_nodes(request.repo_id)})
     edges = [
         GraphEdge(source=_clean_path(s), target=_clean_path(t))
-        for s, t in graph.edges
+        for s, t in state_store.list_edges(request.repo_id)
     ]
     return GraphResponse(nodes=nodes, edges=edges)
+
+
+@router.post("/metrics", response_model=DependencyMetricsResponse)
+def get_dependency_metrics(
+    request: DependencyMetricsRequest,
+    state_store: RepoStateStore = Depends(get_repo_state_store),
+) -> DependencyMetricsResponse:
+    """Graph analytics computed when the repo was analyzed; paths are repo-relative."""
+    analytics = state_store.get_analytics(request.repo_id)
+    if analytics is None:
+        raise HTTPException(status_code=404, detail="Repository not found")
+    limit = max(request.limit, 0)
+
+    def ranked(items: list[tuple[str, float]]) -> list[RankedNode]:
+        return [RankedNode(node=node, value=value) for node, value in items[:limit]]
+
+    return DependencyMetricsResponse(
+        node_count=analytics.node_count,
+        edge_count=analytics.edge_count,
+        internal_edge_count=analytics.internal_edge_count,
+        most_imported=ranked(analytics.most_imported),
+        most_importing=ranked(analytics.most_importing),
+        pagerank=ranked(analytics.pagerank),
+        cycle_count=analytics.cycle_count,
+        cycles=analytics.cycles[:limit],
+        layers=analytics.layers,
+        packages=[PackageMetrics(**vars(package)) for package in analytics.packages],
+    )
@@ -16,21 +16,15 @@ def get_eval_stats(
 
     # Enrich with per-repository stats
     repo_stats = []
-    for repo_id, state in state_store._states.items():
-        files = state.parsed_repo.files
-        functions = state.parsed_repo.functions
-        lang_counts: dict[str, int] = {}
-        for f in files:
-            lang_counts[f.language] = lang_counts.get(f.language, 0) + 1
-
+    for overview in state_store.list_overviews():
         repo_stats.append(
             {
-                "repo_id": repo_id,
-                "name": getattr(state, "name", "") or repo_id[:8],
-                "file_count": len(files),
-                "function_count": len(functions),
-                "dependency_edges": state.import_graph.number_of_edges(),
-                "languages": lang_counts,
+                "repo_id": overview.repo_id,
+                "name": overview.name or overview.repo_id[:8],
+                "file_count": overview.file_count,
+                "function_count": overview.function_count,
+                "dependency_edges": overview.dependency_edges,
+                "languages": overview.language_counts,
             }
         )
 
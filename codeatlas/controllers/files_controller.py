@@ -20,17 +20,17 @@ def list_files(
     request: ListFilesRequest,
     state_store: RepoStateStore = Depends(get_repo_state_store),
 ) -> ListFilesResponse:
-    state = state_store.get(request.repo_id)
-    if state is None:
+    info = state_store.get_info(request.repo_id)
+    if info is None:
         raise HTTPException(status_code=404, detail="Repository not found")
 
     files = []
-    root_path = Path(state.root_path) if state.root_path else None
+    root_path = Path(info.root_path) if info.root_path else None
     
     # Common ignore list
     IGNORE_PATTERNS = {"__pycache__", ".git", ".pytest_cache", ".venv", "node_modules"}
 
-    for source in state.parsed_repo.files:
+    for source in state_store.list_files(request.repo_id):
         path_obj = Path(source.path)
         
         # Skip ignored patterns
@@ -96,8 +96,8 @@ def get_file_content(
     request: FileContentRequest,
     state_store: RepoStateStore = Depends(get_repo_state_store),
 ) -> FileContentResponse:
-    state = state_store.get(request.repo_id)
-    if state is None:
+    info = state_store.get_info(request.repo_id)
+    if info is None:
         raise HTTPException(status_code=404, detail="Repository not found")
 
     # Search in .codeatlas/repos/<id>/ first, then root_path
@@ -105,8 +105,8 @@ def get_file_content(
     local_dir = Path(".codeatlas/repos") / request.repo_id
     if local_dir.exists():
         candidates.append(local_dir / request.file_path)
-    if state.root_path:
-        candidates.append(Path(state.root_path) / request.file_path)
+    if info.root_path:
+        candidates.append(Path(info.root_path) / request.file_path)
 
     for candidate in candidates:
         if candidate.is_file():
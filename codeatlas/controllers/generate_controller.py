@@ -8,11 +8,11 @@ router = APIRouter(prefix="/generate-code", tags=["coding"])
 
 
 @router.post("", response_model=GenerateCodeResponse)
-def generate_code(
+async def generate_code(
     request: GenerateCodeRequest,
     orchestrator: AgentOrchestrator = Depends(get_agent_orchestrator),
 ) -> GenerateCodeResponse:
-    result = orchestrator.handle_generation(request.prompt, request.repo_id)
+    result = await orchestrator.ahandle_generation(request.prompt, request.repo_id)
     return GenerateCodeResponse(
         diff=result.diff,
         notes=result.notes,
@@ -1,5 +1,3 @@
-from collections import Counter
-
 from fastapi import APIRouter, Depends, HTTPException
 
 from codeatlas.app.di import get_repo_state_store
@@ -14,15 +12,14 @@ def repo_overview(
     request: RepoOverviewRequest,
     state_store: RepoStateStore = Depends(get_repo_state_store),
 ) -> RepoOverviewResponse:
-    state = state_store.get(request.repo_id)
-    if state is None:
+    overview = state_store.overview(request.repo_id)
+    if overview is None:
         raise HTTPException(status_code=404, detail="Repository not found")
 
-    language_counts = Counter(file.language for file in state.parsed_repo.files)
     return RepoOverviewResponse(
         repo_id=request.repo_id,
-        file_count=len(state.parsed_repo.files),
-        function_count=len(state.parsed_repo.functions),
-        language_counts=dict(language_counts),
-        dependency_edges=state.import_graph.number_of_edges(),
+        file_count=overview.file_count,
+        function_count=overview.function_count,
+        language_counts=overview.language_counts,
+        dependency_edges=overview.dependency_edges,
     )
@@ -44,12 +44,12 @@ def list_repos(
     repo_ids = state_store.list_repo_ids()
     repos = []
     for rid in repo_ids:
-        state = state_store.get(rid)
+        info = state_store.get_info(rid)
         name = ""
-        if state:
-            name = state.name
-            if not name and state.root_path:
-                name = _name_from_git_remote(state.root_path, repo_id=rid)
+        if info:
+            name = info.name
+            if not name and info.root_path:
+                name = _name_from_git_remote(info.root_path, repo_id=rid)
         if not name:
             name = rid[:8]
         repos.append(RepoInfo(repo_id=rid, name=name))
@@ -1,21 +1,27 @@
+from concurrent.futures import Executor
+
 from fastapi import APIRouter, Depends
 
-from codeatlas.app.di import get_code_retriever, get_embedder
+from codeatlas.app.di import get_code_retriever, get_cpu_executor, get_embedder
 from codeatlas.schemas.search import SearchRequest, SearchResponse, SearchHit
 from codeatlas.services.retrieval.embedding import EmbeddingService
 from codeatlas.services.retrieval.interfaces import CodeRetriever
+from codeatlas.utils.executors import run_blocking
 
 router = APIRouter(prefix="/search", tags=["retrieval"])
 
 
 @router.post("", response_model=SearchResponse)
-def search(
+async def search(
     request: SearchRequest,
     retriever: CodeRetriever = Depends(get_code_retriever),
     embedder: EmbeddingService = Depends(get_embedder),
+    executor: Executor = Depends(get_cpu_executor),
 ) -> SearchResponse:
-    query_vector = embedder.embed_query(request.query)
-    records = retriever.search(request.repo_id, query_vector, request.top_k)
+    query_vector = await run_blocking(executor, embedder.embed_query, request.query)
+    records = await run_blocking(
+        executor, retriever.search, request.repo_id, query_vector, request.top_k
+    )
     results = [
         SearchHit(
             record_id=record.record_id,
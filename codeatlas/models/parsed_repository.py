@@ -1,11 +1,239 @@
-from dataclasses import dataclass
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
 
 from codeatlas.models.function_node import FunctionNode
 from codeatlas.models.source_file import SourceFile
 
 
-@dataclass(frozen=True)
+class _PathTable:
+    """Each distinct path (or language) string stored once, addressed by index."""
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self._index[value] = index
+        return index
+
+
+class ParsedRepositoryBuilder:
+    """Accumulates files and functions straight into columns.
+
+    The parser feeds it one record at a time, so a large repo never exists
+    as a list of dataclasses.
+    """
+
+    def __init__(self, repository_id: str) -> None:
+        self._repository_id = repository_id
+        self._paths = _PathTable()
+        self._languages = _PathTable()
+        self._file_paths = array("i")
+        self._file_languages = array("i")
+        self._file_sizes = array("q")
+        self._function_files = array("i")
+        self._starts = array("i")
+        self._ends = array("i")
+        self._offsets = array("q", [0])
+        self._pieces: list[bytes] = []
+
+    def add_file(self, path: str, language: str, size_bytes: int) -> None:
+        self._file_paths.append(self._paths.intern(path))
+        self._file_languages.append(self._languages.intern(language))
+        self._file_sizes.append(size_bytes)
+
+    def add_function(
+        self, name: str, file_path: str, start_line: int, end_line: int, signature: str
+    ) -> None:
+        self._function_files.append(self._paths.intern(file_path))
+        self._starts.append(start_line)
+        self._ends.append(end_line)
+        # Name and signature sit next to each other in the UTF-8 arena; one
+        # non-ASCII signature would otherwise widen a str arena to 2-4 bytes/char
+        for text in (name, signature):
+            encoded = text.encode("utf-8")
+            self._pieces.append(encoded)
+            self._offsets.append(self._offsets[-1] + len(encoded))
+
+    def build(self) -> ParsedRepository:
+        repo = ParsedRepository.__new__(ParsedRepository)
+        self._fill(repo)
+        return repo
+
+    def _fill(self, repo: ParsedRepository) -> None:
+        repo._repository_id = self._repository_id
+        repo._paths = self._paths.values
+        repo._languages = self._languages.values
+        repo._file_paths = self._file_paths
+        repo._file_languages = self._file_languages
+        repo._file_sizes = self._file_sizes
+        repo._function_files = self._function_files
+        repo._starts = self._starts
+        repo._ends = self._ends
+        repo._offsets = self._offsets
+        repo._arena = b"".join(self._pieces)
+        self._pieces = []
+
+
 class ParsedRepository:
-    repository_id: str
-    files: list[SourceFile]
-    functions: list[FunctionNode]
+    """Files and functions of one parsed repository, stored column-wise.
+
+    Paths live once in an interned table; line ranges and file indices are
+    int32 arrays; names and signatures share one UTF-8 arena addressed by
+    offsets. ``files`` and ``functions`` are read-only sequences that build
+    ``SourceFile``/``FunctionNode`` objects on access, so callers written
+    against the old dataclass lists keep working.
+    """
+
+    __slots__ = (
+        "_repository_id",
+        "_paths",
+        "_languages",
+        "_file_paths",
+        "_file_languages",
+        "_file_sizes",
+        "_function_files",
+        "_starts",
+        "_ends",
+        "_offsets",
+        "_arena",
+    )
+
+    def __init__(
+        self,
+        repository_id: str,
+        files: Iterable[SourceFile] = (),
+        functions: Iterable[FunctionNode] = (),
+    ) -> None:
+        builder = ParsedRepositoryBuilder(repository_id)
+        for source in files:
+            builder.add_file(source.path, source.language, source.size_bytes)
+        for function in functions:
+            builder.add_function(
+                function.name,
+                function.file_path,
+                function.start_line,
+                function.end_line,
+                function.signature,
+            )
+        builder._fill(self)
+
+    @property
+    def repository_id(self) -> str:
+        return self._repository_id
+
+    @property
+    def files(self) -> FileTable:
+        return FileTable(self)
+
+    @property
+    def functions(self) -> FunctionTable:
+        return FunctionTable(self)
+
+    @property
+    def paths(self) -> list[str]:
+        """Distinct file paths referenced by files and functions."""
+        return list(self._paths)
+
+    def _arena_text(self, slot: int) -> str:
+        return self._arena[self._offsets[slot] : self._offsets[slot + 1]].decode("utf-8")
+
+    def __repr__(self) -> str:
+        return (
+            f"ParsedRepository(repository_id={self._repository_id!r}, "
+            f"files={len(self._file_paths)}, functions={len(self._starts)})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ParsedRepository):
+            return NotImplemented
+        return (
+            self.repository_id == other.repository_id
+            and list(self.files) == list(other.files)
+            and list(self.functions) == list(other.functions)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class FileTable(Sequence[SourceFile]):
+    __slots__ = ("_repo",)
+
+    def __init__(self, repo: ParsedRepository) -> None:
+        self._repo = repo
+
+    def __len__(self) -> int:
+        return len(self._repo._file_paths)
+
+    @overload
+    def __getitem__(self, index: int) -> SourceFile: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[SourceFile]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        repo = self._repo
+        return SourceFile(
+            path=repo._paths[repo._file_paths[index]],
+            language=repo._languages[repo._file_languages[index]],
+            size_bytes=repo._file_sizes[index],
+        )
+
+    def __iter__(self) -> Iterator[SourceFile]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+
+class FunctionTable(Sequence[FunctionNode]):
+    __slots__ = ("_repo",)
+
+    def __init__(self, repo: ParsedRepository) -> None:
+        self._repo = repo
+
+    def __len__(self) -> int:
+        return len(self._repo._starts)
+
+    @overload
+    def __getitem__(self, index: int) -> FunctionNode: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[FunctionNode]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        repo = self._repo
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("function index out of range")
+        return FunctionNode(
+            name=repo._arena_text(2 * index),
+            file_path=repo._paths[repo._function_files[index]],
+            start_line=repo._starts[index],
+            end_line=repo._ends[index],
+            signature=repo._arena_text(2 * index + 1),
+        )
+
+    def __iter__(self) -> Iterator[FunctionNode]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
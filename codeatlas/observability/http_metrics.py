@@ -0,0 +1,65 @@
+"""ASGI middleware recording Prometheus metrics for every HTTP request."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from codeatlas.observability.metrics import (
+    REQUEST_COUNT,
+    REQUESTS_IN_FLIGHT,
+    RESPONSE_SIZE,
+    request_latency_histogram,
+)
+
+UNMATCHED_ROUTE = "other"
+
+
+class RequestMetricsMiddleware:
+    """Counts, latency, response size and in-flight requests per route template.
+
+    Runs as plain ASGI rather than ``BaseHTTPMiddleware`` so streamed
+    responses (SSE) are measured until their last body chunk, not just
+    until the headers are sent.
+    """
+
+    def __init__(self, app: ASGIApp, latency_buckets: Sequence[float]) -> None:
+        self.app = app
+        self._latency = request_latency_histogram(latency_buckets)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_and_measure(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = route_label(scope)
+            REQUEST_COUNT.labels(method=scope["method"], path=route, status=str(status)).inc()
+            self._latency.labels(path=route).observe(elapsed)
+            RESPONSE_SIZE.labels(path=route).observe(size)
+
+
+def route_label(scope: Scope) -> str:
+    """The template of the route that handled the request, e.g. ``/files/{repo_id}``."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else UNMATCHED_ROUTE
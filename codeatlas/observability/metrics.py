@@ -1,13 +1,152 @@
-from prometheus_client import Counter, Histogram
+import logging
+from collections.abc import Sequence
 
+from prometheus_client import Counter, Gauge, Histogram
+
+# HTTP metrics are labelled with the matched route template ("/files/{repo_id}"),
+# or "other" for unmatched paths, so label cardinality stays fixed
 REQUEST_COUNT = Counter(
     "codeatlas_request_total",
     "Total HTTP requests",
     ["method", "path", "status"],
 )
 
-REQUEST_LATENCY = Histogram(
-    "codeatlas_request_latency_seconds",
-    "Request latency in seconds",
+REQUESTS_IN_FLIGHT = Gauge(
+    "codeatlas_requests_in_flight",
+    "HTTP requests currently being handled",
+)
+
+RESPONSE_SIZE = Histogram(
+    "codeatlas_response_size_bytes",
+    "HTTP response body size in bytes",
     ["path"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+
+_request_latency: Histogram | None = None
+_request_latency_buckets: tuple[float, ...] = ()
+
+
+def request_latency_histogram(buckets: Sequence[float]) -> Histogram:
+    """Request latency histogram, created on first use with configured ``buckets``.
+
+    A metric can only be registered once per process, so later calls return
+    the same histogram; a call asking for different ``buckets`` logs a
+    warning instead of silently getting the first caller's.
+    """
+    global _request_latency, _request_latency_buckets
+    requested = tuple(sorted(float(bound) for bound in buckets))
+    if _request_latency is None:
+        _request_latency = Histogram(
+            "codeatlas_request_latency_seconds",
+            "Request latency in seconds",
+            ["path"],
+            buckets=requested,
+        )
+        _request_latency_buckets = requested
+    elif requested != _request_latency_buckets:
+        logging.getLogger(__name__).warning(
+            "Request latency histogram already uses buckets %s; ignoring %s",
+            _request_latency_buckets,
+            requested,
+        )
+    return _request_latency
+
+
+LLM_HTTP_REQUESTS = Counter(
+    "codeatlas_llm_http_requests_total",
+    "Upstream LLM HTTP requests by final status",
+    ["status"],
+)
+
+LLM_HTTP_RETRIES = Counter(
+    "codeatlas_llm_http_retries_total",
+    "Upstream LLM HTTP requests retried after a transient failure",
+)
+
+LLM_HTTP_IN_FLIGHT = Gauge(
+    "codeatlas_llm_http_in_flight",
+    "Upstream LLM HTTP requests currently in flight",
+)
+
+LLM_HTTP_POOL_CONNECTIONS = Gauge(
+    "codeatlas_llm_http_pool_connections",
+    "Shared LLM connection pool size (max, open, idle)",
+    ["state"],
+)
+
+LLM_GATEWAY_QUEUE_DEPTH = Gauge(
+    "codeatlas_llm_gateway_queue_depth",
+    "LLM calls waiting for a concurrency slot or rate-limit token",
+    ["provider"],
+)
+
+LLM_GATEWAY_WAIT_SECONDS = Histogram(
+    "codeatlas_llm_gateway_wait_seconds",
+    "Time LLM calls spent queued in the gateway",
+    ["provider"],
+)
+
+LLM_GATEWAY_IN_FLIGHT = Gauge(
+    "codeatlas_llm_gateway_in_flight",
+    "LLM calls currently holding a gateway slot",
+    ["provider"],
+)
+
+LLM_GATEWAY_COALESCED = Counter(
+    "codeatlas_llm_gateway_coalesced_total",
+    "LLM calls answered by an identical in-flight call",
+    ["provider"],
+)
+
+LLM_GATEWAY_REJECTED = Counter(
+    "codeatlas_llm_gateway_rejected_total",
+    "LLM calls rejected after waiting past the queue deadline",
+    ["provider"],
+)
+
+PLANNER_LATENCY = Histogram(
+    "codeatlas_planner_latency_seconds",
+    "Time to produce an execution plan, by source (router or llm)",
+    ["source"],
+)
+
+PLANNER_ROUTER_DECISIONS = Counter(
+    "codeatlas_planner_router_decisions_total",
+    "Local intent router decisions; misses fall back to the LLM planner",
+    ["outcome", "intent"],
+)
+
+PLANNER_ROUTER_HIT_RATIO = Gauge(
+    "codeatlas_planner_router_hit_ratio",
+    "Fraction of questions planned by the local intent router",
+)
+
+PLANNER_ROUTER_SAVED_SECONDS = Counter(
+    "codeatlas_planner_router_saved_seconds_total",
+    "Estimated LLM planner latency avoided by the local intent router",
+)
+
+PLAN_CACHE_LOOKUPS = Counter(
+    "codeatlas_plan_cache_lookups_total",
+    "Plan cache lookups by outcome (hit, similar, miss)",
+    ["outcome"],
+)
+
+VALIDATION_DECISIONS = Counter(
+    "codeatlas_validation_decisions_total",
+    "Answer validation decisions (reviewed by the LLM or skipped) by reason",
+    ["decision", "reason"],
+)
+
+VALIDATION_SAVED_SECONDS = Counter(
+    "codeatlas_validation_saved_seconds_total",
+    "Estimated LLM reviewer latency avoided by skipping validation",
+)
+
+STAGE_LATENCY = Histogram(
+    "codeatlas_stage_latency_seconds",
+    "Time spent in each traced pipeline stage (clone, parse, embed, LLM call, ...)",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
 )
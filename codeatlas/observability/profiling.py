@@ -0,0 +1,293 @@
+"""On-demand profiling of the running process: stack sampling, cProfile, tracemalloc."""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_HEADER = "x-codeatlas-profile"
+PROFILE_ID_HEADER = "x-codeatlas-profile-id"
+ADMIN_KEY_HEADER = "x-admin-key"
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profiling session of the same kind is already running."""
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread at a fixed interval.
+
+    Output is in collapsed-stack format (``thread;module:function;... count``),
+    which flamegraph.pl, speedscope and inferno read directly. Sampling only
+    reads ``sys._current_frames()``, so the profiled code runs unmodified;
+    the cost is one stack walk per thread per interval.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005, max_seconds: float = 60.0) -> None:
+        self._interval = interval_seconds
+        self._max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float) -> Counter[str]:
+        """Block for ``seconds`` (capped at ``max_seconds``), returning stack counts."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A sampling profile is already running")
+        try:
+            stacks: Counter[str] = Counter()
+            me = threading.get_ident()
+            names = {}
+            deadline = time.monotonic() + min(seconds, self._max_seconds)
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me:
+                        continue
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    stacks[_collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+                time.sleep(self._interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+
+def collapsed_text(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def _collapse(thread_name: str, frame) -> str:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", code.co_filename)
+        frames.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    frames.append(thread_name.replace(";", "_").replace(" ", "_"))
+    return ";".join(reversed(frames))
+
+
+@dataclass(frozen=True)
+class RequestProfile:
+    profile_id: str
+    method: str
+    path: str
+    elapsed_ms: float
+    summary: str
+    created_at: float = field(default_factory=time.time)
+
+
+class RequestProfileStore:
+    """The most recent ``max_profiles`` slow-request profiles, by id."""
+
+    def __init__(self, max_profiles: int = 50) -> None:
+        self._max_profiles = max_profiles
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            while len(self._profiles) > self._max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+class RequestProfiler:
+    """cProfile around one request at a time.
+
+    cProfile hooks the calling thread only: for async handlers the profile
+    covers everything the event loop ran meanwhile, other requests included,
+    and plain ``def`` handlers (run in the threadpool) are not captured; use
+    the sampling profiler for those. Only one request is profiled at a time;
+    ``start`` returns ``None`` while another is running.
+    """
+
+    def __init__(
+        self, store: RequestProfileStore, slow_ms: float = 1000.0, top: int = 40
+    ) -> None:
+        self.store = store
+        self._slow_ms = slow_ms
+        self._top = top
+        self._lock = threading.Lock()
+
+    def start(self) -> cProfile.Profile | None:
+        if not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) already owns the hook
+            self._lock.release()
+            return None
+        return profile
+
+    def finish(
+        self, profile: cProfile.Profile, method: str, path: str, elapsed_ms: float
+    ) -> str | None:
+        """Stop ``profile``; keep its summary when the request was slow and return the id."""
+        try:
+            profile.disable()
+        finally:
+            self._lock.release()
+        if elapsed_ms < self._slow_ms:
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(profile, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top)
+        profile_id = uuid.uuid4().hex[:12]
+        self.store.add(
+            RequestProfile(
+                profile_id=profile_id,
+                method=method,
+                path=path,
+                elapsed_ms=round(elapsed_ms, 1),
+                summary=output.getvalue(),
+            )
+        )
+        return profile_id
+
+
+class RequestProfilerMiddleware:
+    """Profiles requests sent with ``X-Codeatlas-Profile: 1`` and a valid ``X-Admin-Key``.
+
+    When the request takes at least the profiler's ``slow_ms``, the cProfile
+    summary is kept and its id returned in ``X-Codeatlas-Profile-Id`` (the
+    header is sent with the response start, so for streamed responses the
+    summary covers the time until the headers went out).
+    """
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler, admin_key: str) -> None:
+        self.app = app
+        self._profiler = profiler
+        self._admin_key = admin_key
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        profile = self._profiler.start()
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        finished = False
+
+        def finish() -> str | None:
+            nonlocal finished
+            finished = True
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            return self._profiler.finish(profile, scope["method"], scope["path"], elapsed_ms)
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start" and not finished:
+                profile_id = finish()
+                if profile_id is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((PROFILE_ID_HEADER.encode(), profile_id.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            if not finished:
+                finish()
+
+    def _requested(self, scope: Scope) -> bool:
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) != "1":
+            return False
+        return hmac.compare_digest(
+            headers.get(ADMIN_KEY_HEADER, "").encode(), self._admin_key.encode()
+        )
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots, each compared with the previous one.
+
+    Tracing slows allocation-heavy code noticeably, so it only runs between
+    ``start`` and ``stop``.
+    """
+
+    def __init__(self) -> None:
+        self._previous: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_tracing() -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10) -> None:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._previous = None
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+
+    def snapshot(self, limit: int = 25, match: str | None = None) -> dict:
+        """Top allocation sites now, and the biggest changes since the last snapshot.
+
+        ``match`` keeps only sites whose file path contains it, e.g.
+        ``faiss_retriever`` or ``repo_state_store``.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not running; start it first")
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                ]
+            )
+            previous, self._previous = self._previous, snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        top = [_stat_dict(stat) for stat in snapshot.statistics("traceback")]
+        growth = (
+            [_stat_dict(stat) for stat in snapshot.compare_to(previous, "traceback")]
+            if previous is not None
+            else []
+        )
+        if match:
+            top = [stat for stat in top if any(match in line for line in stat["traceback"])]
+            growth = [stat for stat in growth if any(match in line for line in stat["traceback"])]
+        growth.sort(key=lambda stat: stat["size_diff_bytes"], reverse=True)
+        return {
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "top": top[:limit],
+            "growth_since_last": growth[:limit],
+        }
+
+
+def _stat_dict(stat) -> dict:
+    return {
+        "size_bytes": stat.size,
+        "count": stat.count,
+        "size_diff_bytes": getattr(stat, "size_diff", 0),
+        "count_diff": getattr(stat, "count_diff", 0),
+        "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+    }
@@ -0,0 +1,196 @@
+"""Lightweight OpenTelemetry-style spans for per-stage timing.
+
+``tracer.span(name)`` times a block, records it in the per-stage Prometheus
+histogram and hands the finished span to the configured exporter. The
+current span is kept in a ``contextvars.ContextVar``, so nesting follows
+``await`` and tasks. Thread pools need the context copied explicitly
+(``run_blocking`` does this).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from codeatlas.observability.metrics import STAGE_LATENCY
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "codeatlas_current_span", default=None
+)
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class _Trace:
+    """Finished spans of one trace, so a root span can total its descendants."""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self) -> None:
+        self.trace_id = _new_id(16)
+        self.spans: list[Span] = []
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_time: float
+    end_time: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: str | None = None
+    _trace: _Trace | None = field(default=None, repr=False, compare=False)
+    _started: float = field(default=0.0, repr=False, compare=False)
+
+    @property
+    def duration_ms(self) -> float:
+        if self.end_time is None:
+            return 0.0
+        return (self.end_time - self.start_time) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def totals_by(self, attribute: str) -> dict[str, float]:
+        """Milliseconds spent in finished spans of this trace, summed per ``attribute`` value."""
+        totals: dict[str, float] = {}
+        if self._trace is None:
+            return totals
+        for span in list(self._trace.spans):
+            value = span.attributes.get(attribute)
+            if value is not None and span is not self:
+                totals[value] = totals.get(value, 0.0) + span.duration_ms
+        return totals
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        return None
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps the most recent ``max_spans`` finished spans, for tests and debugging."""
+
+    def __init__(self, max_spans: int = 10000) -> None:
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def finished_spans(self, name: str | None = None) -> list[Span]:
+        spans = list(self._spans)
+        if name is None:
+            return spans
+        return [span for span in spans if span.name == name]
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends each finished span to ``path`` as one JSON line."""
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter | None = None) -> None:
+        self._exporter = exporter
+
+    def set_exporter(self, exporter: SpanExporter | None) -> SpanExporter | None:
+        """Install ``exporter`` (``None`` keeps metrics only); returns the previous one."""
+        previous, self._exporter = self._exporter, exporter
+        return previous
+
+    @staticmethod
+    def current_span() -> Span | None:
+        return _current.get()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block as a child of the current span."""
+        parent = _current.get()
+        trace = parent._trace if parent is not None else _Trace()
+        span = Span(
+            name=name,
+            trace_id=trace.trace_id,
+            span_id=_new_id(8),
+            parent_id=parent.span_id if parent is not None else None,
+            start_time=time.time(),
+            attributes=attributes,
+            _trace=trace,
+            _started=time.perf_counter(),
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "error"
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            try:
+                _current.reset(token)
+            except ValueError:
+                # A generator closed from another context (e.g. client disconnect)
+                pass
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        elapsed = time.perf_counter() - span._started
+        span.end_time = span.start_time + elapsed
+        STAGE_LATENCY.labels(stage=span.name).observe(elapsed)
+        if span._trace is not None:
+            span._trace.spans.append(span)
+        exporter = self._exporter
+        if exporter is not None:
+            exporter.export(span)
+
+
+# Module-level singleton
+tracer = Tracer()
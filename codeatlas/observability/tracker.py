@@ -2,9 +2,15 @@
 
 import time
 import threading
-from collections import defaultdict
+from collections import deque
 from dataclasses import dataclass, field
 
+from codeatlas.observability.sketch import DDSketch
+
+# Dashboard windows and the slot ring each one is read from
+_WINDOWS = {"5m": ("minute", 300), "1h": ("minute", 3600), "24h": ("hour", 86400)}
+_RECENT_QUERIES = 100
+
 
 @dataclass
 class QueryRecord:
@@ -16,8 +22,85 @@ class QueryRecord:
     timestamp: float = field(default_factory=time.time)
 
 
+class _Aggregate:
+    """Counts and latency sketches for a set of queries, overall and per agent."""
+
+    def __init__(self) -> None:
+        self.latency = DDSketch()
+        self.citations = 0
+        self.agents: dict[str, DDSketch] = {}
+
+    def add(self, latency_ms: float, citation_count: int, agent_ms: dict[str, float]) -> None:
+        self.latency.add(latency_ms)
+        self.citations += citation_count
+        for agent, elapsed in agent_ms.items():
+            self.agents.setdefault(agent, DDSketch()).add(elapsed)
+
+    def merge(self, other: "_Aggregate") -> None:
+        self.latency.merge(other.latency)
+        self.citations += other.citations
+        for agent, sketch in other.agents.items():
+            self.agents.setdefault(agent, DDSketch()).merge(sketch)
+
+    def summary(self) -> dict:
+        latency = self.latency
+        return {
+            "queries": latency.count,
+            "avg_latency_ms": round(latency.mean, 1),
+            "p50_latency_ms": round(latency.quantile(0.50), 1),
+            "p95_latency_ms": round(latency.quantile(0.95), 1),
+            "p99_latency_ms": round(latency.quantile(0.99), 1),
+            "avg_citations": round(self.citations / latency.count, 1) if latency.count else 0,
+        }
+
+    def agent_summary(self) -> dict:
+        return {
+            agent: {
+                "invocations": sketch.count,
+                "avg_time_ms": round(sketch.mean, 1),
+                "p50_ms": round(sketch.quantile(0.50), 1),
+                "p95_ms": round(sketch.quantile(0.95), 1),
+                "p99_ms": round(sketch.quantile(0.99), 1),
+            }
+            for agent, sketch in self.agents.items()
+        }
+
+
+class _SlotRing:
+    """Aggregates for the last ``slots`` fixed-width time slots, reused in a ring."""
+
+    def __init__(self, slot_seconds: int, slots: int) -> None:
+        self._slot_seconds = slot_seconds
+        self._slots: list[tuple[int, _Aggregate] | None] = [None] * slots
+
+    def add(self, timestamp: float, latency_ms: float, citations: int, agent_ms: dict) -> None:
+        slot_id = int(timestamp // self._slot_seconds)
+        position = slot_id % len(self._slots)
+        current = self._slots[position]
+        if current is None or current[0] != slot_id:
+            current = (slot_id, _Aggregate())
+            self._slots[position] = current
+        current[1].add(latency_ms, citations, agent_ms)
+
+    def window(self, now: float, seconds: int) -> _Aggregate:
+        """Merge the slots overlapping the last ``seconds`` (whole slots, so approximate)."""
+        newest = int(now // self._slot_seconds)
+        oldest = newest - seconds // self._slot_seconds + 1
+        merged = _Aggregate()
+        for entry in self._slots:
+            if entry is not None and oldest <= entry[0] <= newest:
+                merged.merge(entry[1])
+        return merged
+
+
 class SessionTracker:
-    """Thread-safe singleton for tracking session-level analytics."""
+    """Thread-safe singleton for tracking session-level analytics.
+
+    Memory is bounded: the last ``_RECENT_QUERIES`` queries are kept in a
+    ring buffer, and latencies go into DDSketches (overall, per agent, and
+    per minute/hour slot for the 5m/1h/24h windows). ``get_stats`` reads
+    those sketches, so its cost does not grow with the number of queries.
+    """
 
     _instance = None
     _lock = threading.Lock()
@@ -26,11 +109,18 @@ class SessionTracker:
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
-                cls._instance._records: list[QueryRecord] = []
-                cls._instance._agent_invocations: dict[str, int] = defaultdict(int)
-                cls._instance._agent_total_ms: dict[str, float] = defaultdict(float)
+                cls._instance._reset_state()
         return cls._instance
 
+    def _reset_state(self) -> None:
+        self._recent: deque[QueryRecord] = deque(maxlen=_RECENT_QUERIES)
+        self._overall = _Aggregate()
+        self._rings = {"minute": _SlotRing(60, 60), "hour": _SlotRing(3600, 24)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_state()
+
     def record_query(
         self,
         question: str,
@@ -38,7 +128,14 @@ class SessionTracker:
         latency_ms: float,
         citation_count: int,
         agents_used: list[str],
+        timestamp: float | None = None,
+        agent_ms: dict[str, float] | None = None,
     ) -> None:
+        """Record one answered query.
+
+        ``agent_ms`` holds measured milliseconds per agent (from the request's
+        trace); without it the latency is split evenly across ``agents_used``.
+        """
         record = QueryRecord(
             question=question,
             repo_id=repo_id,
@@ -46,49 +143,33 @@ class SessionTracker:
             citation_count=citation_count,
             agents_used=agents_used,
         )
+        if timestamp is not None:
+            record.timestamp = timestamp
+        if agent_ms is None:
+            share = latency_ms / max(len(agents_used), 1)
+            agent_ms = {agent: share for agent in agents_used}
         with self._lock:
-            self._records.append(record)
-            for agent in agents_used:
-                self._agent_invocations[agent] += 1
-                self._agent_total_ms[agent] += latency_ms / max(len(agents_used), 1)
+            self._recent.append(record)
+            self._overall.add(latency_ms, citation_count, agent_ms)
+            for ring in self._rings.values():
+                ring.add(record.timestamp, latency_ms, citation_count, agent_ms)
 
-    def get_stats(self) -> dict:
+    def get_stats(self, now: float | None = None) -> dict:
+        now = time.time() if now is None else now
         with self._lock:
-            records = list(self._records)
-            agent_usage = dict(self._agent_invocations)
-            agent_ms = dict(self._agent_total_ms)
-
-        if not records:
-            return {
-                "total_queries": 0,
-                "avg_latency_ms": 0,
-                "p95_latency_ms": 0,
-                "avg_citations": 0,
-                "agent_usage": {},
-                "recent_queries": [],
+            overall = self._overall.summary()
+            agent_usage = self._overall.agent_summary()
+            windows = {
+                name: self._rings[ring].window(now, seconds).summary()
+                for name, (ring, seconds) in _WINDOWS.items()
             }
-
-        latencies = sorted(r.latency_ms for r in records)
-        p95_idx = min(int(len(latencies) * 0.95), len(latencies) - 1)
+            recent = list(self._recent)[-20:]
 
         return {
-            "total_queries": len(records),
-            "avg_latency_ms": round(sum(latencies) / len(latencies), 1),
-            "p95_latency_ms": round(latencies[p95_idx], 1),
-            "avg_citations": round(
-                sum(r.citation_count for r in records) / len(records), 1
-            ),
-            "agent_usage": {
-                agent: {
-                    "invocations": agent_usage.get(agent, 0),
-                    "avg_time_ms": round(
-                        agent_ms.get(agent, 0)
-                        / max(agent_usage.get(agent, 1), 1),
-                        1,
-                    ),
-                }
-                for agent in agent_usage
-            },
+            "total_queries": overall.pop("queries"),
+            **overall,
+            "agent_usage": agent_usage,
+            "windows": windows,
             "recent_queries": [
                 {
                     "question": r.question[:120],
@@ -96,7 +177,7 @@ class SessionTracker:
                     "citations": r.citation_count,
                     "timestamp": r.timestamp,
                 }
-                for r in records[-20:]
+                for r in recent
             ],
         }
 
@@ -6,7 +6,15 @@ class AskRequest(BaseModel):
     question: str
 
 
+class StepTokens(BaseModel):
+    step_id: str
+    agent: str
+    prompt_tokens: int
+    output_tokens: int
+
+
 class AskResponse(BaseModel):
     answer: str
     citations: list[str]
     reasoning_steps: list[str]
+    step_tokens: list[StepTokens] = []
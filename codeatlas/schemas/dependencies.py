@@ -25,3 +25,36 @@ class GraphEdge(BaseModel):
 class GraphResponse(BaseModel):
     nodes: list[str]
     edges: list[GraphEdge]
+
+
+class DependencyMetricsRequest(BaseModel):
+    repo_id: str
+    limit: int = 20
+
+
+class RankedNode(BaseModel):
+    node: str
+    value: float
+
+
+class PackageMetrics(BaseModel):
+    package: str
+    files: int
+    internal_edges: int
+    afferent: int
+    efferent: int
+    external_imports: int
+    instability: float
+
+
+class DependencyMetricsResponse(BaseModel):
+    node_count: int
+    edge_count: int
+    internal_edge_count: int
+    most_imported: list[RankedNode]
+    most_importing: list[RankedNode]
+    pagerank: list[RankedNode]
+    cycle_count: int
+    cycles: list[list[str]]
+    layers: list[list[str]]
+    packages: list[PackageMetrics]
@@ -1,14 +1,21 @@
-from langchain_core.language_models import BaseChatModel
-from langchain_core.prompts import ChatPromptTemplate
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, AsyncIterator
 
 from codeatlas.services.agents.interfaces import Agent
-from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.llm.interfaces import cache_config
+from codeatlas.services.qa.answer_service import AnswerService, RetrievedContext
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
 
 
 class CodingMentorAgent(Agent):
     def __init__(self, answer_service: AnswerService, llm: BaseChatModel) -> None:
         self._answer_service = answer_service
         self._llm = llm
+        from langchain_core.prompts import ChatPromptTemplate
+
         self._prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -25,22 +32,101 @@ class CodingMentorAgent(Agent):
             ]
         )
 
-    def run(self, prompt: str, repo_id: str | None = None) -> str:
+    def run(
+        self,
+        prompt: str,
+        repo_id: str | None = None,
+        retrieved: RetrievedContext | None = None,
+        notes: list[str] | None = None,
+    ) -> str:
+        """Answer ``prompt``; pass ``retrieved`` to reuse context the caller already fetched.
+
+        ``notes`` are saved memories relevant to the question, added to the context.
+        """
         if not repo_id:
             return "Error: repo_id is required for coding assistance."
 
-        # 1. Retrieve relevant context
-        # We assume the prompt is the question/goal
-        retrieval = self._answer_service.answer(repo_id=repo_id, question=prompt, top_k=3)
-        
-        context_str = ""
-        if retrieval.citations:
-             context_str = f"Found relevant code:\n{retrieval.answer}\n\nCitations:\n" + "\n".join(retrieval.citations)
-        else:
-             context_str = "No relevant code found in the repository index."
+        # Generate advice from the retrieved context
+        chain = self._prompt | self._llm
+        response = chain.invoke(
+            self._inputs(prompt, repo_id, retrieved, notes), config=cache_config(prompt)
+        )
+
+        return response.content
+
+    async def arun(
+        self,
+        prompt: str,
+        repo_id: str | None = None,
+        retrieved: RetrievedContext | None = None,
+        notes: list[str] | None = None,
+    ) -> str:
+        if not repo_id:
+            return "Error: repo_id is required for coding assistance."
 
-        # 2. Generate advice
         chain = self._prompt | self._llm
-        response = chain.invoke({"goal": prompt, "context": context_str})
-        
+        response = await chain.ainvoke(
+            await self._ainputs(prompt, repo_id, retrieved, notes), config=cache_config(prompt)
+        )
         return response.content
+
+    async def astream(
+        self,
+        prompt: str,
+        repo_id: str | None = None,
+        retrieved: RetrievedContext | None = None,
+        notes: list[str] | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream LLM tokens as they are generated."""
+        if not repo_id:
+            yield "Error: repo_id is required for coding assistance."
+            return
+
+        inputs = await self._ainputs(prompt, repo_id, retrieved, notes)
+        chain = self._prompt | self._llm
+        async for chunk in chain.astream(inputs, config=cache_config(prompt)):
+            token = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            if token:
+                yield token
+
+    def _inputs(
+        self,
+        prompt: str,
+        repo_id: str,
+        retrieved: RetrievedContext | None,
+        notes: list[str] | None = None,
+    ) -> dict[str, str]:
+        if retrieved is None:
+            # Retrieval only: the snippets themselves, no LLM-written summary
+            retrieved = self._answer_service.retrieve(repo_id=repo_id, question=prompt, top_k=3)
+        return self._format_inputs(prompt, retrieved, notes)
+
+    async def _ainputs(
+        self,
+        prompt: str,
+        repo_id: str,
+        retrieved: RetrievedContext | None,
+        notes: list[str] | None = None,
+    ) -> dict[str, str]:
+        if retrieved is None:
+            retrieved = await self._answer_service.aretrieve(
+                repo_id=repo_id, question=prompt, top_k=3
+            )
+        return self._format_inputs(prompt, retrieved, notes)
+
+    @staticmethod
+    def _format_inputs(
+        prompt: str, retrieved: RetrievedContext, notes: list[str] | None = None
+    ) -> dict[str, str]:
+        if retrieved.citations:
+            context_str = (
+                f"Relevant code:\n{retrieved.context}\n\nCitations:\n"
+                + "\n".join(retrieved.citations)
+            )
+        else:
+            context_str = "No relevant code found in the repository index."
+        if notes:
+            context_str += "\n\nNotes saved earlier for this repo:\n" + "\n".join(
+                f"- {note}" for note in notes
+            )
+        return {"goal": prompt, "context": context_str}
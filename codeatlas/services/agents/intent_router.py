@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from codeatlas.observability.metrics import (
+    PLANNER_LATENCY,
+    PLANNER_ROUTER_DECISIONS,
+    PLANNER_ROUTER_HIT_RATIO,
+    PLANNER_ROUTER_SAVED_SECONDS,
+)
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.utils.similarity import best_match
+
+# Explicit save commands only; "Save files to S3?" or "Note: why ...?" are questions
+_SAVE_PREFIX = r"^\s*(remember that|remember:|note:|save (this )?note:?)\s*"
+
+# Ordered keyword rules: (intent, pattern, confidence)
+_RULES: List[tuple[str, re.Pattern[str], float]] = [
+    ("memory_save", re.compile(_SAVE_PREFIX + r"(?!.*\?\s*$)\S", re.I | re.S), 0.95),
+    ("memory_list", re.compile(r"\b(list|show)\b.*\b(notes|memories)\b", re.I), 0.95),
+    ("locate", re.compile(r"\bwhere\b.*\b(defined|declared|implemented|located|live|lives|is|are)\b", re.I), 0.9),
+    ("locate", re.compile(r"\b(find|locate)\b|\bwhich (file|module|class|function)\b", re.I), 0.85),
+    ("architecture", re.compile(r"\b(architecture|overview|structure|dependenc(y|ies)|depends on|imports?)\b", re.I), 0.85),
+    ("explain", re.compile(r"^\s*(what (does|do|is|are)|explain|describe|how does)\b", re.I), 0.85),
+]
+
+DEFAULT_EXAMPLES: Dict[str, List[str]] = {
+    "locate": [
+        "where is the login handler defined",
+        "which file contains the database connection setup",
+        "find the class that parses config files",
+        "where do we register the API routes",
+    ],
+    "explain": [
+        "what does the indexing service do",
+        "explain how the retry logic works",
+        "what is the purpose of this module",
+        "how does the cache invalidation work",
+    ],
+    "architecture": [
+        "give me an overview of the project structure",
+        "how are the packages organized",
+        "what are the main components and how do they interact",
+        "which modules depend on the storage layer",
+    ],
+}
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    intent: str
+    confidence: float
+    source: str
+    plan: Dict[str, Any]
+
+
+class IntentRouter:
+    """Cheap local classifier that produces plans for common intents.
+
+    Keyword rules are tried first; when no single intent matches, the question
+    embedding is compared against labelled examples. Questions below
+    ``min_confidence`` return ``None`` so the caller falls back to the LLM
+    planner.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingService | None = None,
+        min_confidence: float = 0.8,
+        examples: Dict[str, List[str]] | None = None,
+        assumed_planner_seconds: float = 1.0,
+    ) -> None:
+        self._embedder = embedder
+        self._min_confidence = min_confidence
+        self._examples = examples if examples is not None else DEFAULT_EXAMPLES
+        self._example_labels: List[str] = []
+        self._example_vectors: List[List[float]] | None = None
+        self._planner_seconds = assumed_planner_seconds
+        self._hits = 0
+        self._misses = 0
+        self._saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    def route(self, question: str) -> RouteDecision | None:
+        started = time.perf_counter()
+        decision = self._classify(question)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if decision is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                saved = max(0.0, self._planner_seconds - elapsed)
+                self._saved_seconds += saved
+                PLANNER_ROUTER_SAVED_SECONDS.inc(saved)
+            PLANNER_ROUTER_HIT_RATIO.set(self._hits / (self._hits + self._misses))
+        if decision is None:
+            PLANNER_ROUTER_DECISIONS.labels(outcome="miss", intent="none").inc()
+        else:
+            PLANNER_ROUTER_DECISIONS.labels(outcome="hit", intent=decision.intent).inc()
+            PLANNER_LATENCY.labels(source="router").observe(elapsed)
+        return decision
+
+    def observe_planner_latency(self, seconds: float) -> None:
+        """Record an LLM planner round trip; feeds the saved-latency estimate."""
+        PLANNER_LATENCY.labels(source="llm").observe(seconds)
+        with self._lock:
+            self._planner_seconds = 0.8 * self._planner_seconds + 0.2 * seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "saved_seconds": self._saved_seconds,
+            }
+
+    def _classify(self, question: str) -> RouteDecision | None:
+        matched = [(intent, confidence) for intent, pattern, confidence in _RULES if pattern.search(question)]
+        intents = {intent for intent, _ in matched}
+        if len(intents) == 1:
+            intent, confidence = matched[0]
+            if confidence >= self._min_confidence:
+                return RouteDecision(intent, confidence, "rule", self._plan_for(intent, question))
+
+        # Zero or conflicting rule matches: nearest labelled example decides
+        nearest = self._nearest_example(question)
+        if nearest is not None and nearest[1] >= self._min_confidence:
+            intent, similarity = nearest
+            return RouteDecision(intent, similarity, "embedding", self._plan_for(intent, question))
+        return None
+
+    def _nearest_example(self, question: str) -> tuple[str, float] | None:
+        if self._embedder is None or not self._examples:
+            return None
+        try:
+            vectors = self._ensure_example_vectors()
+            index, similarity = best_match(self._embedder.embed_query(question), vectors)
+        except Exception as e:
+            self._logger.warning("Intent embedding failed: %s", e)
+            return None
+        if index < 0:
+            return None
+        return self._example_labels[index], similarity
+
+    def _ensure_example_vectors(self) -> List[List[float]]:
+        with self._lock:
+            if self._example_vectors is None:
+                labels: List[str] = []
+                texts: List[str] = []
+                for intent, examples in self._examples.items():
+                    labels.extend([intent] * len(examples))
+                    texts.extend(examples)
+                self._example_vectors = self._embedder.embed_texts(texts)
+                self._example_labels = labels
+            return self._example_vectors
+
+    @staticmethod
+    def _plan_for(intent: str, question: str) -> Dict[str, Any]:
+        if intent == "memory_save":
+            content = re.sub(_SAVE_PREFIX, "", question, flags=re.I)
+            steps = [{"id": 1, "agent": "memory", "instruction": f"save: {content}", "depends_on": []}]
+        elif intent == "memory_list":
+            steps = [{"id": 1, "agent": "memory", "instruction": "list", "depends_on": []}]
+        elif intent == "architecture":
+            steps = [
+                {"id": 1, "agent": "retrieval", "instruction": question, "depends_on": []},
+                {"id": 2, "agent": "analyst", "instruction": question, "depends_on": []},
+                {"id": 3, "agent": "mentor", "instruction": question, "depends_on": [1, 2]},
+            ]
+        else:
+            steps = [
+                {"id": 1, "agent": "retrieval", "instruction": question, "depends_on": []},
+                {"id": 2, "agent": "mentor", "instruction": question, "depends_on": [1]},
+            ]
+        return {"steps": steps, "intent": intent}
@@ -1,7 +1,18 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class Agent(ABC):
     @abstractmethod
     def run(self, prompt: str, repo_id: str | None = None) -> str:
         raise NotImplementedError
+
+    async def arun(self, prompt: str, repo_id: str | None = None) -> str:
+        """Async ``run``; agents without a native async path run in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, prompt, repo_id)
+
+    async def astream(self, prompt: str, repo_id: str | None = None) -> AsyncIterator[str]:
+        """Yield the answer incrementally; agents without token streaming yield it whole."""
+        yield await self.arun(prompt, repo_id)
@@ -1,32 +1,60 @@
+import re
+import uuid
 from datetime import datetime
 from codeatlas.services.agents.interfaces import Agent
 from codeatlas.services.memory.interfaces import MemoryStore
 from codeatlas.models.agent_memory import AgentMemory
 
 
+def repo_scope(repo_id: str | None) -> str:
+    """Memory scope used for notes about ``repo_id``."""
+    return f"repo:{repo_id}" if repo_id else "global"
+
+
+_LIST_COMMAND = re.compile(r"^list(?:\s+page\s+(\d+))?$")
+
+
 class MemoryAgent(Agent):
-    def __init__(self, memory_store: MemoryStore) -> None:
+    def __init__(self, memory_store: MemoryStore, page_size: int = 10) -> None:
         self._memory_store = memory_store
+        self._page_size = page_size
 
     def run(self, prompt: str, repo_id: str | None = None) -> str:
         # Simple instruction parsing for MVP
-        # "save: <content>" or "list"
+        # "save: <content>", "list" or "list page <n>"
         if prompt.startswith("save:"):
             content = prompt[5:].strip()
             memory = AgentMemory(
-                memory_id=str(datetime.utcnow().timestamp()),
-                scope=f"repo:{repo_id}" if repo_id else "global",
+                memory_id=uuid.uuid4().hex,
+                scope=repo_scope(repo_id),
                 content=content,
                 created_at=datetime.utcnow(),
             )
             self._memory_store.save(memory)
             return "Memory saved."
         
-        if prompt == "list":
-            scope = f"repo:{repo_id}" if repo_id else "global"
-            memories = self._memory_store.list(scope)
-            if not memories:
-                return "No memories found."
-            return "\n".join([f"[{m.created_at}] {m.content}" for m in memories])
-
-        return "MemoryAgent commands: 'save: <text>' or 'list'"
+        list_command = _LIST_COMMAND.match(prompt.strip())
+        if list_command:
+            scope = repo_scope(repo_id)
+            page = max(1, int(list_command.group(1) or 1))
+            return self._list_page(scope, page)
+
+        return "MemoryAgent commands: 'save: <text>', 'list' or 'list page <n>'"
+
+    def _list_page(self, scope: str, page: int) -> str:
+        """One page of memories, newest first, with a pointer to the next page."""
+        total = self._memory_store.count(scope)
+        if not total:
+            return "No memories found."
+        offset = (page - 1) * self._page_size
+        memories = self._memory_store.recent(scope, limit=self._page_size, offset=offset)
+        if not memories:
+            return f"No memories on page {page}; there are {total} in total."
+        lines = [f"[{m.created_at}] {m.content}" for m in memories]
+        shown_to = offset + len(memories)
+        if shown_to < total:
+            lines.append(
+                f"Showing {offset + 1}-{shown_to} of {total} memories, newest first. "
+                f"Say 'list page {page + 1}' for older ones."
+            )
+        return "\n".join(lines)
@@ -1,35 +1,97 @@
+import asyncio
+import contextvars
 import json
 import logging
-from typing import TypedDict, Annotated, List, Dict, Any
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TypedDict, Annotated, AsyncIterator, List, Dict, Any
 from datetime import datetime
 
-from langgraph.graph import END, StateGraph
-
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.intent_router import IntentRouter
 from codeatlas.services.agents.interfaces import Agent
-from codeatlas.services.agents.types import AnswerResult, GenerateResult
+from codeatlas.services.agents.plan import PlanStep, execution_waves, parse_plan_steps
+from codeatlas.services.agents.plan_cache import PlanCache
+from codeatlas.services.agents.memory_agent import repo_scope
+from codeatlas.services.agents.step_context import (
+    StepContextManager,
+    StepRecord,
+    count_tokens,
+    split_at_tokens,
+    truncate_to_tokens,
+)
+from codeatlas.services.agents.validation import (
+    ValidationPolicy,
+    ValidationStats,
+    ValidationVerdict,
+    assess_answer,
+)
+from codeatlas.services.agents.retrieval_agent import RetrievalAgent
+from codeatlas.services.agents.types import AnswerResult, GenerateResult, StepTokenUsage
 from codeatlas.models.agent_memory import AgentMemory
+from codeatlas.observability.tracing import tracer
 from codeatlas.services.memory.interfaces import MemoryStore
+from codeatlas.services.qa.answer_service import RetrievedContext
+from codeatlas.utils.executors import run_blocking
+
+# Recalled notes are capped so the mentor prompt stays bounded as memory grows
+_NOTE_TOKENS = 120
 
 # Define the state for the graph
 class OrchestratorState(TypedDict):
     question: str
     repo_id: str
     plan: Dict[str, Any]
-    current_step_index: int
     results: List[str]
     final_answer: str
     validated: bool
     citations: List[str]
+    step_tokens: List[StepTokenUsage]
+
+
+@dataclass
+class _StepCall:
+    prompt: str
+    prompt_tokens: int
+    retrieved: RetrievedContext | None = None
+    notes: List[str] | None = None
+
+    def agent_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {}
+        if self.retrieved is not None:
+            kwargs["retrieved"] = self.retrieved
+        if self.notes:
+            kwargs["notes"] = self.notes
+        return kwargs
+
+
+@dataclass
+class _StepOutcome:
+    step: PlanStep
+    summary: str
+    elapsed_ms: float
+    wave: int
+    record: StepRecord | None = None
+    prompt_tokens: int = 0
+
 
 class AgentOrchestrator:
     def __init__(
         self,
         planner: Agent,
-        retrieval_agent: Agent,
+        retrieval_agent: RetrievalAgent,
         analyst_agent: Agent,
-        mentor_agent: Agent,
+        mentor_agent: CodingMentorAgent,
         memory_agent: Agent,
         memory_store: MemoryStore | None = None,
+        max_parallel_steps: int = 4,
+        intent_router: IntentRouter | None = None,
+        plan_cache: PlanCache | None = None,
+        validation_policy: ValidationPolicy | None = None,
+        step_token_budget: int = 1500,
+        memory_recall_k: int = 3,
+        executor: Executor | None = None,
     ) -> None:
         self._planner = planner
         self._retrieval_agent = retrieval_agent
@@ -37,23 +99,142 @@ class AgentOrchestrator:
         self._mentor_agent = mentor_agent
         self._memory_agent = memory_agent
         self._memory_store = memory_store
+        self._memory_recall_k = memory_recall_k
+        # Bounded pool for embedding and SQLite work on the async path
+        self._executor = executor
+        self._intent_router = intent_router
+        self._plan_cache = plan_cache
+        self._validation_policy = validation_policy or ValidationPolicy()
+        self._validation_stats = ValidationStats()
+        self._step_token_budget = step_token_budget
+        self._agents: Dict[str, Agent] = {
+            "retrieval": retrieval_agent,
+            "analyst": analyst_agent,
+            "mentor": mentor_agent,
+            "memory": memory_agent,
+        }
+        self._step_executor = ThreadPoolExecutor(
+            max_workers=max(1, max_parallel_steps), thread_name_prefix="plan-step"
+        )
         self._logger = logging.getLogger(__name__)
         
         self._graph = self._build_graph()
 
     def handle_question(self, question: str, repo_id: str) -> AnswerResult:
-        initial_state: OrchestratorState = {
+        final_state = self._graph.invoke(self._initial_state(question, repo_id))
+        return self._answer_result(final_state)
+
+    async def ahandle_question(self, question: str, repo_id: str) -> AnswerResult:
+        """Async ``handle_question``: LangGraph runs the async node variants."""
+        final_state = await self._graph.ainvoke(self._initial_state(question, repo_id))
+        return self._answer_result(final_state)
+
+    def handle_question_fast(self, question: str, repo_id: str) -> AnswerResult:
+        """Faster path: skip planner & validator, go straight retrieval → mentor.
+
+        Retrieval runs once without an LLM call and its context is handed to
+        the mentor, so the whole path costs one search and one LLM call.
+        """
+        # 1. Retrieve, and recall saved notes relevant to the question
+        retrieved = self._retrieve_context(question, repo_id)
+        notes = self._recall_notes(question, repo_id)
+
+        # 2. Mentor answers using context
+        try:
+            with tracer.span("agent.mentor", agent="mentor"):
+                answer = self._mentor_agent.run(question, repo_id, retrieved=retrieved, notes=notes)
+        except Exception as e:
+            self._logger.warning("Mentor failed: %s", e)
+            answer = f"Error generating answer: {e}"
+        return self._fast_result(answer, retrieved, notes)
+
+    async def ahandle_question_fast(self, question: str, repo_id: str) -> AnswerResult:
+        retrieved, notes = await asyncio.gather(
+            self._aretrieve_context(question, repo_id), self._arecall_notes(question, repo_id)
+        )
+        try:
+            with tracer.span("agent.mentor", agent="mentor"):
+                answer = await self._mentor_agent.arun(
+                    question, repo_id, retrieved=retrieved, notes=notes
+                )
+        except Exception as e:
+            self._logger.warning("Mentor failed: %s", e)
+            answer = f"Error generating answer: {e}"
+        return self._fast_result(answer, retrieved, notes)
+
+    async def astream_question_fast(
+        self, question: str, repo_id: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming fast path: citations as soon as retrieval finishes, then mentor tokens.
+
+        Yields SSE-ready events: ``citations``, ``status``, ``token`` and a final ``done``.
+        """
+        retrieved, notes = await asyncio.gather(
+            self._aretrieve_context(question, repo_id), self._arecall_notes(question, repo_id)
+        )
+        citations = retrieved.citations
+        yield {"type": "citations", "citations": citations}
+        yield {"type": "status", "content": "Generating answer..."}
+
+        with tracer.span("agent.mentor", agent="mentor"):
+            async for token in self._mentor_agent.astream(
+                question, repo_id, retrieved=retrieved, notes=notes
+            ):
+                yield {"type": "token", "content": token}
+
+        reasoning_steps = [
+            "Fast mode: retrieval + streamed mentor (skipped planner & validator).",
+            f"Retrieved {len(citations)} citations.",
+        ]
+        if notes:
+            reasoning_steps.append(f"Recalled {len(notes)} saved notes.")
+        yield {"type": "done", "citations": citations, "reasoning_steps": reasoning_steps}
+
+    def handle_generation(self, prompt: str, repo_id: str) -> GenerateResult:
+        """Generate code or example usage grounded in repo context."""
+        # 1. Retrieve relevant context and citations (no LLM call)
+        retrieved = self._retrieve_context(prompt, repo_id)
+        notes = self._recall_notes(prompt, repo_id)
+        # 2. Ask mentor to generate code/example using that context
+        try:
+            with tracer.span("agent.mentor", agent="mentor"):
+                mentor_output = self._mentor_agent.run(
+                    self._generation_prompt(prompt), repo_id, retrieved=retrieved, notes=notes
+                )
+        except Exception as e:
+            self._logger.warning("Generation failed: %s", e)
+            mentor_output = f"Generation failed: {e}"
+        return self._generate_result(mentor_output, retrieved.citations)
+
+    async def ahandle_generation(self, prompt: str, repo_id: str) -> GenerateResult:
+        retrieved, notes = await asyncio.gather(
+            self._aretrieve_context(prompt, repo_id), self._arecall_notes(prompt, repo_id)
+        )
+        try:
+            with tracer.span("agent.mentor", agent="mentor"):
+                mentor_output = await self._mentor_agent.arun(
+                    self._generation_prompt(prompt), repo_id, retrieved=retrieved, notes=notes
+                )
+        except Exception as e:
+            self._logger.warning("Generation failed: %s", e)
+            mentor_output = f"Generation failed: {e}"
+        return self._generate_result(mentor_output, retrieved.citations)
+
+    @staticmethod
+    def _initial_state(question: str, repo_id: str) -> OrchestratorState:
+        return {
             "question": question,
             "repo_id": repo_id,
             "plan": {},
-            "current_step_index": 0,
             "results": [],
             "final_answer": "",
             "validated": False,
             "citations": [],
+            "step_tokens": [],
         }
-        final_state = self._graph.invoke(initial_state)
-        
+
+    @staticmethod
+    def _answer_result(final_state: OrchestratorState) -> AnswerResult:
         # Construct the final result from the state
         reasoning = [f"Plan: {json.dumps(final_state.get('plan', {}))}"]
         reasoning.extend(final_state.get("results", []))
@@ -62,56 +243,33 @@ class AgentOrchestrator:
             answer=final_state.get("final_answer", "No answer generated."),
             citations=final_state.get("citations", []),
             reasoning_steps=reasoning,
+            step_tokens=final_state.get("step_tokens", []),
         )
 
-    def handle_question_fast(self, question: str, repo_id: str) -> AnswerResult:
-        """Faster path: skip planner & validator, go straight retrieval → mentor."""
-        # 1. Retrieve
-        try:
-            retrieval_output = self._retrieval_agent.run(question, repo_id)
-        except Exception as e:
-            self._logger.warning("Retrieval failed: %s", e)
-            retrieval_output = ""
-        citations = self._parse_citations_from_retrieval_output(retrieval_output)
-
-        # 2. Mentor answers using context
-        mentor_prompt = (
-            f"{question}\n\nRetrieved context:\n{retrieval_output}"
-            if retrieval_output
-            else question
-        )
-        try:
-            answer = self._mentor_agent.run(mentor_prompt, repo_id)
-        except Exception as e:
-            self._logger.warning("Mentor failed: %s", e)
-            answer = f"Error generating answer: {e}"
-
+    @staticmethod
+    def _fast_result(
+        answer: str, retrieved: RetrievedContext, notes: List[str] | None = None
+    ) -> AnswerResult:
+        reasoning_steps = [
+            "Fast mode: retrieval + mentor (skipped planner & validator).",
+            f"Retrieved {len(retrieved.citations)} citations.",
+        ]
+        if notes:
+            reasoning_steps.append(f"Recalled {len(notes)} saved notes.")
         return AnswerResult(
-            answer=answer,
-            citations=citations,
-            reasoning_steps=[
-                "Fast mode: retrieval + mentor (skipped planner & validator).",
-                f"Retrieved {len(citations)} citations.",
-            ],
+            answer=answer, citations=retrieved.citations, reasoning_steps=reasoning_steps
         )
 
-    def handle_generation(self, prompt: str, repo_id: str) -> GenerateResult:
-        """Generate code or example usage grounded in repo context."""
-        # 1. Retrieve relevant context and citations
-        retrieval_output = self._retrieval_agent.run(prompt, repo_id)
-        citations = self._parse_citations_from_retrieval_output(retrieval_output)
-        # 2. Ask mentor to generate code/example using that context
-        gen_prompt = (
+    @staticmethod
+    def _generation_prompt(prompt: str) -> str:
+        return (
             f"Generate code or example usage for the following goal. "
             f"Use the retrieved code context and follow existing patterns. "
             f"Output the code in a clear block; then add brief notes if needed.\n\nGoal: {prompt}"
         )
-        full_prompt = f"{gen_prompt}\n\nContext from retrieval:\n{retrieval_output}"
-        try:
-            mentor_output = self._mentor_agent.run(full_prompt, repo_id)
-        except Exception as e:
-            self._logger.warning("Generation failed: %s", e)
-            mentor_output = f"Generation failed: {e}"
+
+    @staticmethod
+    def _generate_result(mentor_output: str, citations: List[str]) -> GenerateResult:
         # Treat full mentor response as diff; notes as single summary
         notes = ["Generated based on retrieved repo context."] if citations else []
         return GenerateResult(
@@ -120,6 +278,46 @@ class AgentOrchestrator:
             citations=citations,
         )
 
+    def _retrieve_context(self, question: str, repo_id: str) -> RetrievedContext:
+        try:
+            with tracer.span("agent.retrieval", agent="retrieval"):
+                return self._retrieval_agent.retrieve(question, repo_id)
+        except Exception as e:
+            return self._retrieval_failed(e)
+
+    async def _aretrieve_context(self, question: str, repo_id: str) -> RetrievedContext:
+        try:
+            with tracer.span("agent.retrieval", agent="retrieval"):
+                return await self._retrieval_agent.aretrieve(question, repo_id)
+        except Exception as e:
+            return self._retrieval_failed(e)
+
+    def _recall_notes(self, question: str, repo_id: str) -> List[str]:
+        """Saved notes for this repo most relevant to ``question``, each capped in size."""
+        if self._memory_store is None or self._memory_recall_k <= 0:
+            return []
+        try:
+            with tracer.span("memory.recall"):
+                memories = self._memory_store.recall(
+                    repo_scope(repo_id), question, self._memory_recall_k
+                )
+        except Exception as e:
+            self._logger.warning("Memory recall failed: %s", e)
+            return []
+        return [truncate_to_tokens(memory.content, _NOTE_TOKENS) for memory in memories]
+
+    async def _arecall_notes(self, question: str, repo_id: str) -> List[str]:
+        if self._memory_store is None or self._memory_recall_k <= 0:
+            return []
+        # Recall embeds the question
+        return await run_blocking(self._executor, self._recall_notes, question, repo_id)
+
+    def _retrieval_failed(self, error: Exception) -> RetrievedContext:
+        self._logger.warning("Retrieval failed: %s", error)
+        return RetrievedContext(
+            records=[], citations=[], context="", reasoning_steps=[f"Retrieval failed: {error}"]
+        )
+
     @staticmethod
     def _parse_citations_from_retrieval_output(text: str) -> List[str]:
         """Extract citation lines from retrieval agent output (e.g. 'Citations:\\n- ...')."""
@@ -134,94 +332,390 @@ class AgentOrchestrator:
         return citations
         
     def _build_graph(self):
+        from langgraph.graph import END, StateGraph
+
         graph = StateGraph(OrchestratorState)
         
-        graph.add_node("planner", self._plan_node)
-        graph.add_node("dispatcher", self._dispatcher_node)
-        graph.add_node("retrieval", self._retrieval_node)
-        graph.add_node("analyst", self._analyst_node)
-        graph.add_node("mentor", self._mentor_node)
-        graph.add_node("memory", self._memory_node)
-        graph.add_node("validator", self._validator_node)
+        # Each node has a sync and an async body; invoke/ainvoke pick the matching one
+        graph.add_node("planner", _traced_node("planner", self._plan_node, self._aplan_node))
+        graph.add_node(
+            "executor",
+            _traced_node("executor", self._execute_plan_node, self._aexecute_plan_node),
+        )
+        graph.add_node(
+            "validator", _traced_node("validator", self._validator_node, self._avalidator_node)
+        )
         
         graph.set_entry_point("planner")
         
-        graph.add_edge("planner", "dispatcher")
-        
-        # Dispatcher conditional edges
-        graph.add_conditional_edges(
-            "dispatcher",
-            self._route_step,
-            {
-                "retrieval": "retrieval",
-                "analyst": "analyst",
-                "mentor": "mentor",
-                "memory": "memory",
-                "validator": "validator",
-                "end": END
-            }
-        )
-        
-        # Return to dispatcher after each agent
-        graph.add_edge("retrieval", "dispatcher")
-        graph.add_edge("analyst", "dispatcher")
-        graph.add_edge("mentor", "dispatcher")
-        graph.add_edge("memory", "dispatcher")
-        graph.add_edge("validator", "dispatcher")
+        graph.add_edge("planner", "executor")
+        graph.add_edge("executor", "validator")
+        graph.add_edge("validator", END)
         
         return graph.compile()
 
-    # ... _plan_node, _dispatcher_node same ...
-
     def _plan_node(self, state: OrchestratorState) -> OrchestratorState:
         question = state["question"]
         repo_id = state["repo_id"]
+        plan = self._local_plan(question, repo_id)
+        if plan is None:
+            started = time.perf_counter()
+            try:
+                with tracer.span("agent.planner", agent="planner"):
+                    plan_str = self._planner.run(question, repo_id)
+            except Exception as e:
+                self._logger.error(f"Planning failed: {e}")
+                plan_str = None
+            plan = self._accept_plan(question, repo_id, plan_str, started)
+        return {**state, "plan": plan}
+
+    async def _aplan_node(self, state: OrchestratorState) -> OrchestratorState:
+        question = state["question"]
+        repo_id = state["repo_id"]
+        # The router and plan cache may embed the question
+        plan = await run_blocking(self._executor, self._local_plan, question, repo_id)
+        if plan is None:
+            started = time.perf_counter()
+            try:
+                with tracer.span("agent.planner", agent="planner"):
+                    plan_str = await self._planner.arun(question, repo_id)
+            except Exception as e:
+                self._logger.error(f"Planning failed: {e}")
+                plan_str = None
+            plan = self._accept_plan(question, repo_id, plan_str, started)
+        return {**state, "plan": plan}
+
+    def _local_plan(self, question: str, repo_id: str) -> Dict[str, Any] | None:
+        """A plan from the intent router or the plan cache, without an LLM call."""
+        if self._intent_router is not None:
+            decision = self._intent_router.route(question)
+            if decision is not None:
+                return decision.plan
+        if self._plan_cache is not None:
+            return self._plan_cache.get(question, repo_id)
+        return None
+
+    def _accept_plan(
+        self, question: str, repo_id: str, plan_str: str | None, started: float
+    ) -> Dict[str, Any]:
+        if plan_str is not None:
+            if self._intent_router is not None:
+                self._intent_router.observe_planner_latency(time.perf_counter() - started)
+            try:
+                plan = json.loads(plan_str)
+                if self._plan_cache is not None:
+                    self._plan_cache.put(question, repo_id, plan)
+                return plan
+            except Exception as e:
+                self._logger.error(f"Planning failed: {e}")
+        # Fallback plan
+        return {"steps": [{"id": 1, "agent": "retrieval", "instruction": question}]}
+
+    def _execute_plan_node(self, state: OrchestratorState) -> OrchestratorState:
+        """Run the plan as a DAG: each wave of independent steps runs concurrently."""
+        steps = parse_plan_steps(state["plan"])
+        waves = execution_waves(steps)
+        repo_id = state["repo_id"]
+        needed = {dep for step in steps for dep in step.depends_on}
+        context = StepContextManager(token_budget=self._step_token_budget)
+        outcomes: Dict[str, _StepOutcome] = {}
+        notes = []
+        if any(step.agent == "mentor" for step in steps):
+            notes = self._recall_notes(state["question"], repo_id)
+
+        started = time.perf_counter()
+        for wave_number, wave in enumerate(waves, start=1):
+            def run(step: PlanStep) -> _StepOutcome:
+                return self._run_step(
+                    step, context, repo_id, wave_number, step.step_id in needed, notes
+                )
+
+            if len(wave) == 1:
+                finished = [run(wave[0])]
+            else:
+                # Each step gets its own copy of the context so its spans nest under the node
+                contexts = [contextvars.copy_context() for _ in wave]
+                finished = list(
+                    self._step_executor.map(lambda ctx, step: ctx.run(run, step), contexts, wave)
+                )
+            self._record_wave(finished, outcomes, context)
+        wall_ms = (time.perf_counter() - started) * 1000
+        return self._collect_outcomes(state, steps, len(waves), outcomes, wall_ms, notes)
+
+    async def _aexecute_plan_node(self, state: OrchestratorState) -> OrchestratorState:
+        """Async DAG execution: the steps of a wave are gathered on the event loop."""
+        steps = parse_plan_steps(state["plan"])
+        waves = execution_waves(steps)
+        repo_id = state["repo_id"]
+        needed = {dep for step in steps for dep in step.depends_on}
+        context = StepContextManager(token_budget=self._step_token_budget)
+        outcomes: Dict[str, _StepOutcome] = {}
+        notes = []
+        if any(step.agent == "mentor" for step in steps):
+            notes = await self._arecall_notes(state["question"], repo_id)
+
+        started = time.perf_counter()
+        for wave_number, wave in enumerate(waves, start=1):
+            finished = await asyncio.gather(
+                *(
+                    self._arun_step(
+                        step, context, repo_id, wave_number, step.step_id in needed, notes
+                    )
+                    for step in wave
+                )
+            )
+            self._record_wave(finished, outcomes, context)
+        wall_ms = (time.perf_counter() - started) * 1000
+        return self._collect_outcomes(state, steps, len(waves), outcomes, wall_ms, notes)
+
+    @staticmethod
+    def _record_wave(
+        finished: List[_StepOutcome],
+        outcomes: Dict[str, _StepOutcome],
+        context: StepContextManager,
+    ) -> None:
+        for outcome in finished:
+            outcomes[outcome.step.step_id] = outcome
+            if outcome.record is not None:
+                context.add(outcome.record)
+
+    def _collect_outcomes(
+        self,
+        state: OrchestratorState,
+        steps: List[PlanStep],
+        wave_count: int,
+        outcomes: Dict[str, _StepOutcome],
+        wall_ms: float,
+        notes: List[str],
+    ) -> OrchestratorState:
+        results = list(state["results"])
+        citations = list(state.get("citations", []))
+        step_tokens = list(state.get("step_tokens", []))
+        final_answer = state["final_answer"]
+        for step in steps:
+            outcome = outcomes[step.step_id]
+            results.append(
+                f"Step {step.step_id} ({step.agent}, wave {outcome.wave}, "
+                f"{outcome.elapsed_ms:.0f} ms, {outcome.prompt_tokens} prompt tokens): "
+                f"{outcome.summary}"
+            )
+            if outcome.record is not None:
+                final_answer = outcome.record.text
+                citations.extend(outcome.record.citations)
+                step_tokens.append(
+                    StepTokenUsage(
+                        step_id=step.step_id,
+                        agent=step.agent,
+                        prompt_tokens=outcome.prompt_tokens,
+                        output_tokens=outcome.record.tokens,
+                    )
+                )
+        if outcomes:
+            serial_ms = sum(outcome.elapsed_ms for outcome in outcomes.values())
+            results.append(
+                f"Executed {len(outcomes)} steps in {wave_count} waves: "
+                f"{wall_ms:.0f} ms wall clock, {serial_ms:.0f} ms summed step time."
+            )
+        if notes:
+            results.append(f"Recalled {len(notes)} saved notes for the mentor.")
+
+        return {
+            **state,
+            "results": results,
+            "final_answer": final_answer,
+            "citations": list(dict.fromkeys(citations)),
+            "step_tokens": step_tokens,
+        }
+
+    def _run_step(
+        self,
+        step: PlanStep,
+        context: StepContextManager,
+        repo_id: str,
+        wave: int,
+        has_dependents: bool,
+        notes: List[str],
+    ) -> _StepOutcome:
+        started = time.perf_counter()
+        agent = self._agents.get(step.agent)
+        if agent is None:
+            return _StepOutcome(step, f"Skipped: unknown agent '{step.agent}'.", 0.0, wave)
+
+        # Retrieval feeding later steps hands over records and citations, not prose
+        if has_dependents and isinstance(agent, RetrievalAgent):
+            retrieved = self._retrieve_context(step.instruction, repo_id)
+            return self._retrieval_outcome(step, retrieved, started, wave)
+
+        call = self._prepare_call(step, agent, context, notes)
         try:
-            plan_str = self._planner.run(question, repo_id)
-            plan = json.loads(plan_str)
+            with tracer.span(f"agent.{step.agent}", agent=step.agent, step=step.step_id):
+                output = agent.run(call.prompt, repo_id, **call.agent_kwargs())
         except Exception as e:
-            self._logger.error(f"Planning failed: {e}")
-            # Fallback plan
-            plan = {"steps": [{"agent": "retrieval", "instruction": question}]}
-        
-        return {**state, "plan": plan, "current_step_index": 0}
+            output = f"Error executing {step.agent}: {e}"
+        return self._step_outcome(step, call, output, started, wave)
 
-    def _dispatcher_node(self, state: OrchestratorState) -> OrchestratorState:
-        # Passthrough node (logic in _route_step), but can be used for logging
-        return state
+    async def _arun_step(
+        self,
+        step: PlanStep,
+        context: StepContextManager,
+        repo_id: str,
+        wave: int,
+        has_dependents: bool,
+        notes: List[str],
+    ) -> _StepOutcome:
+        started = time.perf_counter()
+        agent = self._agents.get(step.agent)
+        if agent is None:
+            return _StepOutcome(step, f"Skipped: unknown agent '{step.agent}'.", 0.0, wave)
 
-    def _route_step(self, state: OrchestratorState) -> str:
-        steps = state["plan"].get("steps", [])
-        idx = state["current_step_index"]
-        
-        if idx >= len(steps):
-             if not state.get("validated"):
-                 return "validator"
-             return "end"
-            
-        step = steps[idx]
-        agent_name = step.get("agent", "retrieval").lower()
-        
-        if agent_name in ["retrieval", "analyst", "mentor", "memory"]:
-            return agent_name
-        return "end"
+        if has_dependents and isinstance(agent, RetrievalAgent):
+            retrieved = await self._aretrieve_context(step.instruction, repo_id)
+            return self._retrieval_outcome(step, retrieved, started, wave)
+
+        call = self._prepare_call(step, agent, context, notes)
+        try:
+            with tracer.span(f"agent.{step.agent}", agent=step.agent, step=step.step_id):
+                output = await agent.arun(call.prompt, repo_id, **call.agent_kwargs())
+        except Exception as e:
+            output = f"Error executing {step.agent}: {e}"
+        return self._step_outcome(step, call, output, started, wave)
 
-    # ... _execute_agent same ...
+    @staticmethod
+    def _retrieval_outcome(
+        step: PlanStep, retrieved: RetrievedContext, started: float, wave: int
+    ) -> _StepOutcome:
+        record = StepRecord(
+            step_id=step.step_id,
+            agent=step.agent,
+            text=retrieved.context,
+            citations=list(retrieved.citations),
+            retrieved=retrieved,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        summary = f"Retrieved {len(retrieved.records)} snippets ({record.tokens} tokens)."
+        return _StepOutcome(step, summary, elapsed_ms, wave, record=record)
+
+    @staticmethod
+    def _prepare_call(
+        step: PlanStep, agent: Agent, context: StepContextManager, notes: List[str]
+    ) -> _StepCall:
+        # The mentor takes retrieved code and recalled notes directly, the rest
+        # goes into the prompt
+        handed_over = None
+        mentor_notes = None
+        if isinstance(agent, CodingMentorAgent):
+            handed_over = context.retrieval_record(step.depends_on)
+            mentor_notes = notes or None
+        retrieved = handed_over.retrieved if handed_over is not None else None
+        rendered = context.render(
+            step.depends_on, exclude=[handed_over.step_id] if handed_over is not None else []
+        )
+        if rendered:
+            full_prompt = f"{step.instruction}\n\nContext from previous steps:\n{rendered}"
+        else:
+            full_prompt = step.instruction
+        prompt_tokens = count_tokens(full_prompt)
+        if retrieved is not None:
+            prompt_tokens += count_tokens(retrieved.context)
+        if mentor_notes:
+            prompt_tokens += sum(count_tokens(note) for note in mentor_notes)
+        return _StepCall(full_prompt, prompt_tokens, retrieved, mentor_notes)
+
+    def _step_outcome(
+        self, step: PlanStep, call: _StepCall, output: str, started: float, wave: int
+    ) -> _StepOutcome:
+        if call.retrieved is not None:
+            citations = list(call.retrieved.citations)
+        elif step.agent == "retrieval":
+            citations = self._parse_citations_from_retrieval_output(output)
+        else:
+            citations = []
+        record = StepRecord(step_id=step.step_id, agent=step.agent, text=output, citations=citations)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return _StepOutcome(
+            step, output, elapsed_ms, wave, record=record, prompt_tokens=call.prompt_tokens
+        )
 
     def _validator_node(self, state: OrchestratorState) -> OrchestratorState:
         # Simple validation: "Does this answer the question?"
         # We reuse the Mentor Agent for this reflective task
-        question = state["question"]
-        current_answer = state["final_answer"]
-        repo_id = state["repo_id"]
-        
-        if not current_answer:
-             return {**state, "validated": True}
+        verdict = assess_answer(
+            self._validation_policy, state["final_answer"], state.get("citations", [])
+        )
+        if not verdict.review:
+            return self._skip_validation(state, verdict)
+
+        started = time.perf_counter()
+        prompt, unreviewed = self._review_prompt(state)
+        try:
+             # The MentorAgent is styled as a senior engineer, good for review
+             with tracer.span("agent.validator", agent="validator"):
+                 refined_answer = self._mentor_agent.run(prompt, state["repo_id"])
+             refined_answer = _append_unreviewed(refined_answer, unreviewed)
+        except Exception:
+             refined_answer = state["final_answer"]
+        return self._reviewed(state, verdict, refined_answer, started)
+
+    async def _avalidator_node(self, state: OrchestratorState) -> OrchestratorState:
+        verdict = assess_answer(
+            self._validation_policy, state["final_answer"], state.get("citations", [])
+        )
+        if not verdict.review:
+            return self._skip_validation(state, verdict)
+
+        started = time.perf_counter()
+        prompt, unreviewed = self._review_prompt(state)
+        try:
+            with tracer.span("agent.validator", agent="validator"):
+                refined_answer = await self._mentor_agent.arun(prompt, state["repo_id"])
+            refined_answer = _append_unreviewed(refined_answer, unreviewed)
+        except Exception:
+            refined_answer = state["final_answer"]
+        return self._reviewed(state, verdict, refined_answer, started)
 
+    def _skip_validation(self, state: OrchestratorState, verdict: ValidationVerdict) -> OrchestratorState:
+        self._validation_stats.record_skip(verdict.reason)
+        note = f"Validation: skipped ({verdict.detail or verdict.reason})."
+        return {**state, "validated": True, "results": state["results"] + [note]}
+
+    def _reviewed(
+        self,
+        state: OrchestratorState,
+        verdict: ValidationVerdict,
+        refined_answer: str,
+        started: float,
+    ) -> OrchestratorState:
+        self._validation_stats.record_review(verdict.reason, time.perf_counter() - started)
+        note = f"Validation: refined answer ({verdict.detail or verdict.reason})."
+        return {
+            **state,
+            "final_answer": refined_answer,
+            "validated": True,
+            "results": state["results"] + [note],
+        }
+
+    def _review_prompt(self, state: OrchestratorState) -> tuple[str, str]:
+        """Reviewer prompt within the policy's token budget, and the answer tail left out.
+
+        The question gets at most a quarter of the budget and the answer the
+        rest; an answer cut short is reviewed on its leading lines and the
+        remainder is appended to the refined text unchanged.
+        """
+        budget = self._validation_policy.token_budget
+        question = truncate_to_tokens(state["question"], max(budget // 4, 1))
+        answer, unreviewed = split_at_tokens(
+            state["final_answer"], max(budget - count_tokens(question), 0)
+        )
+        note = (
+            "The answer continues beyond this excerpt; refine only the excerpt.\n"
+            if unreviewed
+            else ""
+        )
         prompt = (
             f"You are a quality reviewer. Your job is to refine an answer.\n"
             f"User Question: {question}\n"
-            f"Proposed Answer: {current_answer}\n\n"
+            f"Proposed Answer: {answer}\n\n"
+            f"{note}"
             f"IMPORTANT: Return ONLY the final refined answer text. "
             f"Do NOT include any meta-commentary like 'The answer is correct' or 'I would return it as is'. "
             f"Do NOT repeat the citations section — citations are handled separately. "
@@ -229,61 +723,29 @@ class AgentOrchestrator:
             f"If it needs improvement, return the improved version. "
             f"Output ONLY the answer the user should see."
         )
-        
-        try:
-             # The MentorAgent is styled as a senior engineer, good for review
-             refined_answer = self._mentor_agent.run(prompt, repo_id)
-        except Exception:
-             refined_answer = current_answer
-             
-        return {
-            **state,
-            "final_answer": refined_answer,
-            "validated": True,
-            "results": state["results"] + [f"Validation: Refined answer."],
-        }
+        return prompt, unreviewed
+
+    def validation_stats(self) -> Dict[str, float]:
+        """Reviewed/skipped counts, skip rate and estimated reviewer seconds saved."""
+        return self._validation_stats.snapshot()
+
+
+def _append_unreviewed(refined: str, unreviewed: str) -> str:
+    if not unreviewed:
+        return refined
+    return refined.rstrip() + "\n" + unreviewed.lstrip("\n")
 
-    def _execute_agent(self, agent: Agent, state: OrchestratorState) -> OrchestratorState:
-        steps = state["plan"].get("steps", [])
-        idx = state["current_step_index"]
-        step = steps[idx]
-        
-        instruction = step.get("instruction", "")
-        repo_id = state["repo_id"]
-        
-        # Add context from previous results if available
-        context = "\n".join(state["results"])
-        if context:
-            full_prompt = f"{instruction}\n\nContext from previous steps:\n{context}"
-        else:
-            full_prompt = instruction
-            
-        try:
-            output = agent.run(full_prompt, repo_id)
-        except Exception as e:
-            output = f"Error executing {step.get('agent')}: {e}"
-            
-        new_results = state["results"] + [f"Step {idx+1} ({step.get('agent')}): {output}"]
-        new_citations = list(state.get("citations", []))
-        if agent is self._retrieval_agent:
-            new_citations.extend(self._parse_citations_from_retrieval_output(output))
-        
-        return {
-            **state,
-            "results": new_results,
-            "final_answer": output,
-            "current_step_index": idx + 1,
-            "citations": new_citations,
-        }
 
-    def _retrieval_node(self, state: OrchestratorState) -> OrchestratorState:
-        return self._execute_agent(self._retrieval_agent, state)
+def _traced_node(name: str, func, afunc):
+    """A graph node running ``func``/``afunc`` inside a ``node.<name>`` span."""
+    from langchain_core.runnables import RunnableLambda
 
-    def _analyst_node(self, state: OrchestratorState) -> OrchestratorState:
-        return self._execute_agent(self._analyst_agent, state)
+    def run(state: OrchestratorState) -> OrchestratorState:
+        with tracer.span(f"node.{name}"):
+            return func(state)
 
-    def _mentor_node(self, state: OrchestratorState) -> OrchestratorState:
-        return self._execute_agent(self._mentor_agent, state)
+    async def arun(state: OrchestratorState) -> OrchestratorState:
+        with tracer.span(f"node.{name}"):
+            return await afunc(state)
 
-    def _memory_node(self, state: OrchestratorState) -> OrchestratorState:
-        return self._execute_agent(self._memory_agent, state)
+    return RunnableLambda(run, afunc=arun, name=name)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+KNOWN_AGENTS = ("retrieval", "analyst", "mentor", "memory")
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    step_id: str
+    agent: str
+    instruction: str
+    depends_on: tuple[str, ...]
+    position: int
+
+
+def parse_plan_steps(plan: Dict[str, Any]) -> List[PlanStep]:
+    """Normalize the planner's JSON into ``PlanStep`` objects.
+
+    Steps without an ``id`` are numbered from 1. A step that omits
+    ``depends_on`` depends on the step before it, so plans written in the
+    older sequential format keep their ordering; ``"depends_on": []`` marks a
+    step as independent. References to unknown or later steps are dropped.
+    """
+    raw_steps = plan.get("steps", []) if isinstance(plan, dict) else []
+    steps: List[PlanStep] = []
+    seen: set[str] = set()
+    for position, raw in enumerate(raw_steps):
+        if not isinstance(raw, dict):
+            continue
+        step_id = str(raw.get("id", position + 1))
+        if step_id in seen:
+            step_id = f"{step_id}#{position + 1}"
+        if "depends_on" in raw:
+            deps = raw.get("depends_on") or []
+            if not isinstance(deps, list):
+                deps = [deps]
+            depends_on = tuple(str(dep) for dep in deps if str(dep) in seen)
+        else:
+            depends_on = (steps[-1].step_id,) if steps else ()
+        steps.append(
+            PlanStep(
+                step_id=step_id,
+                agent=str(raw.get("agent", "retrieval")).lower(),
+                instruction=str(raw.get("instruction", "")),
+                depends_on=depends_on,
+                position=position,
+            )
+        )
+        seen.add(step_id)
+    return steps
+
+
+def execution_waves(steps: List[PlanStep]) -> List[List[PlanStep]]:
+    """Group steps into topological layers; steps in one wave are independent.
+
+    Dependencies only ever point at earlier steps (see ``parse_plan_steps``),
+    so the graph is acyclic and every step lands one wave after its deepest
+    dependency.
+    """
+    level: Dict[str, int] = {}
+    waves: List[List[PlanStep]] = []
+    for step in steps:
+        depth = max((level[dep] + 1 for dep in step.depends_on if dep in level), default=0)
+        level[step.step_id] = depth
+        while len(waves) <= depth:
+            waves.append([])
+        waves[depth].append(step)
+    return waves
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import copy
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from codeatlas.observability.metrics import PLAN_CACHE_LOOKUPS
+from codeatlas.services.agents.plan import KNOWN_AGENTS, parse_plan_steps
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.utils.similarity import best_match
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace."""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", question.lower())).strip()
+
+
+def is_valid_plan(plan: Dict[str, Any]) -> bool:
+    """A plan is cacheable when it has steps, every step names a known agent
+    and it is not the planner's error fallback."""
+    if not isinstance(plan, dict) or plan.get("fallback"):
+        return False
+    steps = parse_plan_steps(plan)
+    return bool(steps) and all(step.agent in KNOWN_AGENTS for step in steps)
+
+
+def rebind_plan(plan: Dict[str, Any], question: str) -> Dict[str, Any] | None:
+    """``plan``'s step structure with every instruction set to ``question``.
+
+    Planner instructions paraphrase the question they were written for, so a
+    plan borrowed from a similar question keeps only its agents and
+    dependencies. Memory steps carry their own payload (the note to save), so
+    plans containing them are not reused.
+    """
+    rebound = copy.deepcopy(plan)
+    steps = rebound.get("steps", [])
+    for step in steps:
+        if not isinstance(step, dict) or str(step.get("agent", "")).lower() == "memory":
+            return None
+        step["instruction"] = question
+    return rebound
+
+
+@dataclass
+class PlanCacheEntry:
+    repo_id: str
+    question: str
+    plan: Dict[str, Any]
+    vector: List[float] | None
+    expires_at: float | None
+    hits: int = 0
+
+
+class PlanCache:
+    """LRU cache of parsed planner output keyed by (repo_id, normalized question).
+
+    With an embedder and a ``similarity_threshold`` above zero, a miss on the
+    exact key falls back to the most similar cached question for the same repo;
+    that plan is re-bound to the new question (see ``rebind_plan``).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float | None = None,
+        embedder: EmbeddingService | None = None,
+        similarity_threshold: float = 0.0,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._embedder = embedder
+        self._similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[tuple[str, str], PlanCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    def get(self, question: str, repo_id: str) -> Dict[str, Any] | None:
+        key = (repo_id, normalize_question(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and _expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                PLAN_CACHE_LOOKUPS.labels(outcome="hit").inc()
+                return copy.deepcopy(entry.plan)
+
+        entry = self._most_similar(question, repo_id)
+        plan = rebind_plan(entry.plan, question) if entry is not None else None
+        if plan is None:
+            PLAN_CACHE_LOOKUPS.labels(outcome="miss").inc()
+            return None
+        PLAN_CACHE_LOOKUPS.labels(outcome="similar").inc()
+        return plan
+
+    def put(self, question: str, repo_id: str, plan: Dict[str, Any]) -> bool:
+        """Store ``plan`` if it is valid; returns whether it was cached."""
+        if self._max_entries <= 0 or not is_valid_plan(plan):
+            return False
+        vector = self._embed(question) if self._similarity_threshold > 0 else None
+        expires_at = time.time() + self._ttl_seconds if self._ttl_seconds else None
+        key = (repo_id, normalize_question(question))
+        with self._lock:
+            self._entries[key] = PlanCacheEntry(
+                repo_id=repo_id,
+                question=key[1],
+                plan=copy.deepcopy(plan),
+                vector=vector,
+                expires_at=expires_at,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def entries(self) -> List[PlanCacheEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _most_similar(self, question: str, repo_id: str) -> PlanCacheEntry | None:
+        if self._similarity_threshold <= 0 or self._embedder is None:
+            return None
+        vector = self._embed(question)
+        if vector is None:
+            return None
+        with self._lock:
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry.repo_id == repo_id and entry.vector is not None and not _expired(entry)
+            ]
+        if not candidates:
+            return None
+        index, score = best_match(vector, [entry.vector for _, entry in candidates])
+        if index < 0 or score < self._similarity_threshold:
+            return None
+        key, entry = candidates[index]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            entry.hits += 1
+        return entry
+
+    def _embed(self, question: str) -> List[float] | None:
+        if self._embedder is None:
+            return None
+        try:
+            return self._embedder.embed_query(normalize_question(question))
+        except Exception as e:
+            self._logger.warning("Plan cache embedding failed: %s", e)
+            return None
+
+
+def _expired(entry: PlanCacheEntry) -> bool:
+    return entry.expires_at is not None and entry.expires_at <= time.time()
@@ -1,11 +1,18 @@
+from __future__ import annotations
+
 import json
-from langchain_core.language_models import BaseChatModel
-from langchain_core.prompts import ChatPromptTemplate
+from typing import TYPE_CHECKING
+
 from codeatlas.services.agents.interfaces import Agent
 
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
 class PlannerAgent(Agent):
     def __init__(self, llm: BaseChatModel | None = None) -> None:
         self._llm = llm
+        from langchain_core.prompts import ChatPromptTemplate
+
         self._prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -19,10 +26,14 @@ class PlannerAgent(Agent):
                     "- 'mentor': coding advice, refactoring, generating new code, 'how to fix X'.\n"
                     "- 'memory': saving or listing conversation notes.\n\n"
                     "Output a JSON object with a key 'steps', where each step is an object "
-                    "with 'agent' (string) and 'instruction' (string).\n"
+                    "with 'id' (integer), 'agent' (string), 'instruction' (string) and "
+                    "'depends_on' (list of ids of earlier steps whose output it needs). "
+                    "Steps with no dependency between them run in parallel, so only list "
+                    "real dependencies.\n"
                     "Example:\n"
-                    '{{"steps": [{{"agent": "retrieval", "instruction": "Find auth middleware"}}, '
-                    '{{"agent": "mentor", "instruction": "Explain how to add JWT based on retrieved code"}}]}}',
+                    '{{"steps": [{{"id": 1, "agent": "retrieval", "instruction": "Find auth middleware", "depends_on": []}}, '
+                    '{{"id": 2, "agent": "analyst", "instruction": "Summarize the modules auth depends on", "depends_on": []}}, '
+                    '{{"id": 3, "agent": "mentor", "instruction": "Explain how to add JWT based on retrieved code", "depends_on": [1, 2]}}]}}',
                 ),
                 ("human", "{question}"),
             ]
@@ -34,21 +45,46 @@ class PlannerAgent(Agent):
         # For now, we return the JSON string so the orchestrator can parse it.
         # Fallback for "explain" vs "answer" if no LLM
         if self._llm is None:
-            prompt_lower = prompt.lower()
-            if "explain" in prompt_lower or "overview" in prompt_lower:
-                return json.dumps({"steps": [{"agent": "analyst", "instruction": prompt}]})
-            return json.dumps({"steps": [{"agent": "retrieval", "instruction": prompt}]})
+            return self._offline_plan(prompt)
 
         try:
             chain = self._prompt | self._llm
             response = chain.invoke({"question": prompt})
-            # Naively try to parse JSON to ensure it's valid, then return the string
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:-3].strip()
-            elif content.startswith("```"):
-                content = content[3:-3].strip()
-            return content
+            return self._strip_fences(response.content)
+        except Exception:
+            return self._fallback_plan(prompt)
+
+    async def arun(self, prompt: str, repo_id: str | None = None) -> str:
+        if self._llm is None:
+            return self._offline_plan(prompt)
+
+        try:
+            chain = self._prompt | self._llm
+            response = await chain.ainvoke({"question": prompt})
+            return self._strip_fences(response.content)
         except Exception:
-            # Fallback
-            return json.dumps({"steps": [{"agent": "retrieval", "instruction": prompt}]})
+            return self._fallback_plan(prompt)
+
+    @staticmethod
+    def _offline_plan(prompt: str) -> str:
+        prompt_lower = prompt.lower()
+        if "explain" in prompt_lower or "overview" in prompt_lower:
+            return json.dumps({"steps": [{"agent": "analyst", "instruction": prompt}]})
+        return json.dumps({"steps": [{"agent": "retrieval", "instruction": prompt}]})
+
+    @staticmethod
+    def _strip_fences(content: str) -> str:
+        # Naively try to parse JSON to ensure it's valid, then return the string
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:-3].strip()
+        elif content.startswith("```"):
+            content = content[3:-3].strip()
+        return content
+
+    @staticmethod
+    def _fallback_plan(prompt: str) -> str:
+        # Fallback; flagged so it is never cached as a real plan
+        return json.dumps(
+            {"steps": [{"agent": "retrieval", "instruction": prompt}], "fallback": True}
+        )
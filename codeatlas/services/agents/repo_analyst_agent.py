@@ -1,14 +1,30 @@
-from langchain_core.language_models import BaseChatModel
-from langchain_core.prompts import ChatPromptTemplate
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from codeatlas.services.agents.interfaces import Agent
+from codeatlas.services.llm.interfaces import cache_config
 from codeatlas.services.state.repo_state_store import RepoStateStore
+from codeatlas.utils.executors import run_blocking
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from langchain_core.language_models import BaseChatModel
 
 
 class RepoAnalystAgent(Agent):
-    def __init__(self, state_store: RepoStateStore, llm: BaseChatModel) -> None:
+    def __init__(
+        self,
+        state_store: RepoStateStore,
+        llm: BaseChatModel,
+        executor: Executor | None = None,
+    ) -> None:
         self._state_store = state_store
         self._llm = llm
+        self._executor = executor
+        from langchain_core.prompts import ChatPromptTemplate
+
         self._prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -28,27 +44,55 @@ class RepoAnalystAgent(Agent):
         if not repo_id:
             return "Error: repo_id is required for analysis."
 
-        state = self._state_store.get(repo_id)
-        if not state:
+        context = self._context(repo_id)
+        if context is None:
             return "Error: Repository state not found. Please analyze the repo first."
 
-        # Summarize context for the LLM
-        file_count = len(state.parsed_repo.files)
-        func_count = len(state.parsed_repo.functions)
-        edge_count = len(state.import_graph.edges)
-        
-        # Simple graph analysis
-        most_depended_on = sorted(
-            state.import_graph.in_degree, key=lambda x: x[1], reverse=True
-        )[:5]
-        
-        context = (
-            f"Files: {file_count}\n"
-            f"Functions: {func_count}\n"
-            f"Dependency Edges: {edge_count}\n"
-            f"Top 5 most used modules: {most_depended_on}\n"
+        chain = self._prompt | self._llm
+        response = chain.invoke(
+            {"context": context, "question": prompt}, config=cache_config(prompt)
         )
-        
+        return response.content
+
+    async def arun(self, prompt: str, repo_id: str | None = None) -> str:
+        if not repo_id:
+            return "Error: repo_id is required for analysis."
+
+        # Repo state queries hit SQLite
+        context = await run_blocking(self._executor, self._context, repo_id)
+        if context is None:
+            return "Error: Repository state not found. Please analyze the repo first."
+
         chain = self._prompt | self._llm
-        response = chain.invoke({"context": context, "question": prompt})
+        response = await chain.ainvoke(
+            {"context": context, "question": prompt}, config=cache_config(prompt)
+        )
         return response.content
+
+    def _context(self, repo_id: str) -> str | None:
+        overview = self._state_store.overview(repo_id)
+        if overview is None:
+            return None
+
+        # Summarize context for the LLM from analytics precomputed at analysis time
+        analytics = self._state_store.get_analytics(repo_id)
+        central = [node for node, _ in analytics.pagerank[:5]]
+        largest_cycle = " <-> ".join(analytics.cycles[0][:8]) if analytics.cycles else "none"
+        coupled = sorted(
+            analytics.packages, key=lambda item: item.afferent + item.efferent, reverse=True
+        )[:5]
+        packages = ", ".join(
+            f"{item.package} (files={item.files}, in={item.afferent}, out={item.efferent}, "
+            f"instability={item.instability})"
+            for item in coupled
+        )
+        return (
+            f"Files: {overview.file_count}\n"
+            f"Functions: {overview.function_count}\n"
+            f"Dependency Edges: {overview.dependency_edges}\n"
+            f"Top 5 most used modules: {analytics.most_imported[:5]}\n"
+            f"Most central files (PageRank): {central}\n"
+            f"Dependency layers: {len(analytics.layers)}\n"
+            f"Import cycles: {analytics.cycle_count} (largest: {largest_cycle})\n"
+            f"Most coupled packages: {packages}\n"
+        )
@@ -1,5 +1,9 @@
 from codeatlas.services.agents.interfaces import Agent
-from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.qa.answer_service import (
+    AnswerService,
+    GroundedAnswer,
+    RetrievedContext,
+)
 
 
 class RetrievalAgent(Agent):
@@ -11,7 +15,24 @@ class RetrievalAgent(Agent):
             return "Error: repo_id is required for retrieval."
         
         result = self._answer_service.answer(repo_id=repo_id, question=prompt)
-        
+        return self._format(result)
+
+    async def arun(self, prompt: str, repo_id: str | None = None) -> str:
+        if not repo_id:
+            return "Error: repo_id is required for retrieval."
+
+        result = await self._answer_service.aanswer(repo_id=repo_id, question=prompt)
+        return self._format(result)
+
+    def retrieve(self, prompt: str, repo_id: str, top_k: int = 5) -> RetrievedContext:
+        """Structured retrieval results without the LLM-written answer."""
+        return self._answer_service.retrieve(repo_id=repo_id, question=prompt, top_k=top_k)
+
+    async def aretrieve(self, prompt: str, repo_id: str, top_k: int = 5) -> RetrievedContext:
+        return await self._answer_service.aretrieve(repo_id=repo_id, question=prompt, top_k=top_k)
+
+    @staticmethod
+    def _format(result: GroundedAnswer) -> str:
         # Format the output for the orchestrator/user
         response = [f"Answer: {result.answer}\n"]
         if result.citations:
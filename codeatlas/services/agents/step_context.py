@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+from codeatlas.services.qa.answer_service import RetrievedContext
+from codeatlas.utils.tokens import count_tokens
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep whole leading lines of ``text`` within ``max_tokens``.
+
+    Retrieval context and agent outputs put the most relevant material
+    first, so the head is what survives.
+    """
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    kept: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        cost = count_tokens(line)
+        if used + cost > max_tokens:
+            if not kept and max_tokens > 0:
+                # A single oversized line: cut it on a word boundary
+                head = line[: max_tokens * 4].rsplit(" ", 1)[0]
+                kept.append(head)
+                used = count_tokens(head)
+            break
+        kept.append(line)
+        used += cost
+    kept.append(f"[... {total - used} more tokens truncated]")
+    return "\n".join(kept)
+
+
+def split_at_tokens(text: str, max_tokens: int) -> tuple[str, str]:
+    """Split ``text`` after the whole leading lines that fit in ``max_tokens``.
+
+    Returns ``(head, tail)`` with ``head + tail == text``; a first line that
+    alone exceeds the budget is cut on a word boundary.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text, ""
+    lines = text.splitlines(keepends=True)
+    used = 0
+    for index, line in enumerate(lines):
+        cost = count_tokens(line)
+        if used + cost > max_tokens:
+            if index == 0:
+                head = line[: max_tokens * 4].rsplit(" ", 1)[0] if max_tokens > 0 else ""
+                return head, text[len(head) :]
+            head = "".join(lines[:index])
+            return head, text[len(head) :]
+        used += cost
+    return text, ""
+
+
+@dataclass
+class StepRecord:
+    step_id: str
+    agent: str
+    text: str
+    citations: List[str] = field(default_factory=list)
+    retrieved: RetrievedContext | None = None
+
+    @property
+    def tokens(self) -> int:
+        return count_tokens(self.text)
+
+
+class StepContextManager:
+    """Step outputs for one plan run, rendered into prompts under a token budget.
+
+    Dependencies are packed smallest first so short outputs survive intact and
+    the leftover budget goes to longer ones, which are truncated to their
+    share. Citations from all dependencies are listed once.
+    """
+
+    def __init__(self, token_budget: int = 1500) -> None:
+        self._token_budget = token_budget
+        self._records: Dict[str, StepRecord] = {}
+
+    def add(self, record: StepRecord) -> None:
+        self._records[record.step_id] = record
+
+    def retrieval_record(self, step_ids: Iterable[str]) -> StepRecord | None:
+        """The first structured retrieval result among ``step_ids``."""
+        for step_id in step_ids:
+            record = self._records.get(step_id)
+            if record is not None and record.retrieved is not None:
+                return record
+        return None
+
+    def render(self, step_ids: Iterable[str], exclude: Iterable[str] = ()) -> str:
+        skipped = set(exclude)
+        records = [
+            self._records[step_id]
+            for step_id in step_ids
+            if step_id in self._records and step_id not in skipped
+        ]
+        if not records:
+            return ""
+
+        citations = list(dict.fromkeys(c for record in records for c in record.citations))
+        citation_block = ""
+        if citations:
+            citation_block = "Citations:\n" + "\n".join(f"- {c}" for c in citations)
+        remaining = max(0, self._token_budget - count_tokens(citation_block))
+
+        allotted: Dict[str, str] = {}
+        pending = sorted(records, key=lambda record: record.tokens)
+        while pending:
+            share = remaining // len(pending)
+            record = pending.pop(0)
+            text = truncate_to_tokens(record.text, share)
+            allotted[record.step_id] = text
+            remaining -= min(record.tokens, count_tokens(text))
+
+        sections = [f"Step {r.step_id} ({r.agent}): {allotted[r.step_id]}" for r in records]
+        if citation_block:
+            sections.append(citation_block)
+        return "\n".join(sections)
@@ -1,4 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class StepTokenUsage:
+    step_id: str
+    agent: str
+    prompt_tokens: int
+    output_tokens: int
 
 
 @dataclass(frozen=True)
@@ -6,6 +14,7 @@ class AnswerResult:
     answer: str
     citations: list[str]
     reasoning_steps: list[str]
+    step_tokens: list[StepTokenUsage] = field(default_factory=list)
 
 
 @dataclass(frozen=True)
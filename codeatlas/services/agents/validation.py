@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Dict, List
+
+from codeatlas.observability.metrics import (
+    VALIDATION_DECISIONS,
+    VALIDATION_SAVED_SECONDS,
+)
+
+_DEFINITION = re.compile(r"\b(?:def|class|function|func|fn)\s+([A-Za-z_]\w*)")
+_ERROR_MARKERS = ("error executing", "error generating", "traceback (most recent call last)")
+
+
+@dataclass(frozen=True)
+class ValidationPolicy:
+    """When the orchestrator sends an answer to the LLM reviewer.
+
+    ``mode`` is ``always`` (previous behaviour), ``never`` or ``auto``. In
+    ``auto`` mode answers shorter than ``min_answer_chars`` are accepted as is
+    and longer ones are reviewed only when a local check flags them.
+    ``token_budget`` caps the question and answer sent to the reviewer.
+    """
+
+    mode: str = "auto"
+    min_answer_chars: int = 400
+    min_citation_coverage: float = 0.2
+    token_budget: int = 2000
+
+
+@dataclass(frozen=True)
+class ValidationVerdict:
+    review: bool
+    reason: str
+    detail: str = ""
+
+
+def citation_coverage(answer: str, citations: List[str]) -> float:
+    """Fraction of citations whose file name or defined symbol appears in ``answer``."""
+    if not citations:
+        return 1.0
+    text = answer.lower()
+    covered = 0
+    for citation in citations:
+        location, _, snippet = citation.partition(" | ")
+        path = location.split(" (", 1)[0].strip().lstrip("- ")
+        names = [PurePosixPath(path).name.lower()] if path else []
+        names.extend(name.lower() for name in _DEFINITION.findall(snippet))
+        if any(name and name in text for name in names):
+            covered += 1
+    return covered / len(citations)
+
+
+def assess_answer(policy: ValidationPolicy, answer: str, citations: List[str]) -> ValidationVerdict:
+    if policy.mode == "always":
+        return ValidationVerdict(True, "always")
+    if policy.mode == "never":
+        return ValidationVerdict(False, "never")
+    if not answer.strip():
+        return ValidationVerdict(False, "empty")
+
+    lowered = answer.lower()
+    if any(marker in lowered for marker in _ERROR_MARKERS):
+        return ValidationVerdict(True, "error", "answer contains an error")
+    if len(answer) < policy.min_answer_chars:
+        return ValidationVerdict(False, "short", f"answer under {policy.min_answer_chars} chars")
+    coverage = citation_coverage(answer, citations)
+    if coverage < policy.min_citation_coverage:
+        return ValidationVerdict(True, "low_coverage", f"citation coverage {coverage:.0%}")
+    return ValidationVerdict(False, "passed", f"citation coverage {coverage:.0%}")
+
+
+class ValidationStats:
+    """Counts review/skip decisions and estimates reviewer latency avoided."""
+
+    def __init__(self, assumed_review_seconds: float = 2.0) -> None:
+        self._review_seconds = assumed_review_seconds
+        self._reviewed = 0
+        self._skipped = 0
+        self._saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_skip(self, reason: str) -> None:
+        VALIDATION_DECISIONS.labels(decision="skipped", reason=reason).inc()
+        with self._lock:
+            self._skipped += 1
+            self._saved_seconds += self._review_seconds
+            VALIDATION_SAVED_SECONDS.inc(self._review_seconds)
+
+    def record_review(self, reason: str, seconds: float) -> None:
+        VALIDATION_DECISIONS.labels(decision="reviewed", reason=reason).inc()
+        with self._lock:
+            self._reviewed += 1
+            self._review_seconds = 0.8 * self._review_seconds + 0.2 * seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            total = self._reviewed + self._skipped
+            return {
+                "reviewed": self._reviewed,
+                "skipped": self._skipped,
+                "skip_rate": self._skipped / total if total else 0.0,
+                "saved_seconds": self._saved_seconds,
+            }
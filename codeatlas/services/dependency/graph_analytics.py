@@ -0,0 +1,321 @@
+"""Import-graph analytics computed once per analysis and stored with the repo state.
+
+The import graph links each file to the import specifiers it uses
+(``pkg.module``, ``../lib/util``). Here those specifiers are resolved to repo
+files where possible, so cycles, layers and centrality describe the repo's
+own structure; anything unresolved is an external module. Files are named
+by their path relative to the repo root.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from collections.abc import Collection
+from dataclasses import asdict, dataclass, field
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING
+
+from codeatlas.models.source_file import SourceFile
+from codeatlas.observability.tracing import tracer
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+_JS_SUFFIXES = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+_PY_SUFFIXES = (".py",)
+
+
+@dataclass(frozen=True)
+class PackageRollup:
+    package: str
+    files: int
+    internal_edges: int
+    # Imports from other packages of the repo into this one, and out of it
+    afferent: int
+    efferent: int
+    external_imports: int
+    instability: float
+
+
+@dataclass(frozen=True)
+class GraphAnalytics:
+    node_count: int
+    edge_count: int
+    internal_edge_count: int
+    most_imported: list[tuple[str, int]] = field(default_factory=list)
+    most_importing: list[tuple[str, int]] = field(default_factory=list)
+    pagerank: list[tuple[str, float]] = field(default_factory=list)
+    cycles: list[list[str]] = field(default_factory=list)
+    cycle_count: int = 0
+    layers: list[list[str]] = field(default_factory=list)
+    packages: list[PackageRollup] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> GraphAnalytics:
+        return cls(
+            node_count=payload["node_count"],
+            edge_count=payload["edge_count"],
+            internal_edge_count=payload["internal_edge_count"],
+            most_imported=[tuple(item) for item in payload.get("most_imported", [])],
+            most_importing=[tuple(item) for item in payload.get("most_importing", [])],
+            pagerank=[tuple(item) for item in payload.get("pagerank", [])],
+            cycles=payload.get("cycles", []),
+            cycle_count=payload.get("cycle_count", 0),
+            layers=payload.get("layers", []),
+            packages=[PackageRollup(**item) for item in payload.get("packages", [])],
+        )
+
+
+def compute_graph_analytics(
+    graph: nx.DiGraph,
+    files: list[SourceFile],
+    root_path: str = "",
+    top_n: int = 20,
+    max_cycles: int = 50,
+) -> GraphAnalytics:
+    """Rankings, cycles, layers, PageRank and package rollups for one repo.
+
+    Degree rankings count external modules too (``most_imported`` keeps the
+    meaning of ``RepoStateStore.most_imported``); cycles, layers and
+    PageRank cover repo files only. At most ``top_n`` entries are kept per
+    ranking and ``max_cycles`` cycles, largest first.
+    """
+    import networkx as nx
+
+    with tracer.span("graph_analytics", nodes=graph.number_of_nodes()):
+        resolver = _ImportResolver([source.path for source in files], root_path)
+        internal = nx.DiGraph()
+        internal.add_nodes_from(resolver.relative(source.path) for source in files)
+        in_degree: Counter[str] = Counter()
+        out_degree: Counter[str] = Counter()
+        external: Counter[str] = Counter()
+        for source, target in graph.edges():
+            if source not in resolver.files:
+                continue
+            importer = resolver.relative(source)
+            resolved = resolver.resolve(source, target)
+            in_degree[resolved or target] += 1
+            out_degree[importer] += 1
+            if resolved is None:
+                external[importer] += 1
+            elif resolved != importer:
+                internal.add_edge(importer, resolved)
+
+        components = [
+            sorted(component)
+            for component in nx.strongly_connected_components(internal)
+            if len(component) > 1
+        ]
+        components.sort(key=lambda component: (-len(component), component[0]))
+        return GraphAnalytics(
+            node_count=graph.number_of_nodes(),
+            edge_count=graph.number_of_edges(),
+            internal_edge_count=internal.number_of_edges(),
+            most_imported=_top(in_degree, top_n),
+            most_importing=_top(out_degree, top_n),
+            pagerank=_top(pagerank(internal), top_n, digits=6),
+            cycles=components[:max_cycles],
+            cycle_count=len(components),
+            layers=_layers(internal),
+            packages=_package_rollups(internal, external),
+        )
+
+
+def pagerank(
+    graph: nx.DiGraph, damping: float = 0.85, tolerance: float = 1.0e-8, max_iterations: int = 100
+) -> dict[str, float]:
+    """PageRank by power iteration; files that import nothing spread rank evenly.
+
+    Edges point from importer to imported, so rank flows to the modules
+    everything else depends on.
+    """
+    nodes = list(graph.nodes)
+    count = len(nodes)
+    if count == 0:
+        return {}
+    successors = {node: list(graph.successors(node)) for node in nodes}
+    rank = dict.fromkeys(nodes, 1.0 / count)
+    for _ in range(max_iterations):
+        dangling = sum(rank[node] for node in nodes if not successors[node])
+        base = (1.0 - damping) / count + damping * dangling / count
+        updated = dict.fromkeys(nodes, base)
+        for node in nodes:
+            targets = successors[node]
+            if targets:
+                share = damping * rank[node] / len(targets)
+                for target in targets:
+                    updated[target] += share
+        change = sum(abs(updated[node] - rank[node]) for node in nodes)
+        rank = updated
+        if change < count * tolerance:
+            break
+    return rank
+
+
+def _layers(graph: nx.DiGraph) -> list[list[str]]:
+    """Files grouped by dependency depth: layer 0 imports no other repo file.
+
+    Each import cycle is collapsed into one unit first, so its files share
+    a layer.
+    """
+    import networkx as nx
+
+    if graph.number_of_nodes() == 0:
+        return []
+    condensed = nx.condensation(graph)
+    depth: dict[int, int] = {}
+    for unit in reversed(list(nx.topological_sort(condensed))):
+        depth[unit] = 1 + max((depth[target] for target in condensed.successors(unit)), default=-1)
+    layers: list[list[str]] = [[] for _ in range(max(depth.values()) + 1)]
+    for unit, level in depth.items():
+        layers[level].extend(condensed.nodes[unit]["members"])
+    return [sorted(layer) for layer in layers]
+
+
+def _package_rollups(graph: nx.DiGraph, external: Counter[str]) -> list[PackageRollup]:
+    files: Counter[str] = Counter()
+    internal_edges: Counter[str] = Counter()
+    afferent: Counter[str] = Counter()
+    efferent: Counter[str] = Counter()
+    external_imports: Counter[str] = Counter()
+    for node in graph.nodes:
+        files[_package(node)] += 1
+        external_imports[_package(node)] += external[node]
+    for source, target in graph.edges():
+        source_package, target_package = _package(source), _package(target)
+        if source_package == target_package:
+            internal_edges[source_package] += 1
+        else:
+            efferent[source_package] += 1
+            afferent[target_package] += 1
+    rollups = []
+    for package in sorted(files):
+        coupling = afferent[package] + efferent[package]
+        rollups.append(
+            PackageRollup(
+                package=package,
+                files=files[package],
+                internal_edges=internal_edges[package],
+                afferent=afferent[package],
+                efferent=efferent[package],
+                external_imports=external_imports[package],
+                instability=round(efferent[package] / coupling, 4) if coupling else 0.0,
+            )
+        )
+    return rollups
+
+
+def _package(path: str) -> str:
+    parent = PurePosixPath(path).parent.as_posix()
+    return "." if parent in ("", ".") else parent
+
+
+def _top(counts: dict[str, float], limit: int, digits: int | None = None) -> list[tuple]:
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    if digits is None:
+        return ranked
+    return [(node, round(value, digits)) for node, value in ranked]
+
+
+class _ImportResolver:
+    """Maps import specifiers to repo files.
+
+    Relative specifiers (``./util``, ``..models``) resolve against the
+    importing file. Dotted Python modules resolve the way the interpreter
+    would find them: from the repo root, ``src/``, or any directory that
+    holds top-level packages without being a package itself. A module with
+    no file under those roots is external, even if some nested file shares
+    its name (``import logging`` next to ``pkg/logging.py``).
+    """
+
+    def __init__(self, paths: list[str], root_path: str) -> None:
+        self.files = set(paths)
+        normalized = [path.replace("\\", "/") for path in paths]
+        self._root = root_path.replace("\\", "/").rstrip("/") or _common_parent(normalized)
+        self._relative = {path: self._strip_root(norm) for path, norm in zip(paths, normalized)}
+        self._by_relative = {relative: relative for relative in self._relative.values()}
+        self._source_roots = _source_roots(self._relative.values())
+
+    def relative(self, path: str) -> str:
+        return self._relative.get(path) or path
+
+    def resolve(self, source: str, specifier: str) -> str | None:
+        importer = self.relative(source)
+        if specifier.startswith("."):
+            if importer.endswith(_PY_SUFFIXES) and "/" not in specifier:
+                return self._resolve_python_relative(importer, specifier)
+            return self._resolve_path(
+                os.path.normpath(os.path.join(_parent(importer), specifier)).replace("\\", "/")
+            )
+        if "/" in specifier:
+            return None
+        return self._resolve_module(specifier)
+
+    def _resolve_module(self, specifier: str) -> str | None:
+        module = specifier.replace(".", "/")
+        for root in self._source_roots:
+            target = f"{root}/{module}" if root else module
+            for candidate in (f"{target}.py", f"{target}/__init__.py"):
+                if candidate in self._by_relative:
+                    return candidate
+        return None
+
+    def _resolve_python_relative(self, importer: str, specifier: str) -> str | None:
+        dots = len(specifier) - len(specifier.lstrip("."))
+        base = PurePosixPath(importer).parent
+        for _ in range(dots - 1):
+            base = base.parent
+        rest = specifier[dots:].replace(".", "/")
+        target = (base / rest if rest else base).as_posix()
+        return self._resolve_path("" if target == "." else target)
+
+    def _resolve_path(self, target: str) -> str | None:
+        candidates = [target] + [target + suffix for suffix in _JS_SUFFIXES + _PY_SUFFIXES]
+        candidates += [f"{target}/index{suffix}" for suffix in _JS_SUFFIXES]
+        candidates.append(f"{target}/__init__.py")
+        for candidate in candidates:
+            found = self._by_relative.get(candidate.lstrip("/"))
+            if found:
+                return found
+        return None
+
+    def _strip_root(self, path: str) -> str:
+        if self._root and path.startswith(self._root + "/"):
+            return path[len(self._root) + 1 :]
+        return path
+
+
+def _source_roots(relatives: Collection[str]) -> list[str]:
+    """Directories absolute imports are looked up from, repo root first.
+
+    Besides the root and ``src/``, that is the parent of every top-level
+    package, e.g. ``backend`` for ``backend/app/__init__.py``.
+    """
+    packages = {
+        _parent(relative)
+        for relative in relatives
+        if PurePosixPath(relative).name == "__init__.py"
+    }
+    roots = {"src"} if any(relative.startswith("src/") for relative in relatives) else set()
+    for package in packages:
+        parent = _parent(package)
+        if parent not in packages and parent != ".":
+            roots.add(parent)
+    return [""] + sorted(roots)
+
+
+def _common_parent(paths: list[str]) -> str:
+    parents = [PurePosixPath(path).parent.as_posix() for path in paths]
+    try:
+        return os.path.commonpath(parents) if parents else ""
+    except ValueError:
+        # Mixed absolute and relative paths have no common root
+        return ""
+
+
+def _parent(relative: str) -> str:
+    return PurePosixPath(relative).parent.as_posix()
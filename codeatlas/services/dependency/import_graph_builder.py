@@ -1,27 +1,35 @@
+from __future__ import annotations
+
 import logging
 from pathlib import Path
-
-import networkx as nx
-from tree_sitter import Node
-from tree_sitter_languages import get_parser
+from typing import TYPE_CHECKING
 
 from codeatlas.models.parsed_repository import ParsedRepository
+from codeatlas.observability.tracing import tracer
 from codeatlas.services.dependency.interfaces import DependencyGraphBuilder
 
+if TYPE_CHECKING:
+    import networkx as nx
+    from tree_sitter import Node
+
 
 class ImportGraphBuilder(DependencyGraphBuilder):
     def build_import_graph(self, parsed_repo: ParsedRepository) -> nx.DiGraph:
-        graph = nx.DiGraph()
-        for source_file in parsed_repo.files:
-            graph.add_node(source_file.path)
-            language = self._language_from_suffix(Path(source_file.path).suffix)
-            if language is None:
-                continue
-            targets = self._extract_imports(Path(source_file.path), language)
-            for target in targets:
-                graph.add_node(target)
-                graph.add_edge(source_file.path, target, relation="imports")
-        return graph
+        import networkx as nx
+
+        with tracer.span("import_graph", repo_id=parsed_repo.repository_id) as span:
+            graph = nx.DiGraph()
+            for source_file in parsed_repo.files:
+                graph.add_node(source_file.path)
+                language = self._language_from_suffix(Path(source_file.path).suffix)
+                if language is None:
+                    continue
+                targets = self._extract_imports(Path(source_file.path), language)
+                for target in targets:
+                    graph.add_node(target)
+                    graph.add_edge(source_file.path, target, relation="imports")
+            span.set_attribute("edges", graph.number_of_edges())
+            return graph
 
     def _language_from_suffix(self, suffix: str) -> str | None:
         if suffix == ".py":
@@ -31,6 +39,8 @@ class ImportGraphBuilder(DependencyGraphBuilder):
         return None
 
     def _extract_imports(self, path: Path, language: str) -> list[str]:
+        from tree_sitter_languages import get_parser
+
         try:
             parser = get_parser(language)
         except Exception as exc:
@@ -1,9 +1,13 @@
-from abc import ABC, abstractmethod
+from __future__ import annotations
 
-import networkx as nx
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
 from codeatlas.models.parsed_repository import ParsedRepository
 
+if TYPE_CHECKING:
+    import networkx as nx
+
 
 class DependencyGraphBuilder(ABC):
     @abstractmethod
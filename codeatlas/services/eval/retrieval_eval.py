@@ -0,0 +1,235 @@
+"""Ranking quality and latency of retrieval configurations on a labelled query set.
+
+Query sets are JSON lines, one query per line::
+
+    {"query": "where is the config loaded?", "relevant": ["codeatlas/utils/config.py"]}
+    {"query": "...", "expected_record_id": "src/app.py:10-42"}
+
+``relevant`` lists record ids (file paths, or ``path:start-end`` for
+functions). Ids may be relative to the repo root: a record matches when its
+id equals the entry or ends with ``/<entry>``. ``expected_record_id`` is the
+single-answer form used by ``basic_eval.EvalQuery``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.services.eval.basic_eval import EvalQuery
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.services.retrieval.interfaces import CodeRetriever
+from codeatlas.services.retrieval.lexical import BM25Index, reciprocal_rank_fusion
+from codeatlas.utils.stats import percentile
+
+# (question, query vector, top_k) -> ranked records
+SearchFn = Callable[[str, list[float], int], list[EmbeddingRecord]]
+Reranker = Callable[[str, list[EmbeddingRecord]], list[EmbeddingRecord]]
+
+
+@dataclass(frozen=True)
+class EvalCase:
+    query: str
+    relevant: tuple[str, ...]
+
+    @classmethod
+    def from_query(cls, item: EvalQuery) -> EvalCase:
+        return cls(query=item.query, relevant=(item.expected_record_id,))
+
+
+@dataclass(frozen=True)
+class RetrievalConfig:
+    name: str
+    search: SearchFn
+
+
+@dataclass(frozen=True)
+class ConfigReport:
+    name: str
+    queries: int
+    recall: dict[int, float]
+    ndcg: dict[int, float]
+    mrr: float
+    latency_ms: dict[str, float]
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "queries": self.queries,
+            "recall": {f"@{k}": value for k, value in self.recall.items()},
+            "ndcg": {f"@{k}": value for k, value in self.ndcg.items()},
+            "mrr": self.mrr,
+            "latency_ms": self.latency_ms,
+        }
+
+
+@dataclass(frozen=True)
+class EvalReport:
+    ks: tuple[int, ...]
+    embed_ms_per_query: float
+    configs: list[ConfigReport] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "ks": list(self.ks),
+            "embed_ms_per_query": self.embed_ms_per_query,
+            "configs": [config.to_dict() for config in self.configs],
+        }
+
+
+def load_eval_cases(path: str | Path) -> list[EvalCase]:
+    cases: list[EvalCase] = []
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        relevant = item.get("relevant")
+        if relevant is None and item.get("expected_record_id"):
+            relevant = [item["expected_record_id"]]
+        if not item.get("query") or not relevant:
+            raise ValueError(f"{path}:{line_number}: needs 'query' and 'relevant'")
+        cases.append(EvalCase(query=item["query"], relevant=tuple(relevant)))
+    return cases
+
+
+def dense_search(retriever: CodeRetriever, repo_id: str) -> SearchFn:
+    def search(question: str, vector: list[float], top_k: int) -> list[EmbeddingRecord]:
+        return retriever.search(repo_id, vector, top_k)
+
+    return search
+
+
+def hybrid_search(
+    dense: SearchFn, lexical: BM25Index, candidates: int = 50, rrf_k: int = 60
+) -> SearchFn:
+    """Dense and BM25 candidates merged with reciprocal rank fusion."""
+
+    def search(question: str, vector: list[float], top_k: int) -> list[EmbeddingRecord]:
+        depth = max(candidates, top_k)
+        rankings = [dense(question, vector, depth), lexical.search(question, depth)]
+        return reciprocal_rank_fusion(rankings, top_k, k=rrf_k)
+
+    return search
+
+
+def reranked_search(inner: SearchFn, reranker: Reranker, candidates: int = 10) -> SearchFn:
+    """``candidates`` results of ``inner`` reordered by ``reranker``, as AnswerService does."""
+
+    def search(question: str, vector: list[float], top_k: int) -> list[EmbeddingRecord]:
+        records = inner(question, vector, max(candidates, top_k))
+        return reranker(question, records)[:top_k]
+
+    return search
+
+
+def evaluate_configs(
+    cases: list[EvalCase],
+    embedder: EmbeddingService,
+    configs: list[RetrievalConfig],
+    ks: tuple[int, ...] = (1, 5, 10),
+    batch_size: int = 64,
+) -> EvalReport:
+    """Embed the queries once in batches, then score every config on the same vectors."""
+    ks = tuple(sorted(set(ks)))
+    depth = ks[-1]
+    questions = [case.query for case in cases]
+    started = time.perf_counter()
+    vectors: list[list[float]] = []
+    for offset in range(0, len(questions), batch_size):
+        vectors.extend(embedder.embed_texts(questions[offset : offset + batch_size]))
+    embed_ms = (time.perf_counter() - started) * 1000
+    report = EvalReport(
+        ks=ks, embed_ms_per_query=round(embed_ms / len(cases), 3) if cases else 0.0
+    )
+    for config in configs:
+        report.configs.append(_evaluate_config(config, cases, vectors, ks, depth))
+    return report
+
+
+def _evaluate_config(
+    config: RetrievalConfig,
+    cases: list[EvalCase],
+    vectors: list[list[float]],
+    ks: tuple[int, ...],
+    depth: int,
+) -> ConfigReport:
+    recall = {k: 0.0 for k in ks}
+    ndcg = {k: 0.0 for k in ks}
+    reciprocal_ranks = 0.0
+    latencies: list[float] = []
+    for case, vector in zip(cases, vectors):
+        started = time.perf_counter()
+        records = config.search(case.query, vector, depth)
+        latencies.append((time.perf_counter() - started) * 1000)
+        ranks = _hit_ranks([record.record_id for record in records[:depth]], case.relevant)
+        if ranks:
+            reciprocal_ranks += 1 / ranks[0]
+        for k in ks:
+            hits = [rank for rank in ranks if rank <= k]
+            recall[k] += len(hits) / len(case.relevant)
+            ideal = sum(1 / math.log2(rank + 1) for rank in range(1, min(k, len(case.relevant)) + 1))
+            ndcg[k] += sum(1 / math.log2(rank + 1) for rank in hits) / ideal
+    total = len(cases) or 1
+    return ConfigReport(
+        name=config.name,
+        queries=len(cases),
+        recall={k: round(value / total, 4) for k, value in recall.items()},
+        ndcg={k: round(value / total, 4) for k, value in ndcg.items()},
+        mrr=round(reciprocal_ranks / total, 4),
+        latency_ms={
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        },
+    )
+
+
+def _hit_ranks(record_ids: list[str], relevant: tuple[str, ...]) -> list[int]:
+    """1-based ranks at which a not-yet-found relevant id appears."""
+    remaining = set(relevant)
+    ranks: list[int] = []
+    for rank, record_id in enumerate(record_ids, start=1):
+        normalized = record_id.replace("\\", "/")
+        match = next(
+            (item for item in remaining if normalized == item or normalized.endswith("/" + item)),
+            None,
+        )
+        if match is not None:
+            remaining.discard(match)
+            ranks.append(rank)
+    return ranks
+
+
+def format_table(report: EvalReport) -> str:
+    """Configs side by side, one row each, for terminals and PR descriptions."""
+    headers = (
+        ["config"]
+        + [f"R@{k}" for k in report.ks]
+        + [f"nDCG@{k}" for k in report.ks]
+        + ["MRR", "p50 ms", "p99 ms"]
+    )
+    rows = [
+        [config.name]
+        + [f"{config.recall[k]:.3f}" for k in report.ks]
+        + [f"{config.ndcg[k]:.3f}" for k in report.ks]
+        + [
+            f"{config.mrr:.3f}",
+            f"{config.latency_ms['p50']:.2f}",
+            f"{config.latency_ms['p99']:.2f}",
+        ]
+        for config in report.configs
+    ]
+    widths = [max(len(row[i]) for row in [headers, *rows]) for i in range(len(headers))]
+    lines = [
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths))
+        for row in [headers, *rows]
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
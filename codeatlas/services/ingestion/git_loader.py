@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from codeatlas.models.repository import Repository
+from codeatlas.observability.tracing import tracer
 from codeatlas.services.ingestion.interfaces import RepositoryLoader
 
 
@@ -26,7 +27,8 @@ class GitRepositoryLoader(RepositoryLoader):
         clone_url = _normalize_repo_url(repo_url_str)
         repo_id = str(uuid.uuid4())
         repo_dir = self.base_dir / repo_id
-        self._clone(clone_url, repo_dir)
+        with tracer.span("clone", repo_id=repo_id):
+            self._clone(clone_url, repo_dir)
         name = clone_url.rstrip("/").rstrip(".git").split("/")[-1]
         return Repository(
             repo_id=repo_id,
@@ -0,0 +1,181 @@
+import hashlib
+import logging
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from codeatlas.services.llm.interfaces import CACHE_QUESTION_KEY, LlmResponseCache
+from codeatlas.utils.executors import run_blocking
+
+_logger = logging.getLogger(__name__)
+
+
+def render_messages(messages: list[BaseMessage]) -> str:
+    """Flatten a chat prompt into the text that identifies it in caches."""
+    return "\n".join(f"{message.type}: {message.content}" for message in messages)
+
+
+def prompt_key(model: str, temperature: float, rendered_prompt: str) -> str:
+    payload = f"{model}\x00{temperature}\x00{rendered_prompt}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedChatModel(BaseChatModel):
+    """Wraps a chat model and answers repeated prompts from a response cache.
+
+    Exact hits are keyed on (model, temperature, rendered prompt hash). When
+    ``embedder`` is set, ``similarity_threshold`` is positive and the caller
+    names the question with ``cache_config``, a miss falls back to the most
+    similar cached question whose prompt is otherwise identical, so the same
+    question over different retrieved code never shares an answer.
+
+    On the async path cache reads, writes and embeddings run on ``executor``
+    (the default executor when unset): the SQLite backend blocks, and its
+    similarity search scans every stored vector.
+    """
+
+    inner: BaseChatModel
+    response_cache: LlmResponseCache
+    model_name: str
+    temperature: float = 0.0
+    embedder: Any = None
+    similarity_threshold: float = 0.0
+    executor: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cached-{self.inner._llm_type}"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        rendered = render_messages(messages)
+        key = prompt_key(self.model_name, self.temperature, rendered)
+        question = self._semantic_question(rendered, run_manager)
+        namespace = self._namespace(rendered, question)
+        vector = None
+        cached = self.response_cache.get(key)
+        if cached is None and question is not None:
+            vector = self.embedder.embed_query(question)
+            cached = self.response_cache.most_similar(
+                namespace, vector, self.similarity_threshold
+            )
+        if cached is not None:
+            _logger.debug("LLM cache hit for %s", key[:12])
+            return _chat_result(cached)
+
+        response = self.inner.invoke(messages, stop=stop, **kwargs)
+        content = response.content if isinstance(response.content, str) else str(response.content)
+        self.response_cache.put(key, namespace, content, vector)
+        return _chat_result(content)
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        rendered = render_messages(messages)
+        key = prompt_key(self.model_name, self.temperature, rendered)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=cached))
+            return
+
+        parts: list[str] = []
+        for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+            token = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            parts.append(token)
+            if run_manager is not None and token:
+                run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        question = self._semantic_question(rendered, run_manager)
+        vector = self.embedder.embed_query(question) if question is not None else None
+        self.response_cache.put(
+            key, self._namespace(rendered, question), "".join(parts), vector
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        rendered = render_messages(messages)
+        key = prompt_key(self.model_name, self.temperature, rendered)
+        question = self._semantic_question(rendered, run_manager)
+        namespace = self._namespace(rendered, question)
+        vector = None
+        cached = await run_blocking(self.executor, self.response_cache.get, key)
+        if cached is None and question is not None:
+            vector = await run_blocking(self.executor, self.embedder.embed_query, question)
+            cached = await run_blocking(
+                self.executor,
+                self.response_cache.most_similar,
+                namespace,
+                vector,
+                self.similarity_threshold,
+            )
+        if cached is not None:
+            _logger.debug("LLM cache hit for %s", key[:12])
+            return _chat_result(cached)
+
+        response = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+        content = response.content if isinstance(response.content, str) else str(response.content)
+        await run_blocking(self.executor, self.response_cache.put, key, namespace, content, vector)
+        return _chat_result(content)
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        rendered = render_messages(messages)
+        key = prompt_key(self.model_name, self.temperature, rendered)
+        cached = await run_blocking(self.executor, self.response_cache.get, key)
+        if cached is not None:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=cached))
+            return
+
+        parts: list[str] = []
+        async for chunk in self.inner.astream(messages, stop=stop, **kwargs):
+            token = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            parts.append(token)
+            if run_manager is not None and token:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        question = self._semantic_question(rendered, run_manager)
+        vector = (
+            await run_blocking(self.executor, self.embedder.embed_query, question)
+            if question is not None
+            else None
+        )
+        await run_blocking(
+            self.executor,
+            self.response_cache.put,
+            key,
+            self._namespace(rendered, question),
+            "".join(parts),
+            vector,
+        )
+
+    def _semantic_question(self, rendered: str, run_manager: Any) -> str | None:
+        """The question named by ``cache_config``, if semantic lookups apply."""
+        if self.embedder is None or self.similarity_threshold <= 0:
+            return None
+        metadata = getattr(run_manager, "metadata", None)
+        if not metadata:
+            # stream()/astream() do not hand the run manager to _stream/_astream;
+            # the running step's config carries the same metadata
+            from langchain_core.runnables.config import var_child_runnable_config
+
+            metadata = (var_child_runnable_config.get() or {}).get("metadata") or {}
+        question = metadata.get(CACHE_QUESTION_KEY)
+        if not question or question not in rendered:
+            return None
+        return question
+
+    def _namespace(self, rendered: str, question: str | None) -> str:
+        """Model, temperature and a hash of the prompt with the question cut out.
+
+        Only prompts sharing system text and retrieved context can answer
+        each other semantically.
+        """
+        if question is None:
+            return f"{self.model_name}:{self.temperature}"
+        scope = hashlib.sha256(rendered.replace(question, "\x00").encode("utf-8"))
+        return f"{self.model_name}:{self.temperature}:{scope.hexdigest()[:16]}"
+
+
+def _chat_result(content: str) -> ChatResult:
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
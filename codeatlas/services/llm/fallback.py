@@ -0,0 +1,19 @@
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FallbackChatModel(BaseChatModel):
+    @property
+    def _llm_type(self) -> str:
+        return "fallback"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        content = (
+            "LLM provider not configured. "
+            "Set CODEATLAS_LLM_PROVIDER and relevant API keys."
+        )
+        return self._create_chat_result(content)
+
+    def _create_chat_result(self, content: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
@@ -0,0 +1,382 @@
+"""Admission control for upstream LLM calls.
+
+Every call goes through three gates:
+- single-flight: identical in-flight prompts share one upstream call
+- a per-provider concurrency limit
+- a token-bucket rate limit
+
+Callers that cannot be admitted before their deadline get
+``LlmGatewayTimeout`` instead of piling more load onto a struggling provider.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+from codeatlas.observability.metrics import (
+    LLM_GATEWAY_COALESCED,
+    LLM_GATEWAY_IN_FLIGHT,
+    LLM_GATEWAY_QUEUE_DEPTH,
+    LLM_GATEWAY_REJECTED,
+    LLM_GATEWAY_WAIT_SECONDS,
+)
+
+T = TypeVar("T")
+
+
+def _remaining(deadline: float) -> float:
+    return max(deadline - time.monotonic(), 0.0)
+
+
+class LlmGatewayTimeout(RuntimeError):
+    """Raised when a call waited in the gateway queue past its deadline."""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: int = 1) -> None:
+        self._rate = rate_per_second
+        self._capacity = max(burst, 1)
+        self._tokens = float(self._capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        """Take one token, sleeping until one is available or ``deadline`` passes."""
+        while True:
+            wait = self._take()
+            if wait == 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def aacquire(self, deadline: float) -> bool:
+        """Async ``acquire``: waits with ``asyncio.sleep`` instead of blocking a thread."""
+        while True:
+            wait = self._take()
+            if wait == 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def _take(self) -> float:
+        """Take a token if one is available; otherwise return seconds until the next one."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+
+class _SlotWaiter:
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.granted = False
+        self.event = threading.Event() if loop is None else None
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+
+
+class _Slots:
+    """Counting semaphore shared by worker threads and event loops.
+
+    A released slot is handed straight to the longest waiter. Async waiters
+    park on a future instead of a thread, so a cancelled waiter leaves the
+    queue (or hands back a slot granted in the meantime) and none leak.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._free = capacity
+        self._waiters: deque[_SlotWaiter] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        with self._lock:
+            if self._free > 0:
+                self._free -= 1
+                return True
+            waiter = _SlotWaiter()
+            self._waiters.append(waiter)
+        waiter.event.wait(timeout)
+        return self._settle(waiter)
+
+    async def aacquire(self, timeout: float) -> bool:
+        with self._lock:
+            if self._free > 0:
+                self._free -= 1
+                return True
+            waiter = _SlotWaiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            if self._settle(waiter):
+                self.release()
+            raise
+        return self._settle(waiter)
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.loop is None:
+                    waiter.granted = True
+                    waiter.event.set()
+                    return
+                try:
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                except RuntimeError:
+                    # The waiter's event loop is closed; try the next one
+                    continue
+                waiter.granted = True
+                return
+            self._free += 1
+
+    def _settle(self, waiter: _SlotWaiter) -> bool:
+        """Whether ``waiter`` holds a slot; if not, it leaves the queue."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+
+class _Flight:
+    """One upstream call shared by every caller of the same key.
+
+    ``admitted`` is set once the leader holds its slot and ``done`` once it
+    has a result or an error. A leader that is cancelled or interrupted
+    marks the flight ``abandoned`` so its followers elect a new leader.
+    """
+
+    def __init__(self, admit_deadline: float) -> None:
+        self.admit_deadline = admit_deadline
+        self.admitted = threading.Event()
+        self.admitted_at = 0.0
+        self.done = threading.Event()
+        self.result = None
+        self.error: Exception | None = None
+        self.abandoned = False
+        self._waiters: list[
+            tuple[threading.Event, asyncio.AbstractEventLoop, asyncio.Future]
+        ] = []
+        self._lock = threading.Lock()
+
+    def admit(self) -> None:
+        self.admitted_at = time.monotonic()
+        self._set(self.admitted)
+
+    def finish(self) -> None:
+        self._set(self.admitted, self.done)
+
+    def _set(self, *events: threading.Event) -> None:
+        with self._lock:
+            for event in events:
+                event.set()
+            ready = [waiter for waiter in self._waiters if waiter[0].is_set()]
+            self._waiters = [waiter for waiter in self._waiters if not waiter[0].is_set()]
+        for _, loop, future in ready:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    async def wait_async(self, event: threading.Event) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if event.is_set():
+                return
+            future = loop.create_future()
+            self._waiters.append((event, loop, future))
+        await future
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class LlmGateway:
+    """Single-flight, concurrency and rate limits for one provider.
+
+    A coalesced caller waits for the leader's admission until the leader's
+    own queue deadline, then up to ``call_timeout_seconds`` (unbounded when
+    None) for the upstream call, so it is never rejected while the leader
+    it joined goes on to succeed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 8,
+        requests_per_second: float = 0.0,
+        burst: int = 1,
+        queue_timeout_seconds: float = 30.0,
+        call_timeout_seconds: float | None = None,
+    ) -> None:
+        self._name = name
+        self._slots = _Slots(max(max_concurrency, 1))
+        self._bucket = (
+            TokenBucket(requests_per_second, burst) if requests_per_second > 0 else None
+        )
+        self._queue_timeout = queue_timeout_seconds
+        self._call_timeout = call_timeout_seconds
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def call(self, key: str, fn: Callable[[], T]) -> T:
+        """Run ``fn`` once per distinct in-flight ``key``; followers share the result."""
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                return self._lead(key, flight, fn)
+            LLM_GATEWAY_COALESCED.labels(provider=self._name).inc()
+            # A leader stuck in the queue or upstream must not pin its followers
+            if not flight.admitted.wait(_remaining(flight.admit_deadline)):
+                self._reject()
+            if not flight.done.wait(self._call_wait(flight)):
+                self._reject()
+            if not flight.abandoned:
+                break
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    async def acall(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async ``call``; sync and async callers coalesce on the same in-flight key."""
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                return await self._alead(key, flight, fn)
+            LLM_GATEWAY_COALESCED.labels(provider=self._name).inc()
+            try:
+                if not flight.admitted.is_set():
+                    await asyncio.wait_for(
+                        flight.wait_async(flight.admitted), _remaining(flight.admit_deadline)
+                    )
+                await asyncio.wait_for(flight.wait_async(flight.done), self._call_wait(flight))
+            except asyncio.TimeoutError:
+                self._reject()
+            if not flight.abandoned:
+                break
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _join(self, key: str) -> tuple[_Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight(time.monotonic() + self._queue_timeout)
+            return flight, True
+
+    def _lead(self, key: str, flight: _Flight, fn: Callable[[], T]) -> T:
+        try:
+            with self.slot():
+                flight.admit()
+                flight.result = fn()
+            return flight.result
+        except Exception as exc:
+            flight.error = exc
+            raise
+        except BaseException:
+            # Only this caller gave up; its followers call again themselves
+            flight.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.finish()
+
+    async def _alead(self, key: str, flight: _Flight, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            async with self.aslot():
+                flight.admit()
+                flight.result = await fn()
+            return flight.result
+        except Exception as exc:
+            flight.error = exc
+            raise
+        except BaseException:
+            flight.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.finish()
+
+    def _call_wait(self, flight: _Flight) -> float | None:
+        if self._call_timeout is None or flight.done.is_set():
+            return None
+        return _remaining(flight.admitted_at + self._call_timeout)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one concurrency slot (and rate-limit token) for the block."""
+        self._admit()
+        LLM_GATEWAY_IN_FLIGHT.labels(provider=self._name).inc()
+        try:
+            yield
+        finally:
+            LLM_GATEWAY_IN_FLIGHT.labels(provider=self._name).dec()
+            self._slots.release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Async ``slot``; queued callers wait without holding the event loop."""
+        await self._aadmit()
+        LLM_GATEWAY_IN_FLIGHT.labels(provider=self._name).inc()
+        try:
+            yield
+        finally:
+            LLM_GATEWAY_IN_FLIGHT.labels(provider=self._name).dec()
+            self._slots.release()
+
+    async def _aadmit(self) -> None:
+        start = time.monotonic()
+        deadline = start + self._queue_timeout
+        depth = LLM_GATEWAY_QUEUE_DEPTH.labels(provider=self._name)
+        depth.inc()
+        try:
+            if not await self._slots.aacquire(self._queue_timeout):
+                self._reject()
+            if self._bucket is not None and not await self._bucket.aacquire(deadline):
+                self._slots.release()
+                self._reject()
+        finally:
+            depth.dec()
+            LLM_GATEWAY_WAIT_SECONDS.labels(provider=self._name).observe(
+                time.monotonic() - start
+            )
+
+    def _admit(self) -> None:
+        start = time.monotonic()
+        deadline = start + self._queue_timeout
+        depth = LLM_GATEWAY_QUEUE_DEPTH.labels(provider=self._name)
+        depth.inc()
+        try:
+            if not self._slots.acquire(timeout=self._queue_timeout):
+                self._reject()
+            if self._bucket is not None and not self._bucket.acquire(deadline):
+                self._slots.release()
+                self._reject()
+        finally:
+            depth.dec()
+            LLM_GATEWAY_WAIT_SECONDS.labels(provider=self._name).observe(
+                time.monotonic() - start
+            )
+
+    def _reject(self) -> None:
+        LLM_GATEWAY_REJECTED.labels(provider=self._name).inc()
+        raise LlmGatewayTimeout(
+            f"LLM provider '{self._name}' is saturated; "
+            f"request waited more than {self._queue_timeout:.0f}s."
+        )
@@ -0,0 +1,81 @@
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from codeatlas.observability.tracing import tracer
+from codeatlas.services.llm.cached_chat_model import prompt_key, render_messages
+from codeatlas.services.llm.gateway import LlmGateway
+
+
+class GatewayChatModel(BaseChatModel):
+    """Routes every upstream call of ``inner`` through an ``LlmGateway``.
+
+    Identical concurrent prompts are coalesced into one call; streams are not
+    coalesced but still hold a concurrency slot for their whole duration.
+    Each call is traced as an ``llm.call`` or ``llm.stream`` span, including
+    time spent queued in the gateway.
+    """
+
+    inner: BaseChatModel
+    gateway: Any
+    model_name: str
+    temperature: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return f"gateway-{self.inner._llm_type}"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        gateway: LlmGateway = self.gateway
+        key = self._key(messages, stop)
+
+        def _call() -> str:
+            response = self.inner.invoke(messages, stop=stop, **kwargs)
+            content = response.content
+            return content if isinstance(content, str) else str(content)
+
+        with tracer.span("llm.call", model=self.model_name):
+            content = gateway.call(key, _call)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        gateway: LlmGateway = self.gateway
+        with tracer.span("llm.stream", model=self.model_name), gateway.slot():
+            for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+                if run_manager is not None and chunk.content:
+                    run_manager.on_llm_new_token(str(chunk.content))
+                yield ChatGenerationChunk(message=chunk)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        gateway: LlmGateway = self.gateway
+        key = self._key(messages, stop)
+
+        async def _call() -> str:
+            response = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+            content = response.content
+            return content if isinstance(content, str) else str(content)
+
+        with tracer.span("llm.call", model=self.model_name):
+            content = await gateway.acall(key, _call)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        gateway: LlmGateway = self.gateway
+        with tracer.span("llm.stream", model=self.model_name):
+            async with gateway.aslot():
+                async for chunk in self.inner.astream(messages, stop=stop, **kwargs):
+                    if run_manager is not None and chunk.content:
+                        await run_manager.on_llm_new_token(str(chunk.content))
+                    yield ChatGenerationChunk(message=chunk)
+
+    def _key(self, messages, stop) -> str:
+        rendered = render_messages(messages)
+        if stop:
+            rendered += f"\nstop: {stop}"
+        return prompt_key(self.model_name, self.temperature, rendered)
@@ -0,0 +1,290 @@
+"""Shared, pooled HTTP clients for OpenAI-compatible chat providers."""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from codeatlas.observability.metrics import (
+    LLM_HTTP_IN_FLIGHT,
+    LLM_HTTP_POOL_CONNECTIONS,
+    LLM_HTTP_REQUESTS,
+    LLM_HTTP_RETRIES,
+)
+
+_RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Failures that mean the server never saw the request
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+# A dropped pooled socket; only safe to retry if no request bytes were written
+_DROPPED_ERRORS = (httpx.RemoteProtocolError, httpx.ReadError)
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After."""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, ceiling)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    max_connections: int
+    in_flight: int
+    open_connections: int
+    idle_connections: int
+    requests: int
+    retries: int
+
+
+class _PoolCounters:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+
+    def started(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+            self.requests += 1
+        LLM_HTTP_IN_FLIGHT.inc()
+
+    def finished(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+        LLM_HTTP_IN_FLIGHT.dec()
+
+    def retried(self) -> None:
+        with self.lock:
+            self.retries += 1
+        LLM_HTTP_RETRIES.inc()
+
+
+class _SendTracker:
+    """httpcore ``trace`` hook noting whether the request reached the socket.
+
+    Chat completions are not idempotent, so a request that may have been
+    sent is never retried on a transport error.
+    """
+
+    def __init__(self, inner=None) -> None:
+        self.sent = False
+        self._inner = inner
+
+    def __call__(self, event: str, info: dict) -> None:
+        self._observe(event)
+        if self._inner is not None:
+            self._inner(event, info)
+
+    def retryable(self, exc: httpx.TransportError) -> bool:
+        if isinstance(exc, _CONNECT_ERRORS):
+            return True
+        return isinstance(exc, _DROPPED_ERRORS) and not self.sent
+
+    def _observe(self, event: str) -> None:
+        if event.endswith("send_request_headers.started"):
+            self.sent = True
+
+
+class _AsyncSendTracker(_SendTracker):
+    async def __call__(self, event: str, info: dict) -> None:
+        self._observe(event)
+        if self._inner is not None:
+            await self._inner(event, info)
+
+
+class RetryTransport(httpx.BaseTransport):
+    def __init__(
+        self, transport: httpx.HTTPTransport, policy: RetryPolicy, counters: _PoolCounters
+    ) -> None:
+        self._transport = transport
+        self._policy = policy
+        self._counters = counters
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._counters.started()
+        trace = request.extensions.get("trace")
+        try:
+            attempt = 0
+            while True:
+                tracker = _SendTracker(trace)
+                request.extensions["trace"] = tracker
+                try:
+                    response = self._transport.handle_request(request)
+                except httpx.TransportError as exc:
+                    if not tracker.retryable(exc) or attempt >= self._policy.max_retries:
+                        LLM_HTTP_REQUESTS.labels(status="error").inc()
+                        raise
+                    time.sleep(self._policy.delay(attempt))
+                else:
+                    if (
+                        response.status_code not in _RETRY_STATUS
+                        or attempt >= self._policy.max_retries
+                    ):
+                        LLM_HTTP_REQUESTS.labels(status=str(response.status_code)).inc()
+                        return response
+                    response.read()
+                    response.close()
+                    time.sleep(self._policy.delay(attempt, response))
+                attempt += 1
+                self._counters.retried()
+                _logger.info("Retrying LLM request (attempt %s)", attempt + 1)
+        finally:
+            self._counters.finished()
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    def __init__(
+        self,
+        transport: httpx.AsyncHTTPTransport,
+        policy: RetryPolicy,
+        counters: _PoolCounters,
+    ) -> None:
+        self._transport = transport
+        self._policy = policy
+        self._counters = counters
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._counters.started()
+        trace = request.extensions.get("trace")
+        try:
+            attempt = 0
+            while True:
+                tracker = _AsyncSendTracker(trace)
+                request.extensions["trace"] = tracker
+                try:
+                    response = await self._transport.handle_async_request(request)
+                except httpx.TransportError as exc:
+                    if not tracker.retryable(exc) or attempt >= self._policy.max_retries:
+                        LLM_HTTP_REQUESTS.labels(status="error").inc()
+                        raise
+                    await asyncio.sleep(self._policy.delay(attempt))
+                else:
+                    if (
+                        response.status_code not in _RETRY_STATUS
+                        or attempt >= self._policy.max_retries
+                    ):
+                        LLM_HTTP_REQUESTS.labels(status=str(response.status_code)).inc()
+                        return response
+                    await response.aread()
+                    await response.aclose()
+                    await asyncio.sleep(self._policy.delay(attempt, response))
+                attempt += 1
+                self._counters.retried()
+                _logger.info("Retrying LLM request (attempt %s)", attempt + 1)
+        finally:
+            self._counters.finished()
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class LlmHttpPool:
+    """One keep-alive connection pool per provider, shared by every chat model.
+
+    HTTP/2 is used when the optional ``h2`` package is installed; otherwise
+    the pool falls back to HTTP/1.1 keep-alive.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        timeout_seconds: float = 60.0,
+        retry_policy: RetryPolicy | None = None,
+        http2: bool = True,
+    ) -> None:
+        self._max_connections = max_connections
+        self._policy = retry_policy or RetryPolicy()
+        self._counters = _PoolCounters()
+        self._http2 = http2 and _h2_available()
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        timeout = httpx.Timeout(timeout_seconds, connect=min(timeout_seconds, 10.0))
+        self._transport = httpx.HTTPTransport(limits=limits, http2=self._http2)
+        self._async_transport = httpx.AsyncHTTPTransport(limits=limits, http2=self._http2)
+        self.client = httpx.Client(
+            transport=RetryTransport(self._transport, self._policy, self._counters),
+            timeout=timeout,
+        )
+        self.async_client = httpx.AsyncClient(
+            transport=AsyncRetryTransport(
+                self._async_transport, self._policy, self._counters
+            ),
+            timeout=timeout,
+        )
+        LLM_HTTP_POOL_CONNECTIONS.labels(state="max").set(max_connections)
+        LLM_HTTP_POOL_CONNECTIONS.labels(state="open").set_function(
+            lambda: self.stats().open_connections
+        )
+        LLM_HTTP_POOL_CONNECTIONS.labels(state="idle").set_function(
+            lambda: self.stats().idle_connections
+        )
+
+    @property
+    def http2(self) -> bool:
+        return self._http2
+
+    def stats(self) -> PoolStats:
+        connections = list(_pool_connections(self._transport))
+        connections += list(_pool_connections(self._async_transport))
+        idle = sum(1 for conn in connections if _is_idle(conn))
+        with self._counters.lock:
+            return PoolStats(
+                max_connections=self._max_connections,
+                in_flight=self._counters.in_flight,
+                open_connections=len(connections),
+                idle_connections=idle,
+                requests=self._counters.requests,
+                retries=self._counters.retries,
+            )
+
+    def close(self) -> None:
+        """Close both clients; from a running event loop use ``aclose``."""
+        self.client.close()
+        asyncio.run(self.async_client.aclose())
+
+    async def aclose(self) -> None:
+        self.client.close()
+        await self.async_client.aclose()
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pool_connections(transport) -> list:
+    # httpx exposes no public pool introspection; read httpcore's pool defensively.
+    pool = getattr(transport, "_pool", None)
+    return list(getattr(pool, "connections", []) or [])
+
+
+def _is_idle(connection) -> bool:
+    is_idle = getattr(connection, "is_idle", None)
+    return bool(is_idle()) if callable(is_idle) else False
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from codeatlas.services.llm.interfaces import LlmResponseCache
+from codeatlas.utils.similarity import best_match
+
+
+@dataclass(frozen=True)
+class _Entry:
+    namespace: str
+    content: str
+    vector: list[float] | None
+    expires_at: float | None
+
+
+class InMemoryLlmCache(LlmResponseCache):
+    """Process-local LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float | None = None) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _expired(entry):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.content
+
+    def put(
+        self,
+        key: str,
+        namespace: str,
+        content: str,
+        vector: list[float] | None = None,
+    ) -> None:
+        expires_at = time.time() + self._ttl_seconds if self._ttl_seconds else None
+        with self._lock:
+            self._entries[key] = _Entry(
+                namespace=namespace, content=content, vector=vector, expires_at=expires_at
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def most_similar(
+        self, namespace: str, vector: list[float], threshold: float
+    ) -> str | None:
+        with self._lock:
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry.namespace == namespace
+                and entry.vector is not None
+                and not _expired(entry)
+            ]
+        if not candidates:
+            return None
+        index, score = best_match(vector, [entry.vector for _, entry in candidates])
+        if index < 0 or score < threshold:
+            return None
+        key, entry = candidates[index]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry.content
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _expired(entry: _Entry) -> bool:
+    return entry.expires_at is not None and entry.expires_at <= time.time()
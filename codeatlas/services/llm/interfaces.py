@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+
+# Run metadata naming the user question inside a rendered prompt
+CACHE_QUESTION_KEY = "cache_question"
+
+
+def cache_config(question: str) -> dict:
+    """Runnable config that marks ``question`` as the semantic cache key.
+
+    Without it a cached chat model only serves exact prompt repeats.
+    """
+    return {"metadata": {CACHE_QUESTION_KEY: question}}
+
+
+class LlmResponseCache(ABC):
+    """Stores chat completions keyed by (model, temperature, rendered prompt).
+
+    ``namespace`` groups entries that may answer each other semantically
+    (same model, temperature and prompt apart from the question); ``vector``
+    is the question embedding used for similarity lookups and is optional.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> str | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(
+        self,
+        key: str,
+        namespace: str,
+        content: str,
+        vector: list[float] | None = None,
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def most_similar(
+        self, namespace: str, vector: list[float], threshold: float
+    ) -> str | None:
+        raise NotImplementedError
@@ -1,46 +1,161 @@
-import logging
+from __future__ import annotations
 
-from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import AIMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
-from langchain_openai import ChatOpenAI
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
 
+from codeatlas.services.llm.interfaces import LlmResponseCache
+from codeatlas.services.retrieval.embedding import EmbeddingService
 from codeatlas.utils.config import AppConfig
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from langchain_core.language_models import BaseChatModel
+
+    from codeatlas.services.llm.gateway import LlmGateway
+    from codeatlas.services.llm.http_pool import LlmHttpPool
+
 
 class LlmProvider:
-    def __init__(self, config: AppConfig) -> None:
+    def __init__(
+        self,
+        config: AppConfig,
+        embedder: EmbeddingService | None = None,
+        executor: Executor | None = None,
+    ) -> None:
         self._config = config
+        self._embedder = embedder
+        self._executor = executor
+        self._cache: LlmResponseCache | None = None
+        self._http_pool: LlmHttpPool | None = None
+        self._gateway: LlmGateway | None = None
+        self._chat_model: BaseChatModel | None = None
+        self._lock = threading.RLock()
         self._logger = logging.getLogger(__name__)
 
     def get_chat_model(self) -> BaseChatModel:
-        if self._config.llm_provider == "openai":
-            return ChatOpenAI(
-                model=self._config.llm_model,
-                temperature=self._config.llm_temperature,
+        """Return the provider's shared chat model, building it on first use."""
+        with self._lock:
+            if self._chat_model is None:
+                self._chat_model = self._wrap_chat_model(self._build_chat_model())
+            return self._chat_model
+
+    def _wrap_chat_model(self, model: BaseChatModel) -> BaseChatModel:
+        if model._llm_type == "fallback":
+            return model
+        from codeatlas.services.llm.gateway_chat_model import GatewayChatModel
+
+        model = GatewayChatModel(
+            inner=model,
+            gateway=self.get_gateway(),
+            model_name=self._model_label(),
+            temperature=self._config.llm_temperature,
+        )
+        cache = self.get_response_cache()
+        if cache is None:
+            return model
+        from codeatlas.services.llm.cached_chat_model import CachedChatModel
+
+        return CachedChatModel(
+            inner=model,
+            response_cache=cache,
+            model_name=self._model_label(),
+            temperature=self._config.llm_temperature,
+            embedder=self._embedder,
+            similarity_threshold=self._config.llm_cache_similarity_threshold,
+            executor=self._executor,
+        )
+
+    def get_gateway(self) -> LlmGateway:
+        """Concurrency/rate limiter shared by every caller of this provider."""
+        with self._lock:
+            if self._gateway is None:
+                from codeatlas.services.llm.gateway import LlmGateway
+
+                self._gateway = LlmGateway(
+                    name=self._config.llm_provider,
+                    max_concurrency=self._config.llm_max_concurrency,
+                    requests_per_second=self._config.llm_rate_limit_rps,
+                    burst=self._config.llm_rate_limit_burst,
+                    queue_timeout_seconds=self._config.llm_queue_timeout_seconds,
+                )
+            return self._gateway
+
+    def get_response_cache(self) -> LlmResponseCache | None:
+        if self._cache is not None:
+            return self._cache
+        backend = self._config.llm_cache_backend
+        ttl = self._config.llm_cache_ttl_seconds or None
+        if backend == "memory":
+            from codeatlas.services.llm.in_memory_cache import InMemoryLlmCache
+
+            self._cache = InMemoryLlmCache(
+                max_entries=self._config.llm_cache_max_entries, ttl_seconds=ttl
+            )
+        elif backend == "sqlite":
+            from codeatlas.services.llm.sqlite_cache import SqliteLlmCache
+
+            self._cache = SqliteLlmCache(
+                db_path=str(Path(self._config.state_dir) / "llm_cache.sqlite3"),
+                max_entries=self._config.llm_cache_max_entries,
+                ttl_seconds=ttl,
             )
-        elif self._config.llm_provider == "groq":
+        elif backend not in ("", "none"):
+            self._logger.warning("Unknown LLM cache backend %r; caching disabled", backend)
+        return self._cache
+
+    def get_http_pool(self) -> LlmHttpPool:
+        """Connection pool shared by every chat model this provider hands out."""
+        with self._lock:
+            if self._http_pool is None:
+                from codeatlas.services.llm.http_pool import LlmHttpPool, RetryPolicy
+
+                self._http_pool = LlmHttpPool(
+                    max_connections=self._config.llm_max_connections,
+                    max_keepalive_connections=self._config.llm_max_keepalive_connections,
+                    timeout_seconds=self._config.llm_timeout_seconds,
+                    retry_policy=RetryPolicy(max_retries=self._config.llm_max_retries),
+                    http2=self._config.llm_http2,
+                )
+            return self._http_pool
+
+    def _model_label(self) -> str:
+        return f"{self._config.llm_provider}/{self._config.llm_model}"
+
+    def _build_chat_model(self) -> BaseChatModel:
+        if self._config.llm_provider in ("openai", "groq"):
             import os
+            from langchain_openai import ChatOpenAI
+
+            base_url = self._config.llm_base_url
+            api_key = None
+            if self._config.llm_provider == "groq":
+                base_url = base_url or "https://api.groq.com/openai/v1"
+                api_key = os.getenv("GROQ_API_KEY")
+            pool = self.get_http_pool()
             return ChatOpenAI(
-                base_url="https://api.groq.com/openai/v1",
-                api_key=os.getenv("GROQ_API_KEY"),
+                base_url=base_url,
+                api_key=api_key,
                 model=self._config.llm_model,
                 temperature=self._config.llm_temperature,
+                timeout=self._config.llm_timeout_seconds,
+                # Retries (with jittered backoff) happen in the pool's transport.
+                max_retries=0,
+                http_client=pool.client,
+                http_async_client=pool.async_client,
             )
-        return FallbackChatModel()
-
-
-class FallbackChatModel(BaseChatModel):
-    @property
-    def _llm_type(self) -> str:
-        return "fallback"
+        elif self._config.llm_provider == "stub":
+            from codeatlas.services.llm.stub import StubChatModel
 
-    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
-        content = (
-            "LLM provider not configured. "
-            "Set CODEATLAS_LLM_PROVIDER and relevant API keys."
-        )
-        return self._create_chat_result(content)
+            return StubChatModel(
+                latency_seconds=self._config.llm_stub_latency_seconds,
+                latency_distribution=self._config.llm_stub_latency_distribution,
+                token_latency_seconds=self._config.llm_stub_token_latency_seconds,
+                response_tokens=self._config.llm_stub_response_tokens,
+                failure_rate=self._config.llm_stub_failure_rate,
+            )
+        from codeatlas.services.llm.fallback import FallbackChatModel
 
-    def _create_chat_result(self, content: str) -> ChatResult:
-        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+        return FallbackChatModel()
@@ -0,0 +1,143 @@
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from codeatlas.services.llm.interfaces import LlmResponseCache
+from codeatlas.utils.similarity import best_match
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    content TEXT NOT NULL,
+    vector BLOB,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_namespace ON llm_cache(namespace);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access);
+"""
+
+
+class SqliteLlmCache(LlmResponseCache):
+    """On-disk LLM response cache shared by every worker on the host.
+
+    Entries expire after ``ttl_seconds``; once the table grows past
+    ``max_entries`` the least recently read rows are evicted, a tenth of the
+    capacity at a time. The row count is tracked in memory and only recounted
+    when it says the table is full, so inserts rarely scan the table.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_entries: int = 10000,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return content
+
+    def put(
+        self,
+        key: str,
+        namespace: str,
+        content: str,
+        vector: list[float] | None = None,
+    ) -> None:
+        now = time.time()
+        expires_at = now + self._ttl_seconds if self._ttl_seconds else None
+        blob = array("f", vector).tobytes() if vector is not None else None
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, namespace, content, vector, created_at, last_access, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, content, blob, now, now, expires_at),
+            )
+            if exists is None:
+                self._count += 1
+            if self._count > self._max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def most_similar(
+        self, namespace: str, vector: list[float], threshold: float
+    ) -> str | None:
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, content, vector FROM llm_cache "
+                "WHERE namespace = ? AND vector IS NOT NULL "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, now),
+            ).fetchall()
+        if not rows:
+            return None
+        vectors = [array("f", blob).tolist() for _, _, blob in rows]
+        index, score = best_match(vector, vectors)
+        if index < 0 or score < threshold:
+            return None
+        key, content, _ = rows[index]
+        with self._lock:
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return content
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+        # Other workers share the table, so recount before trimming
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        excess = count - self._max_entries
+        if excess > 0:
+            excess += self._max_entries // 10
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+            self._logger.debug("Evicted %s LLM cache entries", excess)
+        self._count = count - max(excess, 0)
@@ -0,0 +1,139 @@
+import asyncio
+import itertools
+import math
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class StubLlmError(RuntimeError):
+    """A provider failure injected by ``StubChatModel.failure_rate``."""
+
+
+class StubChatModel(BaseChatModel):
+    """Deterministic local chat model for tests and offline runs.
+
+    Replies with ``responses`` in order (cycling), or echoes the last message
+    when none are configured. ``call_count`` records upstream calls so tests
+    can assert how many LLM round trips a code path makes, and
+    ``latency_seconds`` simulates a provider round trip (async calls sleep
+    without blocking the event loop).
+
+    For load tests the round trip can be drawn from ``latency_distribution``
+    with ``latency_seconds`` as its mean (``lognormal`` has a long tail set
+    by ``latency_sigma``), streamed tokens can be spaced by
+    ``token_latency_seconds``, ``response_tokens`` pads or trims replies to
+    a realistic length, and ``failure_rate`` of calls raise ``StubLlmError``
+    after their latency. ``seed`` makes the random draws repeatable.
+    """
+
+    responses: list[str] = []
+    call_count: int = 0
+    latency_seconds: float = 0.0
+    latency_distribution: str = "fixed"
+    latency_sigma: float = 0.5
+    token_latency_seconds: float = 0.0
+    response_tokens: int = 0
+    failure_rate: float = 0.0
+    seed: int | None = None
+    # random.Random seeded from ``seed``, created on the first draw
+    rng: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        content = self._next_response(messages)
+        self.call_count += 1
+        delay = self._round_trip_seconds()
+        if delay:
+            time.sleep(delay)
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        content = self._next_response(messages)
+        self.call_count += 1
+        delay = self._round_trip_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        content = self._next_response(messages)
+        self.call_count += 1
+        delay = self._round_trip_seconds()
+        if delay:
+            time.sleep(delay)
+        self._maybe_fail()
+        for index, token in enumerate(re.findall(r"\S+\s*|\s+", content)):
+            if index and self.token_latency_seconds:
+                time.sleep(self.token_latency_seconds)
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        content = self._next_response(messages)
+        self.call_count += 1
+        delay = self._round_trip_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+        self._maybe_fail()
+        for index, token in enumerate(re.findall(r"\S+\s*|\s+", content)):
+            if index and self.token_latency_seconds:
+                await asyncio.sleep(self.token_latency_seconds)
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    def _next_response(self, messages) -> str:
+        if self.responses:
+            content = self.responses[self.call_count % len(self.responses)]
+        else:
+            last = messages[-1].content if messages else ""
+            content = f"Stub answer: {str(last)[:200]}"
+        if self.response_tokens:
+            words = content.split() or ["stub"]
+            content = " ".join(itertools.islice(itertools.cycle(words), self.response_tokens))
+        return content
+
+    def _round_trip_seconds(self) -> float:
+        mean = self.latency_seconds
+        if mean <= 0 or self.latency_distribution == "fixed":
+            return max(mean, 0.0)
+        rng = self._random()
+        if self.latency_distribution == "uniform":
+            return rng.uniform(0, 2 * mean)
+        if self.latency_distribution == "exponential":
+            return rng.expovariate(1 / mean)
+        if self.latency_distribution == "lognormal":
+            # mu chosen so the mean stays ``latency_seconds`` whatever the sigma
+            mu = math.log(mean) - self.latency_sigma**2 / 2
+            return rng.lognormvariate(mu, self.latency_sigma)
+        raise ValueError(
+            f"Unknown latency distribution {self.latency_distribution!r}; "
+            f"use one of {LATENCY_DISTRIBUTIONS}"
+        )
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate and self._random().random() < self.failure_rate:
+            raise StubLlmError("Injected stub LLM failure")
+
+    def _random(self) -> random.Random:
+        if self.rng is None:
+            self.rng = random.Random(self.seed)
+        return self.rng
@@ -1,3 +1,6 @@
+from __future__ import annotations
+
+import re
 from abc import ABC, abstractmethod
 
 from codeatlas.models.agent_memory import AgentMemory
@@ -11,3 +14,29 @@ class MemoryStore(ABC):
     @abstractmethod
     def list(self, scope: str) -> list[AgentMemory]:
         raise NotImplementedError
+
+    def recent(self, scope: str, limit: int = 20, offset: int = 0) -> list[AgentMemory]:
+        """A page of ``scope``'s memories, newest first."""
+        newest_first = self.list(scope)[::-1]
+        return newest_first[offset : offset + limit]
+
+    def count(self, scope: str) -> int:
+        return len(self.list(scope))
+
+    def recall(self, scope: str, query: str, top_k: int = 3) -> list[AgentMemory]:
+        """The ``top_k`` memories of ``scope`` most relevant to ``query``.
+
+        Stores without embeddings rank by shared words; ties go to newer notes.
+        """
+        query_words = _words(query)
+        scored = [
+            (len(query_words & _words(memory.content)), position, memory)
+            for position, memory in enumerate(self.list(scope))
+        ]
+        scored = [item for item in scored if item[0] > 0]
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [memory for _, _, memory in scored[:top_k]]
+
+
+def _words(text: str) -> set[str]:
+    return set(re.findall(r"[a-z0-9_]{3,}", text.lower()))
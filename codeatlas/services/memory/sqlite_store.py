@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+from codeatlas.models.agent_memory import AgentMemory
+from codeatlas.services.memory.interfaces import MemoryStore
+from codeatlas.services.memory.vector_index import MemoryVectorIndex
+from codeatlas.services.retrieval.embedding import EmbeddingService
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    memory_id TEXT NOT NULL UNIQUE,
+    scope TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    vector BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_memories_scope_seq ON memories(scope, seq);
+"""
+
+
+class SqliteMemoryStore(MemoryStore):
+    """Agent memories in an append-only SQLite table, indexed by scope.
+
+    Each save is one INSERT, and every API worker opens the same WAL-mode
+    file, so concurrent writers from several processes serialize in SQLite
+    rather than overwriting each other. ``recent`` pages through a scope
+    newest first using the (scope, seq) index. Every ``compact_every`` saves
+    the store trims scopes above ``max_per_scope`` (when set) and truncates
+    the WAL. Memories in a ``JsonMemoryStore`` file at ``legacy_json_path``
+    are imported the first time the table is empty.
+
+    With an ``embedder`` each memory is embedded on save and ``recall``
+    ranks a scope by cosine similarity. A scope's vectors are loaded into
+    memory on its first recall and topped up with rows other workers have
+    added since; rows saved without a vector are embedded then.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_per_scope: int | None = None,
+        compact_every: int = 1000,
+        legacy_json_path: str | None = None,
+        embedder: EmbeddingService | None = None,
+        recall_min_similarity: float = 0.2,
+    ) -> None:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_per_scope = max_per_scope
+        self._compact_every = compact_every
+        self._saves_since_compaction = 0
+        self._embedder = embedder
+        self._recall_min_similarity = recall_min_similarity
+        self._index = MemoryVectorIndex()
+        self._indexed_seq: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(memories)")}
+        if "vector" not in columns:
+            # Databases created before memories were embedded
+            self._conn.execute("ALTER TABLE memories ADD COLUMN vector BLOB")
+        self._conn.commit()
+        if legacy_json_path:
+            self._import_legacy(Path(legacy_json_path))
+
+    def save(self, memory: AgentMemory) -> None:
+        vector = None
+        if self._embedder is not None:
+            vector = self._embedder.embed_texts([memory.content])[0]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO memories "
+                "(memory_id, scope, content, created_at, vector) VALUES (?, ?, ?, ?, ?)",
+                (
+                    memory.memory_id,
+                    memory.scope,
+                    memory.content,
+                    memory.created_at.isoformat(),
+                    _pack(vector),
+                ),
+            )
+            self._conn.commit()
+            self._saves_since_compaction += 1
+            due = self._saves_since_compaction >= self._compact_every
+        if due:
+            self.compact()
+
+    def list(self, scope: str) -> list[AgentMemory]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT memory_id, scope, content, created_at FROM memories "
+                "WHERE scope = ? ORDER BY seq",
+                (scope,),
+            ).fetchall()
+        return [_memory(row) for row in rows]
+
+    def recent(self, scope: str, limit: int = 20, offset: int = 0) -> list[AgentMemory]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT memory_id, scope, content, created_at FROM memories "
+                "WHERE scope = ? ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (scope, limit, offset),
+            ).fetchall()
+        return [_memory(row) for row in rows]
+
+    def count(self, scope: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM memories WHERE scope = ?", (scope,)
+            ).fetchone()[0]
+
+    def recall(self, scope: str, query: str, top_k: int = 3) -> list[AgentMemory]:
+        if self._embedder is None:
+            return super().recall(scope, query, top_k)
+        self._sync_index(scope)
+        query_vector = self._embedder.embed_query(query)
+        with self._lock:
+            ranked = self._index.top_k(scope, query_vector, top_k, self._recall_min_similarity)
+        if not ranked:
+            return []
+        ids = [memory_id for memory_id, _ in ranked]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT memory_id, scope, content, created_at FROM memories "
+                f"WHERE memory_id IN ({', '.join('?' * len(ids))})",
+                ids,
+            ).fetchall()
+        # Rows compacted away by another worker simply drop out
+        by_id = {row[0]: _memory(row) for row in rows}
+        return [by_id[memory_id] for memory_id in ids if memory_id in by_id]
+
+    def _sync_index(self, scope: str) -> None:
+        """Load vectors saved to ``scope`` since the last sync, embedding any missing."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, memory_id, content, vector FROM memories "
+                "WHERE scope = ? AND seq > ? ORDER BY seq",
+                (scope, self._indexed_seq.get(scope, 0)),
+            ).fetchall()
+        if not rows:
+            return
+        missing = [row for row in rows if row[3] is None]
+        if missing:
+            vectors = self._embedder.embed_texts([row[2] for row in missing])
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE memories SET vector = ? WHERE seq = ?",
+                    [(_pack(vector), row[0]) for row, vector in zip(missing, vectors)],
+                )
+                self._conn.commit()
+            embedded = {row[0]: vector for row, vector in zip(missing, vectors)}
+        else:
+            embedded = {}
+        with self._lock:
+            for seq, memory_id, _, blob in rows:
+                vector = embedded.get(seq) or array("f", blob).tolist()
+                self._index.add(scope, memory_id, vector)
+            self._indexed_seq[scope] = rows[-1][0]
+
+    def compact(self) -> int:
+        """Apply the per-scope retention limit and truncate the WAL.
+
+        Returns the number of memories removed.
+        """
+        removed = 0
+        with self._lock:
+            if self._max_per_scope:
+                cursor = self._conn.execute(
+                    "DELETE FROM memories WHERE seq IN ("
+                    "SELECT seq FROM (SELECT seq, ROW_NUMBER() OVER "
+                    "(PARTITION BY scope ORDER BY seq DESC) AS rank FROM memories) "
+                    "WHERE rank > ?)",
+                    (self._max_per_scope,),
+                )
+                removed = cursor.rowcount
+                self._conn.commit()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._saves_since_compaction = 0
+            if removed:
+                self._index.clear()
+                self._indexed_seq.clear()
+        if removed:
+            self._logger.info("Compacted memory store, removed %s memories", removed)
+        return removed
+
+    def _import_legacy(self, path: Path) -> None:
+        if not path.exists():
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM memories LIMIT 1").fetchone():
+                return
+        try:
+            items = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            self._logger.warning("Could not import legacy memories from %s: %s", path, exc)
+            return
+        fields = ("memory_id", "scope", "content", "created_at")
+        rows = [
+            tuple(item[field] for field in fields)
+            for item in items
+            if isinstance(item, dict) and all(field in item for field in fields)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO memories (memory_id, scope, content, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        self._logger.info("Imported %s legacy memories from %s", len(rows), path)
+
+
+def _memory(row: tuple) -> AgentMemory:
+    memory_id, scope, content, created_at = row
+    return AgentMemory(
+        memory_id=memory_id,
+        scope=scope,
+        content=content,
+        created_at=datetime.fromisoformat(created_at),
+    )
+
+
+def _pack(vector: list[float] | None) -> bytes | None:
+    return array("f", vector).tobytes() if vector is not None else None
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class _ScopeVectors:
+    def __init__(self) -> None:
+        self.vectors: dict[str, list[float]] = {}
+        self.matrix: np.ndarray | None = None
+        self.ids: list[str] = []
+
+
+class MemoryVectorIndex:
+    """Memory embeddings grouped by scope for top-k cosine recall.
+
+    Each scope keeps its vectors by memory id and stacks them into a matrix
+    on the first query after a change, so a recall costs one matrix-vector
+    product over that scope only.
+    """
+
+    def __init__(self) -> None:
+        self._scopes: dict[str, _ScopeVectors] = {}
+
+    def add(self, scope: str, memory_id: str, vector: list[float]) -> None:
+        entry = self._scopes.setdefault(scope, _ScopeVectors())
+        entry.vectors[memory_id] = vector
+        entry.matrix = None
+
+    def clear(self) -> None:
+        self._scopes.clear()
+
+    def top_k(
+        self, scope: str, query: list[float], k: int, min_score: float = 0.0
+    ) -> list[tuple[str, float]]:
+        """Up to ``k`` (memory_id, cosine) pairs scoring at least ``min_score``.
+
+        Vectors whose dimension differs from the query (written by a
+        previously configured embedder) are ignored.
+        """
+        import numpy as np
+
+        entry = self._scopes.get(scope)
+        if entry is None or not entry.vectors or not query or k <= 0:
+            return []
+        if entry.matrix is None or entry.matrix.shape[1] != len(query):
+            entry.ids = [
+                memory_id
+                for memory_id, vector in entry.vectors.items()
+                if len(vector) == len(query)
+            ]
+            if not entry.ids:
+                return []
+            matrix = np.asarray([entry.vectors[i] for i in entry.ids], dtype="float32")
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            entry.matrix = matrix / norms
+        vector = np.asarray(query, dtype="float32")
+        vector /= np.linalg.norm(vector) or 1.0
+        scores = entry.matrix @ vector
+        best = np.argsort(-scores)[:k]
+        return [
+            (entry.ids[i], float(scores[i])) for i in best if scores[i] >= min_score
+        ]
@@ -1,43 +1,45 @@
+from __future__ import annotations
+
 import logging
 from pathlib import Path
-
-from tree_sitter import Node
-from tree_sitter_languages import get_parser
+from typing import TYPE_CHECKING
 
 from codeatlas.models.function_node import FunctionNode
-from codeatlas.models.parsed_repository import ParsedRepository
+from codeatlas.models.parsed_repository import ParsedRepository, ParsedRepositoryBuilder
 from codeatlas.models.repository import Repository
-from codeatlas.models.source_file import SourceFile
+from codeatlas.observability.tracing import tracer
 from codeatlas.services.parsing.interfaces import AstParser
 
+if TYPE_CHECKING:
+    from tree_sitter import Node
+
 
 class TreeSitterAstParser(AstParser):
     def parse_repository(self, repository: Repository) -> ParsedRepository:
-        root = Path(repository.root_path)
-        files: list[SourceFile] = []
-        functions: list[FunctionNode] = []
-
-        for path in root.rglob("*"):
-            if not path.is_file():
-                continue
-            language = self._language_from_suffix(path.suffix)
-            if language is None:
-                continue
-            file_functions = self._parse_file(path, language)
-            files.append(
-                SourceFile(
-                    path=str(path),
-                    language=language,
-                    size_bytes=path.stat().st_size,
-                )
-            )
-            functions.extend(file_functions)
+        with tracer.span("parse", repo_id=repository.repo_id) as span:
+            root = Path(repository.root_path)
+            builder = ParsedRepositoryBuilder(repository.repo_id)
+
+            for path in root.rglob("*"):
+                if not path.is_file():
+                    continue
+                language = self._language_from_suffix(path.suffix)
+                if language is None:
+                    continue
+                file_functions = self._parse_file(path, language)
+                builder.add_file(str(path), language, path.stat().st_size)
+                for function in file_functions:
+                    builder.add_function(
+                        function.name,
+                        function.file_path,
+                        function.start_line,
+                        function.end_line,
+                        function.signature,
+                    )
 
-        return ParsedRepository(
-            repository_id=repository.repo_id,
-            files=files,
-            functions=functions,
-        )
+            parsed = builder.build()
+            span.set_attribute("files", len(parsed.files))
+            return parsed
 
     # Mapping of file extensions to tree-sitter language identifiers
     _SUFFIX_MAP: dict[str, str] = {
@@ -67,6 +69,8 @@ class TreeSitterAstParser(AstParser):
         return self._SUFFIX_MAP.get(suffix)
 
     def _parse_file(self, path: Path, language: str) -> list[FunctionNode]:
+        from tree_sitter_languages import get_parser
+
         try:
             parser = get_parser(language)
         except Exception as exc:
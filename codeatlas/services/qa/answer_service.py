@@ -1,14 +1,23 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 import logging
-from pathlib import Path
 import re
-
-from langchain_core.language_models import BaseChatModel
-from langchain_core.prompts import ChatPromptTemplate
+from typing import TYPE_CHECKING
 
 from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.observability.tracing import tracer
+from codeatlas.services.llm.interfaces import cache_config
+from codeatlas.services.qa.context_packer import ContextPacker, file_lines, parse_int
 from codeatlas.services.retrieval.embedding import EmbeddingService
 from codeatlas.services.retrieval.interfaces import CodeRetriever
+from codeatlas.utils.executors import run_blocking
+from codeatlas.utils.tokens import count_tokens
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from langchain_core.language_models import BaseChatModel
 
 
 def _clean_display_path(raw_path: str) -> str:
@@ -26,6 +35,12 @@ def _clean_display_path(raw_path: str) -> str:
     return after_marker.replace("\\", "/")
 
 
+_NO_RESULTS = [
+    "No relevant code locations found.",
+    "Try a different query or re-run analysis.",
+]
+
+
 @dataclass(frozen=True)
 class GroundedAnswer:
     answer: str
@@ -33,17 +48,36 @@ class GroundedAnswer:
     reasoning_steps: list[str]
 
 
+@dataclass(frozen=True)
+class RetrievedContext:
+    records: list[EmbeddingRecord]
+    citations: list[str]
+    context: str
+    reasoning_steps: list[str]
+
+
 class AnswerService:
     def __init__(
         self,
         retriever: CodeRetriever,
         embedder: EmbeddingService,
         llm: BaseChatModel | None = None,
+        executor: Executor | None = None,
+        context_token_budget: int = 3000,
+        context_window_lines: int = 8,
     ) -> None:
         self._retriever = retriever
         self._embedder = embedder
         self._llm = llm
+        self._executor = executor
+        self._packer = ContextPacker(
+            token_budget=context_token_budget,
+            window_lines=context_window_lines,
+            display_path=_clean_display_path,
+        )
         self._logger = logging.getLogger(__name__)
+        from langchain_core.prompts import ChatPromptTemplate
+
         self._prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -57,46 +91,95 @@ class AnswerService:
 
     def answer(self, repo_id: str, question: str, top_k: int = 5) -> GroundedAnswer:
         self._logger.info("Answering question for repo %s", repo_id)
-        query_vector = self._embedder.embed_query(question)
-        records = self._retriever.search(repo_id, query_vector, max(top_k, 10))
-        records = self._rerank(question, records)[:top_k]
-        self._logger.info("Retrieved %s records for repo %s", len(records), repo_id)
-        citations = [self._citation_text(record) for record in records]
-        answer_lines = self._format_answer(question, records)
-        reasoning = [
-            f"Embedded query for repo_id={repo_id}.",
-            f"Retrieved {len(records)} records.",
-        ]
+        retrieved = self.retrieve(repo_id, question, top_k)
+        answer_lines = self._format_answer(question, retrieved.records, retrieved.context)
+        return GroundedAnswer(
+            answer="\n".join(answer_lines),
+            citations=retrieved.citations,
+            reasoning_steps=retrieved.reasoning_steps,
+        )
+
+    async def aanswer(self, repo_id: str, question: str, top_k: int = 5) -> GroundedAnswer:
+        self._logger.info("Answering question for repo %s", repo_id)
+        retrieved = await self.aretrieve(repo_id, question, top_k)
+        answer_lines = await self._aformat_answer(question, retrieved.records, retrieved.context)
         return GroundedAnswer(
             answer="\n".join(answer_lines),
-            citations=citations,
-            reasoning_steps=reasoning,
+            citations=retrieved.citations,
+            reasoning_steps=retrieved.reasoning_steps,
+        )
+
+    async def aretrieve(self, repo_id: str, question: str, top_k: int = 5) -> RetrievedContext:
+        """``retrieve`` on the bounded executor: embedding and FAISS search block."""
+        return await run_blocking(self._executor, self.retrieve, repo_id, question, top_k)
+
+    def retrieve(self, repo_id: str, question: str, top_k: int = 5) -> RetrievedContext:
+        """Embed, search and rerank without calling the LLM."""
+        with tracer.span("embed.query"):
+            query_vector = self._embedder.embed_query(question)
+        with tracer.span("faiss.search", repo_id=repo_id):
+            records = self._retriever.search(repo_id, query_vector, max(top_k, 10))
+        # Rerank, packing and citations read the same files; read each once
+        files: dict[str, list[str]] = {}
+        with tracer.span("rerank", candidates=len(records)):
+            records = self.rerank(question, records, files)[:top_k]
+        self._logger.info("Retrieved %s records for repo %s", len(records), repo_id)
+        with tracer.span("context.pack"):
+            context, packing_steps = self._build_context(question, records, files)
+        return RetrievedContext(
+            records=records,
+            citations=[self._citation_text(record, files) for record in records],
+            context=context,
+            reasoning_steps=[
+                f"Embedded query for repo_id={repo_id}.",
+                f"Retrieved {len(records)} records.",
+                *packing_steps,
+            ],
         )
 
-    def _format_answer(self, question: str, records: list[EmbeddingRecord]) -> list[str]:
+    def _format_answer(
+        self, question: str, records: list[EmbeddingRecord], context: str
+    ) -> list[str]:
         if not records:
-            return [
-                "No relevant code locations found.",
-                "Try a different query or re-run analysis.",
-            ]
+            return list(_NO_RESULTS)
 
         if self._llm is None:
-            lines = ["Top relevant locations:"]
-            for record in records:
-                lines.append(self._format_record(record))
-            return lines
+            return self._location_lines(records)
 
-        context = self._build_context(records)
         try:
             chain = self._prompt | self._llm
-            response = chain.invoke({"question": question, "context": context})
+            response = chain.invoke(
+                {"question": question, "context": context}, config=cache_config(question)
+            )
             return [response.content]
         except Exception as exc:
             self._logger.warning("LLM answer failed, falling back: %s", exc)
-            lines = ["Top relevant locations:"]
-            for record in records:
-                lines.append(self._format_record(record))
-            return lines
+            return self._location_lines(records)
+
+    async def _aformat_answer(
+        self, question: str, records: list[EmbeddingRecord], context: str
+    ) -> list[str]:
+        if not records:
+            return list(_NO_RESULTS)
+
+        if self._llm is None:
+            return self._location_lines(records)
+
+        try:
+            chain = self._prompt | self._llm
+            response = await chain.ainvoke(
+                {"question": question, "context": context}, config=cache_config(question)
+            )
+            return [response.content]
+        except Exception as exc:
+            self._logger.warning("LLM answer failed, falling back: %s", exc)
+            return self._location_lines(records)
+
+    def _location_lines(self, records: list[EmbeddingRecord]) -> list[str]:
+        lines = ["Top relevant locations:"]
+        for record in records:
+            lines.append(self._format_record(record))
+        return lines
 
     def _format_record(self, record: EmbeddingRecord) -> str:
         path = _clean_display_path(record.metadata.get("path", ""))
@@ -107,9 +190,9 @@ class AnswerService:
         label = f"{language} file" if language else "file"
         return f"- {label}: {path}"
 
-    def _citation_text(self, record: EmbeddingRecord) -> str:
+    def _citation_text(self, record: EmbeddingRecord, files: dict[str, list[str]]) -> str:
         display_path = _clean_display_path(record.metadata.get("path", ""))
-        snippet = _record_snippet(record)
+        snippet = _record_snippet(record, files)
         snippet = " ".join(snippet.splitlines()[:2]).strip()
         if len(snippet) > 200:
             snippet = f"{snippet[:200]}..."
@@ -117,21 +200,38 @@ class AnswerService:
         prefix = f"{display_path}{line_range}"
         return f"{prefix} | {snippet}" if snippet else prefix
 
-    def _build_context(self, records: list[EmbeddingRecord]) -> str:
-        chunks: list[str] = []
-        for record in records:
-            display_path = _clean_display_path(record.metadata.get("path", ""))
-            snippet = _record_snippet(record)
-            chunks.append(f"[{display_path}]\n{snippet}")
-        return "\n\n".join(chunks)
+    def _build_context(
+        self, question: str, records: list[EmbeddingRecord], files: dict[str, list[str]]
+    ) -> tuple[str, list[str]]:
+        """Pack snippets under the context budget; also returns reasoning steps."""
+        if not records:
+            return "", []
+        packed = self._packer.pack(question, records, files)
+        steps = [
+            f"Packed {len(packed.chunks)} snippets into {packed.tokens} context tokens"
+            f" ({packed.duplicates} duplicate ranges, {packed.dropped} over budget)."
+        ]
+        prompt = self._prompt.format(question=question, context=packed.text)
+        steps.append(f"Prompt size: ~{count_tokens(prompt)} tokens.")
+        return packed.text, steps
+
+    def rerank(
+        self,
+        query: str,
+        records: list[EmbeddingRecord],
+        files: dict[str, list[str]] | None = None,
+    ) -> list[EmbeddingRecord]:
+        """Order ``records`` by identifier overlap between ``query`` and their source.
 
-    def _rerank(self, query: str, records: list[EmbeddingRecord]) -> list[EmbeddingRecord]:
+        ``files`` caches file lines by path across calls in one request.
+        """
         query_tokens = _tokenize(query)
         if not query_tokens:
             return records
+        files = {} if files is None else files
         scored: list[tuple[float, EmbeddingRecord]] = []
         for record in records:
-            snippet = _record_snippet(record)
+            snippet = _record_snippet(record, files)
             score = _overlap_score(query_tokens, snippet)
             # Penalize __init__.py files with little content
             path = record.metadata.get("path", "")
@@ -142,33 +242,18 @@ class AnswerService:
         return [record for _, record in scored]
 
 
-def _record_snippet(record: EmbeddingRecord) -> str:
+def _record_snippet(record: EmbeddingRecord, files: dict[str, list[str]]) -> str:
     path = record.metadata.get("path")
     if not path:
         return ""
+    lines = file_lines(path, files)
     if record.scope == "function":
-        start = _parse_int(record.metadata.get("start_line"))
-        end = _parse_int(record.metadata.get("end_line"))
+        start = parse_int(record.metadata.get("start_line"))
+        end = parse_int(record.metadata.get("end_line"))
         if start and end:
-            return _read_snippet(Path(path), start, end)
-    return _safe_read(Path(path))
-
-
-def _safe_read(path: Path) -> str:
-    try:
-        return path.read_text(encoding="utf-8", errors="replace")
-    except OSError:
-        return ""
-
-
-def _read_snippet(path: Path, start_line: int, end_line: int) -> str:
-    try:
-        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
-    except OSError:
-        return ""
-    start = max(start_line - 1, 0)
-    end = max(end_line, start)
-    return "\n".join(lines[start:end])
+            start = max(start - 1, 0)
+            return "\n".join(lines[start : max(end, start)])
+    return "\n".join(lines)
 
 
 def _tokenize(text: str) -> set[str]:
@@ -185,18 +270,9 @@ def _overlap_score(query_tokens: set[str], text: str) -> float:
     return len(query_tokens & tokens) / len(query_tokens)
 
 
-def _parse_int(value: str | None) -> int | None:
-    if not value:
-        return None
-    try:
-        return int(value)
-    except ValueError:
-        return None
-
-
 def _line_range(record: EmbeddingRecord) -> str:
-    start = _parse_int(record.metadata.get("start_line"))
-    end = _parse_int(record.metadata.get("end_line"))
+    start = parse_int(record.metadata.get("start_line"))
+    end = parse_int(record.metadata.get("end_line"))
     if start is None or end is None:
         return ""
     return f" (lines {start}-{end})"
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import re
+from typing import Callable
+
+from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.utils.tokens import count_tokens
+
+# Words that show up in most questions and most comments; matching on them
+# would pull arbitrary regions out of file records.
+_STOPWORDS = frozenset(
+    {
+        "and", "are", "can", "does", "for", "from", "how", "into", "the", "this",
+        "that", "use", "used", "what", "when", "where", "which", "who", "why", "with",
+    }
+)
+
+# Below this many tokens a truncated chunk is more header than code
+_MIN_CHUNK_TOKENS = 32
+
+
+@dataclass(frozen=True)
+class ContextChunk:
+    path: str
+    start_line: int
+    end_line: int
+    scope: str
+    text: str
+
+
+@dataclass(frozen=True)
+class PackedContext:
+    text: str
+    chunks: list[ContextChunk]
+    tokens: int
+    dropped: int
+    duplicates: int
+
+
+class ContextPacker:
+    """Fit retrieved snippets into a prompt under a token budget.
+
+    Function records go in first since they are already narrow; file records
+    are cut down to windows around lines that mention query terms (or the
+    file head when nothing matches). Line ranges already included from the
+    same file are not repeated, and a chunk that does not fit is trimmed to
+    its leading lines or left out.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        window_lines: int = 8,
+        display_path: Callable[[str], str] = str,
+    ) -> None:
+        self._token_budget = token_budget
+        self._window_lines = window_lines
+        self._display_path = display_path
+
+    def pack(
+        self,
+        query: str,
+        records: list[EmbeddingRecord],
+        files: dict[str, list[str]] | None = None,
+    ) -> PackedContext:
+        """Pack ``records`` for ``query``; ``files`` caches file lines by path.
+
+        Pass the same ``files`` dict the caller used for reranking so each
+        file is read once per request.
+        """
+        terms = _query_terms(query)
+        files = {} if files is None else files
+        covered: dict[str, list[tuple[int, int]]] = {}
+        chunks: list[ContextChunk] = []
+        rendered: list[str] = []
+        used = 0
+        dropped = 0
+        duplicates = 0
+
+        for path, start, end, scope in self._candidates(terms, records, files):
+            lines = files[path]
+            segments = _uncovered(start, end, covered.get(path, []))
+            if not segments:
+                duplicates += 1
+            for seg_start, seg_end in segments:
+                header = self._header(path, seg_start, seg_end)
+                body = lines[seg_start - 1 : seg_end]
+                if not any(line.strip() for line in body):
+                    continue
+                cost = count_tokens(header) + count_tokens("\n".join(body)) + 1
+                if used + cost > self._token_budget:
+                    body = _leading_lines(
+                        body, self._token_budget - used - count_tokens(header) - 1
+                    )
+                    if count_tokens("\n".join(body)) < _MIN_CHUNK_TOKENS:
+                        dropped += 1
+                        continue
+                    seg_end = seg_start + len(body) - 1
+                    header = self._header(path, seg_start, seg_end)
+                text = "\n".join(body)
+                chunks.append(ContextChunk(path, seg_start, seg_end, scope, text))
+                rendered.append(f"{header}\n{text}")
+                covered.setdefault(path, []).append((seg_start, seg_end))
+                used += count_tokens(header) + count_tokens(text) + 1
+
+        text = "\n\n".join(rendered)
+        return PackedContext(
+            text=text,
+            chunks=chunks,
+            tokens=count_tokens(text),
+            dropped=dropped,
+            duplicates=duplicates,
+        )
+
+    def _candidates(
+        self,
+        terms: set[str],
+        records: list[EmbeddingRecord],
+        files: dict[str, list[str]],
+    ) -> list[tuple[str, int, int, str]]:
+        functions: list[tuple[str, int, int, str]] = []
+        regions: list[tuple[str, int, int, str]] = []
+        for record in records:
+            path = record.metadata.get("path")
+            if not path:
+                continue
+            lines = file_lines(path, files)
+            if not lines:
+                continue
+            start = parse_int(record.metadata.get("start_line"))
+            end = parse_int(record.metadata.get("end_line"))
+            if record.scope == "function" and start and end:
+                start, end = max(start, 1), min(end, len(lines))
+                # A range past the end of the file is stale: the file changed
+                if start <= end:
+                    functions.append((path, start, end, "function"))
+                continue
+            for window_start, window_end in self._match_windows(terms, lines):
+                regions.append((path, window_start, window_end, "file"))
+        return functions + regions
+
+    def _match_windows(self, terms: set[str], lines: list[str]) -> list[tuple[int, int]]:
+        """Merged windows around matching lines, busiest first."""
+        width = self._window_lines
+        hits = [
+            number
+            for number, line in enumerate(lines, start=1)
+            if terms and terms & _identifiers(line)
+        ]
+        if not hits:
+            return [(1, min(len(lines), 2 * width + 1))]
+
+        windows: list[list[int]] = []
+        for number in hits:
+            start, end = max(1, number - width), min(len(lines), number + width)
+            if windows and start <= windows[-1][1] + 1:
+                windows[-1][1] = end
+                windows[-1][2] += 1
+            else:
+                windows.append([start, end, 1])
+        windows.sort(key=lambda window: window[2], reverse=True)
+        return [(start, end) for start, end, _ in windows]
+
+    def _header(self, path: str, start: int, end: int) -> str:
+        return f"[{self._display_path(path)} (lines {start}-{end})]"
+
+
+def _query_terms(query: str) -> set[str]:
+    return {term for term in _identifiers(query) if term not in _STOPWORDS}
+
+
+def _identifiers(text: str) -> set[str]:
+    return set(re.findall(r"[A-Za-z_][A-Za-z0-9_]+", text.lower()))
+
+
+def _uncovered(start: int, end: int, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Parts of ``start..end`` not inside any of ``ranges`` (all inclusive)."""
+    segments = [(start, end)]
+    for covered_start, covered_end in ranges:
+        remaining: list[tuple[int, int]] = []
+        for seg_start, seg_end in segments:
+            if covered_end < seg_start or covered_start > seg_end:
+                remaining.append((seg_start, seg_end))
+                continue
+            if seg_start < covered_start:
+                remaining.append((seg_start, covered_start - 1))
+            if seg_end > covered_end:
+                remaining.append((covered_end + 1, seg_end))
+        segments = remaining
+    return segments
+
+
+def _leading_lines(lines: list[str], max_tokens: int) -> list[str]:
+    kept: list[str] = []
+    used = 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def file_lines(path: str, files: dict[str, list[str]]) -> list[str]:
+    """Lines of ``path``, read on first use and then served from ``files``."""
+    if path not in files:
+        files[path] = _read_lines(Path(path))
+    return files[path]
+
+
+def _read_lines(path: Path) -> list[str]:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return []
+
+
+def parse_int(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
@@ -1,10 +1,16 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 import logging
 from pathlib import Path
 import re
+from typing import TYPE_CHECKING
 
 from codeatlas.services.state.repo_state_store import RepoStateStore
 
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
 
 @dataclass(frozen=True)
 class ExplainResult:
@@ -13,9 +19,6 @@ class ExplainResult:
     snippet: str
 
 
-from langchain_core.language_models import BaseChatModel
-from langchain_core.prompts import ChatPromptTemplate
-
 class CodeExplainService:
     def __init__(self, state_store: RepoStateStore, llm: BaseChatModel) -> None:
         self._state_store = state_store
@@ -24,8 +27,7 @@ class CodeExplainService:
 
     def explain(self, repo_id: str, node_id: str) -> ExplainResult:
         self._logger.info("Explain requested for repo %s node %s", repo_id, node_id)
-        state = self._state_store.get(repo_id)
-        if state is None:
+        if self._state_store.get_info(repo_id) is None:
             return ExplainResult(node_id=node_id, summary="Repository not found.", snippet="")
 
         path, start, end = _parse_node_id(node_id)
@@ -35,6 +37,8 @@ class CodeExplainService:
         snippet = _read_snippet(Path(path), start, end)
         
         # Use LLM to summarize
+        from langchain_core.prompts import ChatPromptTemplate
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", "You are a senior developer. Summarize the following code snippet concisely."),
             ("human", f"Code from {path}:\n\n{snippet}")
@@ -1,17 +1,42 @@
+from __future__ import annotations
+
 import logging
 import pickle
 from dataclasses import dataclass
 from pathlib import Path
-
-import faiss
-import numpy as np
+from typing import TYPE_CHECKING
 
 from codeatlas.models.embedding_record import EmbeddingRecord
 from codeatlas.services.retrieval.interfaces import CodeRetriever
 
+if TYPE_CHECKING:
+    import faiss
+    import numpy as np
+
+
+INDEX_TYPES = ("flat", "hnsw")
+
 
 class FaissCodeRetriever(CodeRetriever):
-    def __init__(self, base_dir: str | None = None) -> None:
+    """Cosine-similarity search per repo over exact (flat) or HNSW indexes.
+
+    ``hnsw`` trades a little recall for sub-linear search on large repos;
+    ``hnsw_ef_search`` is the recall/latency knob and applies to indexes
+    loaded from disk as well.
+    """
+
+    def __init__(
+        self,
+        base_dir: str | None = None,
+        index_type: str = "flat",
+        hnsw_m: int = 32,
+        hnsw_ef_search: int = 64,
+    ) -> None:
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown FAISS index type {index_type!r}; use one of {INDEX_TYPES}")
+        self._index_type = index_type
+        self._hnsw_m = hnsw_m
+        self._hnsw_ef_search = hnsw_ef_search
         self._indexes: dict[str, _RepoIndex] = {}
         self._base_dir = Path(base_dir).resolve() if base_dir else None
         self._logger = logging.getLogger(__name__)
@@ -22,9 +47,12 @@ class FaissCodeRetriever(CodeRetriever):
     def index(self, repo_id: str, records: list[EmbeddingRecord]) -> None:
         if not records:
             return
+        import faiss
+        import numpy as np
+
         vectors = np.array([record.vector for record in records], dtype="float32")
         vectors = _normalize(vectors)
-        index = faiss.IndexFlatIP(vectors.shape[1])
+        index = self._new_index(vectors.shape[1])
         index.add(vectors)
         self._indexes[repo_id] = _RepoIndex(index=index, records=records)
         self._persist(repo_id)
@@ -36,6 +64,8 @@ class FaissCodeRetriever(CodeRetriever):
         repo_index = self._indexes.get(repo_id)
         if repo_index is None:
             return []
+        import numpy as np
+
         query = np.array([query_vector], dtype="float32")
         query = _normalize(query)
         distances, indices = repo_index.index.search(query, top_k)
@@ -48,12 +78,23 @@ class FaissCodeRetriever(CodeRetriever):
                 results.append(repo_index.records[idx])
         return results
 
+    def _new_index(self, dimension: int) -> faiss.Index:
+        import faiss
+
+        if self._index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dimension, self._hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = self._hnsw_ef_search
+            return index
+        return faiss.IndexFlatIP(dimension)
+
     def _persist(self, repo_id: str) -> None:
         if not self._base_dir:
             return
         repo_index = self._indexes.get(repo_id)
         if repo_index is None:
             return
+        import faiss
+
         index_path = self._base_dir / f"{repo_id}.faiss"
         meta_path = self._base_dir / f"{repo_id}.pkl"
         faiss.write_index(repo_index.index, str(index_path))
@@ -63,6 +104,8 @@ class FaissCodeRetriever(CodeRetriever):
     def _load_all(self) -> None:
         if not self._base_dir:
             return
+        import faiss
+
         for index_path in self._base_dir.glob("*.faiss"):
             repo_id = index_path.stem
             meta_path = self._base_dir / f"{repo_id}.pkl"
@@ -73,17 +116,21 @@ class FaissCodeRetriever(CodeRetriever):
                 records = pickle.loads(meta_path.read_bytes())
             except Exception:
                 continue
+            if hasattr(index, "hnsw"):
+                index.hnsw.efSearch = self._hnsw_ef_search
             self._indexes[repo_id] = _RepoIndex(index=index, records=records)
             self._logger.info("Loaded FAISS index for repo %s", repo_id)
 
 
 @dataclass(frozen=True)
 class _RepoIndex:
-    index: faiss.IndexFlatIP
+    index: faiss.Index
     records: list[EmbeddingRecord]
 
 
 def _normalize(vectors: np.ndarray) -> np.ndarray:
+    import numpy as np
+
     norms = np.linalg.norm(vectors, axis=1, keepdims=True)
     norms[norms == 0] = 1.0
     return vectors / norms
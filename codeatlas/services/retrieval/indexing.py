@@ -4,6 +4,7 @@ from pathlib import Path
 from codeatlas.models.embedding_record import EmbeddingRecord
 from codeatlas.models.parsed_repository import ParsedRepository
 from codeatlas.models.repository import Repository
+from codeatlas.observability.tracing import tracer
 from codeatlas.services.retrieval.embedding import EmbeddingService
 from codeatlas.services.retrieval.interfaces import CodeRetriever
 
@@ -18,6 +19,32 @@ class CodeIndexService:
         self, repository: Repository, parsed_repo: ParsedRepository
     ) -> None:
         self._logger.info("Indexing repository %s", repository.repo_id)
+        documents, records = self.build_documents(parsed_repo)
+
+        with tracer.span("embed.documents", repo_id=repository.repo_id, documents=len(documents)):
+            embeddings = self._embedder.embed_texts(documents)
+        indexed_records: list[EmbeddingRecord] = []
+        for record, vector in zip(records, embeddings):
+            indexed_records.append(
+                EmbeddingRecord(
+                    record_id=record.record_id,
+                    scope=record.scope,
+                    vector=vector,
+                    metadata=record.metadata,
+                )
+            )
+
+        with tracer.span("faiss.index", repo_id=repository.repo_id, records=len(indexed_records)):
+            self._retriever.index(repository.repo_id, indexed_records)
+        self._logger.info(
+            "Indexed %s records for repo %s", len(indexed_records), repository.repo_id
+        )
+
+    @staticmethod
+    def build_documents(
+        parsed_repo: ParsedRepository,
+    ) -> tuple[list[str], list[EmbeddingRecord]]:
+        """Source text per file and function, with their (not yet embedded) records."""
         documents: list[str] = []
         records: list[EmbeddingRecord] = []
 
@@ -52,23 +79,7 @@ class CodeIndexService:
                     },
                 )
             )
-
-        embeddings = self._embedder.embed_texts(documents)
-        indexed_records: list[EmbeddingRecord] = []
-        for record, vector in zip(records, embeddings):
-            indexed_records.append(
-                EmbeddingRecord(
-                    record_id=record.record_id,
-                    scope=record.scope,
-                    vector=vector,
-                    metadata=record.metadata,
-                )
-            )
-
-        self._retriever.index(repository.repo_id, indexed_records)
-        self._logger.info(
-            "Indexed %s records for repo %s", len(indexed_records), repository.repo_id
-        )
+        return documents, records
 
 
 def _safe_read(path: Path) -> str:
@@ -0,0 +1,81 @@
+"""Keyword retrieval (BM25) and rank fusion for hybrid dense + lexical search."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from codeatlas.models.embedding_record import EmbeddingRecord
+
+_WORD = re.compile(r"\w+")
+_CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased words, with identifiers also split on ``_`` and camelCase.
+
+    ``loadConfig`` and ``load_config`` both yield ``load`` and ``config`` (and
+    the whole identifier), so natural-language queries match either style.
+    """
+    tokens: list[str] = []
+    for word in _WORD.findall(text):
+        tokens.append(word.lower())
+        parts = [part.lower() for chunk in word.split("_") for part in _CAMEL.findall(chunk)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over one repo's records, held in memory."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self._k1 = k1
+        self._b = b
+        self._records: list[EmbeddingRecord] = []
+        self._lengths: list[int] = []
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._average_length = 0.0
+
+    def index(self, records: list[EmbeddingRecord], texts: list[str]) -> None:
+        """Index ``records``; ``texts[i]`` is the source text of ``records[i]``."""
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        lengths: list[int] = []
+        for position, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for token, count in counts.items():
+                postings[token].append((position, count))
+        self._records = list(records)
+        self._lengths = lengths
+        self._postings = dict(postings)
+        self._average_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    def search(self, query: str, top_k: int) -> list[EmbeddingRecord]:
+        scores: dict[int, float] = defaultdict(float)
+        total = len(self._records)
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, count in postings:
+                norm = 1 - self._b + self._b * self._lengths[position] / self._average_length
+                scores[position] += idf * count * (self._k1 + 1) / (count + self._k1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [self._records[position] for position, _ in ranked]
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[EmbeddingRecord]], top_k: int, k: int = 60
+) -> list[EmbeddingRecord]:
+    """Merge ranked lists by summed ``1 / (k + rank)``; needs no score calibration."""
+    scores: dict[str, float] = defaultdict(float)
+    records: dict[str, EmbeddingRecord] = {}
+    for ranking in rankings:
+        for rank, record in enumerate(ranking, start=1):
+            scores[record.record_id] += 1 / (k + rank)
+            records.setdefault(record.record_id, record)
+    ordered = sorted(scores, key=scores.__getitem__, reverse=True)[:top_k]
+    return [records[record_id] for record_id in ordered]
@@ -0,0 +1,32 @@
+import time
+
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+
+
+class StubEmbeddingService(HashEmbeddingService):
+    """Hash embeddings that take as long as a real model would, for load tests.
+
+    Each call sleeps ``latency_seconds`` plus ``seconds_per_text`` per input,
+    so query embedding and bulk indexing both cost something realistic while
+    needing no model download.
+    """
+
+    def __init__(
+        self, dimension: int = 384, latency_seconds: float = 0.0, seconds_per_text: float = 0.0
+    ) -> None:
+        super().__init__(dimension=dimension)
+        self._latency_seconds = latency_seconds
+        self._seconds_per_text = seconds_per_text
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        self._wait(len(texts))
+        return super().embed_texts(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        self._wait(1)
+        return super().embed_query(text)
+
+    def _wait(self, count: int) -> None:
+        delay = self._latency_seconds + self._seconds_per_text * count
+        if delay > 0:
+            time.sleep(delay)
@@ -1,124 +1,408 @@
+from __future__ import annotations
+
 import json
 import logging
-from dataclasses import dataclass
+import sqlite3
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-
-import networkx as nx
+from typing import TYPE_CHECKING
 
 from codeatlas.models.function_node import FunctionNode
 from codeatlas.models.parsed_repository import ParsedRepository
 from codeatlas.models.source_file import SourceFile
+from codeatlas.services.dependency.graph_analytics import (
+    GraphAnalytics,
+    compute_graph_analytics,
+)
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    repo_id TEXT PRIMARY KEY,
+    root_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    repo_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    language TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    PRIMARY KEY (repo_id, path)
+);
+CREATE INDEX IF NOT EXISTS idx_files_path ON files(path);
+CREATE TABLE IF NOT EXISTS functions (
+    repo_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    signature TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_functions_repo_name ON functions(repo_id, name);
+CREATE INDEX IF NOT EXISTS idx_functions_repo_path ON functions(repo_id, file_path);
+CREATE TABLE IF NOT EXISTS edges (
+    repo_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    relation TEXT,
+    PRIMARY KEY (repo_id, source, target)
+);
+CREATE INDEX IF NOT EXISTS idx_edges_repo_target ON edges(repo_id, target);
+CREATE TABLE IF NOT EXISTS graph_analytics (
+    repo_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+"""
 
 
 @dataclass(frozen=True)
 class RepoState:
     parsed_repo: ParsedRepository
     import_graph: nx.DiGraph
-    root_path: str
+    root_path: str = ""
     name: str = ""
     url: str = ""
+    analytics: GraphAnalytics | None = None
+
+
+@dataclass(frozen=True)
+class RepoInfo:
+    repo_id: str
+    root_path: str
+    name: str
+    url: str
+
+
+@dataclass(frozen=True)
+class RepoOverview:
+    repo_id: str
+    name: str
+    file_count: int
+    function_count: int
+    dependency_edges: int
+    language_counts: dict[str, int] = field(default_factory=dict)
 
 
 class RepoStateStore:
+    """Parsed files, functions and import edges per repo, kept in SQLite.
+
+    With ``base_dir`` the database lives at ``<base_dir>/repo_state.sqlite3``
+    in WAL mode so API workers can read while another writes; without it the
+    store is in memory. Nothing is cached between calls: endpoints ask for
+    counts, neighbours, a file list or the precomputed graph analytics, and
+    only ``get`` materializes a whole repo. Legacy ``<repo_id>.json``
+    documents found in ``base_dir`` are imported on startup.
+    """
+
     def __init__(self, base_dir: str | None = None) -> None:
-        self._states: dict[str, RepoState] = {}
         self._base_dir = Path(base_dir).resolve() if base_dir else None
+        self._lock = threading.Lock()
         self._logger = logging.getLogger(__name__)
         if self._base_dir:
             self._base_dir.mkdir(parents=True, exist_ok=True)
-            self._load_all()
+            db_path = str(self._base_dir / "repo_state.sqlite3")
+        else:
+            db_path = ":memory:"
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        if self._base_dir:
+            self._import_legacy_json()
 
     def save(self, repo_id: str, state: RepoState) -> None:
-        self._states[repo_id] = state
-        self._persist(repo_id, state)
+        files = [
+            (repo_id, source.path, source.language, source.size_bytes)
+            for source in state.parsed_repo.files
+        ]
+        functions = [
+            (
+                repo_id,
+                function.name,
+                function.file_path,
+                function.start_line,
+                function.end_line,
+                function.signature,
+            )
+            for function in state.parsed_repo.functions
+        ]
+        edges = [
+            (repo_id, source, target, data.get("relation", "imports"))
+            for source, target, data in state.import_graph.edges(data=True)
+        ]
+        analytics = state.analytics or compute_graph_analytics(
+            state.import_graph, state.parsed_repo.files, state.root_path
+        )
+        with self._lock, self._conn:
+            for table in ("repos", "files", "functions", "edges", "graph_analytics"):
+                self._conn.execute(f"DELETE FROM {table} WHERE repo_id = ?", (repo_id,))
+            self._conn.execute(
+                "INSERT INTO repos (repo_id, root_path, name, url) VALUES (?, ?, ?, ?)",
+                (repo_id, state.root_path, state.name, state.url),
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", files)
+            self._conn.executemany(
+                "INSERT INTO functions VALUES (?, ?, ?, ?, ?, ?)", functions
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO edges VALUES (?, ?, ?, ?)", edges)
+            self._conn.execute(
+                "INSERT INTO graph_analytics (repo_id, payload) VALUES (?, ?)",
+                (repo_id, json.dumps(analytics.to_dict())),
+            )
+        self._logger.info(
+            "Persisted repo state for %s (%s files, %s functions, %s edges)",
+            repo_id,
+            len(files),
+            len(functions),
+            len(edges),
+        )
 
     def get(self, repo_id: str) -> RepoState | None:
-        return self._states.get(repo_id)
+        """Materialize the full state of one repo, import graph included.
+
+        Read-only: ``analytics`` is None for a repo saved before analytics
+        existed until ``get_analytics`` computes them.
+        """
+        import networkx as nx
+
+        info = self.get_info(repo_id)
+        if info is None:
+            return None
+        files = self.list_files(repo_id)
+        with self._lock:
+            function_rows = self._conn.execute(
+                "SELECT name, file_path, start_line, end_line, signature "
+                "FROM functions WHERE repo_id = ? ORDER BY rowid",
+                (repo_id,),
+            ).fetchall()
+            edge_rows = self._conn.execute(
+                "SELECT source, target, relation FROM edges WHERE repo_id = ?", (repo_id,)
+            ).fetchall()
+        graph = nx.DiGraph()
+        graph.add_nodes_from(source.path for source in files)
+        for source, target, relation in edge_rows:
+            graph.add_edge(source, target, relation=relation)
+        return RepoState(
+            parsed_repo=ParsedRepository(
+                repository_id=repo_id,
+                files=files,
+                functions=[FunctionNode(*row) for row in function_rows],
+            ),
+            import_graph=graph,
+            root_path=info.root_path,
+            name=info.name,
+            url=info.url,
+            analytics=self._read_analytics(repo_id),
+        )
+
+    def get_analytics(self, repo_id: str) -> GraphAnalytics | None:
+        """Graph analytics stored at analysis time; one row, no graph traversal.
+
+        Repos saved before analytics existed get them computed and stored on
+        first read.
+        """
+        analytics = self._read_analytics(repo_id)
+        if analytics is not None:
+            return analytics
+        state = self.get(repo_id)
+        if state is None:
+            return None
+        return self._backfill_analytics(
+            repo_id, state.import_graph, list(state.parsed_repo.files), state.root_path
+        )
+
+    def get_info(self, repo_id: str) -> RepoInfo | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT repo_id, root_path, name, url FROM repos WHERE repo_id = ?",
+                (repo_id,),
+            ).fetchone()
+        return RepoInfo(*row) if row else None
 
     def list_repo_ids(self) -> list[str]:
-        return sorted(self._states.keys())
-
-    def _persist(self, repo_id: str, state: RepoState) -> None:
-        if not self._base_dir:
-            return
-        payload = {
-            "repo_id": repo_id,
-            "root_path": state.root_path,
-            "name": state.name,
-            "url": state.url,
-            "files": [
-                {
-                    "path": source.path,
-                    "language": source.language,
-                    "size_bytes": source.size_bytes,
-                }
-                for source in state.parsed_repo.files
-            ],
-            "functions": [
-                {
-                    "name": function.name,
-                    "file_path": function.file_path,
-                    "start_line": function.start_line,
-                    "end_line": function.end_line,
-                    "signature": function.signature,
-                }
-                for function in state.parsed_repo.functions
-            ],
-            "edges": [
-                {
-                    "source": source,
-                    "target": target,
-                    "relation": data.get("relation", "imports"),
-                }
-                for source, target, data in state.import_graph.edges(data=True)
-            ],
-        }
-        target = self._base_dir / f"{repo_id}.json"
-        target.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-        self._logger.info("Persisted repo state to %s", target)
-
-    def _load_all(self) -> None:
-        if not self._base_dir:
-            return
-        for path in self._base_dir.glob("*.json"):
-            try:
-                payload = json.loads(path.read_text(encoding="utf-8"))
-            except json.JSONDecodeError:
-                continue
-            repo_id = payload.get("repo_id")
-            if not repo_id:
-                continue
-            files = [
-                SourceFile(
-                    path=item["path"],
-                    language=item.get("language", ""),
-                    size_bytes=item.get("size_bytes", 0),
-                )
-                for item in payload.get("files", [])
-            ]
-            functions = [
-                FunctionNode(
-                    name=item.get("name", ""),
-                    file_path=item.get("file_path", ""),
-                    start_line=item.get("start_line", 0),
-                    end_line=item.get("end_line", 0),
-                    signature=item.get("signature", ""),
-                )
-                for item in payload.get("functions", [])
-            ]
-            graph = nx.DiGraph()
-            for source_file in files:
-                graph.add_node(source_file.path)
-            for edge in payload.get("edges", []):
-                graph.add_edge(edge["source"], edge["target"], relation=edge.get("relation"))
-            parsed_repo = ParsedRepository(
-                repository_id=repo_id, files=files, functions=functions
+        with self._lock:
+            rows = self._conn.execute("SELECT repo_id FROM repos ORDER BY repo_id").fetchall()
+        return [row[0] for row in rows]
+
+    def list_files(self, repo_id: str) -> list[SourceFile]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, language, size_bytes FROM files WHERE repo_id = ? ORDER BY rowid",
+                (repo_id,),
+            ).fetchall()
+        return [SourceFile(*row) for row in rows]
+
+    def overview(self, repo_id: str) -> RepoOverview | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, "
+                "(SELECT COUNT(*) FROM files WHERE repo_id = r.repo_id), "
+                "(SELECT COUNT(*) FROM functions WHERE repo_id = r.repo_id), "
+                "(SELECT COUNT(*) FROM edges WHERE repo_id = r.repo_id) "
+                "FROM repos r WHERE repo_id = ?",
+                (repo_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            languages = self._conn.execute(
+                "SELECT language, COUNT(*) FROM files WHERE repo_id = ? GROUP BY language",
+                (repo_id,),
+            ).fetchall()
+        name, file_count, function_count, edge_count = row
+        return RepoOverview(
+            repo_id=repo_id,
+            name=name,
+            file_count=file_count,
+            function_count=function_count,
+            dependency_edges=edge_count,
+            language_counts=dict(languages),
+        )
+
+    def list_overviews(self) -> list[RepoOverview]:
+        overviews = [self.overview(repo_id) for repo_id in self.list_repo_ids()]
+        return [overview for overview in overviews if overview is not None]
+
+    def has_node(self, repo_id: str, node_id: str) -> bool:
+        """Whether ``node_id`` is a file of the repo or an endpoint of an import edge."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM files WHERE repo_id = ?1 AND path = ?2) "
+                "OR EXISTS (SELECT 1 FROM edges WHERE repo_id = ?1 AND source = ?2) "
+                "OR EXISTS (SELECT 1 FROM edges WHERE repo_id = ?1 AND target = ?2)",
+                (repo_id, node_id),
+            ).fetchone()
+        return bool(row[0])
+
+    def neighbors(self, repo_id: str, node_id: str, direction: str = "inbound") -> list[str]:
+        """Importers of ``node_id`` (inbound) or what it imports (outbound), sorted."""
+        if direction == "outbound":
+            query = "SELECT target FROM edges WHERE repo_id = ? AND source = ? ORDER BY target"
+        else:
+            query = "SELECT source FROM edges WHERE repo_id = ? AND target = ? ORDER BY source"
+        with self._lock:
+            rows = self._conn.execute(query, (repo_id, node_id)).fetchall()
+        return [row[0] for row in rows]
+
+    def list_nodes(self, repo_id: str) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE repo_id = ?1 "
+                "UNION SELECT source FROM edges WHERE repo_id = ?1 "
+                "UNION SELECT target FROM edges WHERE repo_id = ?1",
+                (repo_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def list_edges(self, repo_id: str) -> list[tuple[str, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, target FROM edges WHERE repo_id = ?", (repo_id,)
+            ).fetchall()
+        return [(source, target) for source, target in rows]
+
+    def most_imported(self, repo_id: str, limit: int = 5) -> list[tuple[str, int]]:
+        """Nodes with the highest in-degree in the import graph."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT target, COUNT(*) AS in_degree FROM edges WHERE repo_id = ? "
+                "GROUP BY target ORDER BY in_degree DESC, target LIMIT ?",
+                (repo_id, limit),
+            ).fetchall()
+        return [(target, count) for target, count in rows]
+
+    def find_functions(self, repo_id: str, name: str) -> list[FunctionNode]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, file_path, start_line, end_line, signature "
+                "FROM functions WHERE repo_id = ? AND name = ?",
+                (repo_id, name),
+            ).fetchall()
+        return [FunctionNode(*row) for row in rows]
+
+    def import_json(self, path: Path) -> str | None:
+        """Load a repo state document in the previous JSON format.
+
+        Returns the imported repo id, or ``None`` when the file is not a
+        state document.
+        """
+        import networkx as nx
+
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        repo_id = payload.get("repo_id") if isinstance(payload, dict) else None
+        if not repo_id:
+            return None
+        files = [
+            SourceFile(
+                path=item["path"],
+                language=item.get("language", ""),
+                size_bytes=item.get("size_bytes", 0),
+            )
+            for item in payload.get("files", [])
+        ]
+        functions = [
+            FunctionNode(
+                name=item.get("name", ""),
+                file_path=item.get("file_path", ""),
+                start_line=item.get("start_line", 0),
+                end_line=item.get("end_line", 0),
+                signature=item.get("signature", ""),
             )
-            self._states[repo_id] = RepoState(
-                parsed_repo=parsed_repo,
+            for item in payload.get("functions", [])
+        ]
+        graph = nx.DiGraph()
+        for edge in payload.get("edges", []):
+            graph.add_edge(edge["source"], edge["target"], relation=edge.get("relation"))
+        self.save(
+            repo_id,
+            RepoState(
+                parsed_repo=ParsedRepository(
+                    repository_id=repo_id, files=files, functions=functions
+                ),
                 import_graph=graph,
                 root_path=payload.get("root_path", ""),
                 name=payload.get("name", ""),
                 url=payload.get("url", ""),
+            ),
+        )
+        return repo_id
+
+    def _import_legacy_json(self) -> None:
+        """Import JSON state files written before the SQLite store.
+
+        Files are left in place; a repo already in the database is skipped,
+        so this runs once per repo.
+        """
+        known = set(self.list_repo_ids())
+        for path in sorted(self._base_dir.glob("*.json")):
+            if path.stem in known:
+                continue
+            repo_id = self.import_json(path)
+            if repo_id:
+                self._logger.info("Imported legacy repo state %s from %s", repo_id, path)
+
+    def _read_analytics(self, repo_id: str) -> GraphAnalytics | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM graph_analytics WHERE repo_id = ?", (repo_id,)
+            ).fetchone()
+        return GraphAnalytics.from_dict(json.loads(row[0])) if row else None
+
+    def _backfill_analytics(
+        self, repo_id: str, graph: nx.DiGraph, files: list[SourceFile], root_path: str
+    ) -> GraphAnalytics:
+        analytics = compute_graph_analytics(graph, files, root_path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO graph_analytics (repo_id, payload) VALUES (?, ?)",
+                (repo_id, json.dumps(analytics.to_dict())),
             )
-            self._logger.info("Loaded repo state for %s", repo_id)
+        self._logger.info("Computed missing graph analytics for repo %s", repo_id)
+        return analytics
@@ -1,6 +1,11 @@
 import os
 from dataclasses import dataclass
 
+# Seconds; spans cached lookups (ms) up to multi-minute repo analysis and LLM streams
+_REQUEST_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0
+)
+
 
 @dataclass(frozen=True)
 class AppConfig:
@@ -13,6 +18,55 @@ class AppConfig:
     llm_temperature: float
     api_key: str | None
     auth_enabled: bool
+    llm_cache_backend: str = "sqlite"
+    llm_cache_ttl_seconds: float = 86400.0
+    llm_cache_max_entries: int = 10000
+    llm_cache_similarity_threshold: float = 0.0
+    llm_base_url: str | None = None
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_timeout_seconds: float = 60.0
+    llm_max_retries: int = 3
+    llm_http2: bool = True
+    llm_max_concurrency: int = 8
+    llm_rate_limit_rps: float = 0.0
+    llm_rate_limit_burst: int = 1
+    llm_queue_timeout_seconds: float = 30.0
+    llm_stub_latency_seconds: float = 0.0
+    llm_stub_latency_distribution: str = "fixed"
+    llm_stub_token_latency_seconds: float = 0.0
+    llm_stub_response_tokens: int = 0
+    llm_stub_failure_rate: float = 0.0
+    embedding_stub_latency_seconds: float = 0.0
+    embedding_stub_seconds_per_text: float = 0.0
+    cpu_workers: int = 4
+    answer_context_token_budget: int = 3000
+    answer_context_window_lines: int = 8
+    memory_max_per_scope: int = 0
+    memory_list_page_size: int = 10
+    memory_recall_top_k: int = 3
+    memory_recall_min_similarity: float = 0.2
+    agent_max_parallel_steps: int = 4
+    agent_step_token_budget: int = 1500
+    planner_router_enabled: bool = True
+    planner_router_min_confidence: float = 0.8
+    plan_cache_max_entries: int = 512
+    plan_cache_ttl_seconds: float = 3600.0
+    plan_cache_similarity_threshold: float = 0.0
+    validation_mode: str = "auto"
+    validation_min_answer_chars: int = 400
+    validation_min_citation_coverage: float = 0.2
+    validation_token_budget: int = 2000
+    trace_exporter: str = "none"
+    trace_file: str = ".codeatlas/traces/spans.jsonl"
+    request_latency_buckets: tuple[float, ...] = _REQUEST_LATENCY_BUCKETS
+    admin_api_key: str | None = None
+    profile_slow_request_ms: float = 1000.0
+    profile_max_seconds: float = 60.0
+    profile_sample_interval_seconds: float = 0.005
+    faiss_index_type: str = "flat"
+    faiss_hnsw_m: int = 32
+    faiss_hnsw_ef_search: int = 64
 
 
 def load_config() -> AppConfig:
@@ -26,4 +80,92 @@ def load_config() -> AppConfig:
         llm_temperature=float(os.getenv("CODEATLAS_LLM_TEMPERATURE", "0.2")),
         api_key=os.getenv("CODEATLAS_API_KEY"),
         auth_enabled=os.getenv("CODEATLAS_AUTH_ENABLED", "false").lower() == "true",
+        llm_cache_backend=os.getenv("CODEATLAS_LLM_CACHE", "sqlite").lower(),
+        llm_cache_ttl_seconds=float(os.getenv("CODEATLAS_LLM_CACHE_TTL_SECONDS", "86400")),
+        llm_cache_max_entries=int(os.getenv("CODEATLAS_LLM_CACHE_MAX_ENTRIES", "10000")),
+        llm_cache_similarity_threshold=float(
+            os.getenv("CODEATLAS_LLM_CACHE_SIMILARITY", "0")
+        ),
+        llm_base_url=os.getenv("CODEATLAS_LLM_BASE_URL") or None,
+        llm_max_connections=int(os.getenv("CODEATLAS_LLM_MAX_CONNECTIONS", "20")),
+        llm_max_keepalive_connections=int(
+            os.getenv("CODEATLAS_LLM_MAX_KEEPALIVE_CONNECTIONS", "10")
+        ),
+        llm_timeout_seconds=float(os.getenv("CODEATLAS_LLM_TIMEOUT_SECONDS", "60")),
+        llm_max_retries=int(os.getenv("CODEATLAS_LLM_MAX_RETRIES", "3")),
+        llm_http2=os.getenv("CODEATLAS_LLM_HTTP2", "true").lower() == "true",
+        llm_max_concurrency=int(os.getenv("CODEATLAS_LLM_MAX_CONCURRENCY", "8")),
+        llm_rate_limit_rps=float(os.getenv("CODEATLAS_LLM_RATE_LIMIT_RPS", "0")),
+        llm_rate_limit_burst=int(os.getenv("CODEATLAS_LLM_RATE_LIMIT_BURST", "1")),
+        llm_queue_timeout_seconds=float(
+            os.getenv("CODEATLAS_LLM_QUEUE_TIMEOUT_SECONDS", "30")
+        ),
+        llm_stub_latency_seconds=float(os.getenv("CODEATLAS_LLM_STUB_LATENCY_SECONDS", "0")),
+        llm_stub_latency_distribution=os.getenv(
+            "CODEATLAS_LLM_STUB_LATENCY_DISTRIBUTION", "fixed"
+        ).lower(),
+        llm_stub_token_latency_seconds=float(
+            os.getenv("CODEATLAS_LLM_STUB_TOKEN_LATENCY_SECONDS", "0")
+        ),
+        llm_stub_response_tokens=int(os.getenv("CODEATLAS_LLM_STUB_RESPONSE_TOKENS", "0")),
+        llm_stub_failure_rate=float(os.getenv("CODEATLAS_LLM_STUB_FAILURE_RATE", "0")),
+        embedding_stub_latency_seconds=float(
+            os.getenv("CODEATLAS_EMBEDDING_STUB_LATENCY_SECONDS", "0")
+        ),
+        embedding_stub_seconds_per_text=float(
+            os.getenv("CODEATLAS_EMBEDDING_STUB_SECONDS_PER_TEXT", "0")
+        ),
+        cpu_workers=int(os.getenv("CODEATLAS_CPU_WORKERS", "4")),
+        answer_context_token_budget=int(
+            os.getenv("CODEATLAS_ANSWER_CONTEXT_TOKEN_BUDGET", "3000")
+        ),
+        answer_context_window_lines=int(
+            os.getenv("CODEATLAS_ANSWER_CONTEXT_WINDOW_LINES", "8")
+        ),
+        memory_max_per_scope=int(os.getenv("CODEATLAS_MEMORY_MAX_PER_SCOPE", "0")),
+        memory_list_page_size=int(os.getenv("CODEATLAS_MEMORY_LIST_PAGE_SIZE", "10")),
+        memory_recall_top_k=int(os.getenv("CODEATLAS_MEMORY_RECALL_TOP_K", "3")),
+        memory_recall_min_similarity=float(
+            os.getenv("CODEATLAS_MEMORY_RECALL_MIN_SIMILARITY", "0.2")
+        ),
+        agent_max_parallel_steps=int(os.getenv("CODEATLAS_AGENT_MAX_PARALLEL_STEPS", "4")),
+        agent_step_token_budget=int(os.getenv("CODEATLAS_AGENT_STEP_TOKEN_BUDGET", "1500")),
+        planner_router_enabled=os.getenv("CODEATLAS_PLANNER_ROUTER", "true").lower() == "true",
+        planner_router_min_confidence=float(
+            os.getenv("CODEATLAS_PLANNER_ROUTER_MIN_CONFIDENCE", "0.8")
+        ),
+        plan_cache_max_entries=int(os.getenv("CODEATLAS_PLAN_CACHE_MAX_ENTRIES", "512")),
+        plan_cache_ttl_seconds=float(os.getenv("CODEATLAS_PLAN_CACHE_TTL_SECONDS", "3600")),
+        plan_cache_similarity_threshold=float(
+            os.getenv("CODEATLAS_PLAN_CACHE_SIMILARITY", "0")
+        ),
+        validation_mode=os.getenv("CODEATLAS_VALIDATION_MODE", "auto").lower(),
+        validation_min_answer_chars=int(
+            os.getenv("CODEATLAS_VALIDATION_MIN_ANSWER_CHARS", "400")
+        ),
+        validation_min_citation_coverage=float(
+            os.getenv("CODEATLAS_VALIDATION_MIN_CITATION_COVERAGE", "0.2")
+        ),
+        validation_token_budget=int(os.getenv("CODEATLAS_VALIDATION_TOKEN_BUDGET", "2000")),
+        trace_exporter=os.getenv("CODEATLAS_TRACE_EXPORTER", "none").lower(),
+        trace_file=os.getenv("CODEATLAS_TRACE_FILE", ".codeatlas/traces/spans.jsonl"),
+        request_latency_buckets=_float_list(
+            os.getenv("CODEATLAS_REQUEST_LATENCY_BUCKETS"), _REQUEST_LATENCY_BUCKETS
+        ),
+        admin_api_key=os.getenv("CODEATLAS_ADMIN_API_KEY") or None,
+        profile_slow_request_ms=float(os.getenv("CODEATLAS_PROFILE_SLOW_REQUEST_MS", "1000")),
+        profile_max_seconds=float(os.getenv("CODEATLAS_PROFILE_MAX_SECONDS", "60")),
+        profile_sample_interval_seconds=float(
+            os.getenv("CODEATLAS_PROFILE_SAMPLE_INTERVAL_SECONDS", "0.005")
+        ),
+        faiss_index_type=os.getenv("CODEATLAS_FAISS_INDEX_TYPE", "flat").lower(),
+        faiss_hnsw_m=int(os.getenv("CODEATLAS_FAISS_HNSW_M", "32")),
+        faiss_hnsw_ef_search=int(os.getenv("CODEATLAS_FAISS_HNSW_EF_SEARCH", "64")),
     )
+
+
+def _float_list(raw: str | None, default: tuple[float, ...]) -> tuple[float, ...]:
+    """Parse a comma-separated list of numbers, sorted; ``default`` when unset."""
+    if not raw or not raw.strip():
+        return default
+    return tuple(sorted(float(item) for item in raw.split(",") if item.strip()))
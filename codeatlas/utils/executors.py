@@ -0,0 +1,20 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+async def run_blocking(executor: Executor | None, fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call (embedding, FAISS search, file reads) off the event loop.
+
+    ``executor`` bounds how many such calls run at once; ``None`` uses the
+    loop's default executor. The caller's context variables (the current
+    trace span) are carried over to the worker thread, as ``asyncio.to_thread``
+    does.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
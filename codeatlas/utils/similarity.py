@@ -0,0 +1,19 @@
+def best_match(query: list[float], candidates: list[list[float]]) -> tuple[int, float]:
+    """Return (index, cosine similarity) of the candidate closest to ``query``.
+
+    Candidates whose dimension differs from the query (e.g. vectors stored by
+    a previously configured embedder) are ignored. Returns (-1, 0.0) when
+    nothing is comparable.
+    """
+    import numpy as np
+
+    positions = [i for i, vector in enumerate(candidates) if len(vector) == len(query)]
+    if not positions or not query:
+        return -1, 0.0
+    matrix = np.asarray([candidates[i] for i in positions], dtype="float32")
+    vector = np.asarray(query, dtype="float32")
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(vector) or 1.0)
+    norms[norms == 0] = 1.0
+    scores = matrix @ vector / norms
+    best = int(np.argmax(scores))
+    return positions[best], float(scores[best])
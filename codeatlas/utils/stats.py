@@ -0,0 +1,14 @@
+import math
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (q in 0..100); 0.0 when empty.
+
+    Always returns an observed value: the smallest one with at least ``q``
+    percent of ``values`` at or below it.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
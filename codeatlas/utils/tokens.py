@@ -0,0 +1,7 @@
+def count_tokens(text: str) -> int:
+    """Approximate token count at roughly four characters per token.
+
+    Close enough to BPE counts for budgeting, and constant time, so it can run
+    on every prompt without pulling in a tokenizer.
+    """
+    return (len(text) + 3) // 4
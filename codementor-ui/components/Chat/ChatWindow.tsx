@@ -103,6 +103,15 @@ export default function ChatWindow() {
                 onStatus: (status: string) => {
                     setStreamStatus(status);
                 },
+                onCitations: (citations: string[]) => {
+                    // Retrieval finished before generation: show context early
+                    pushRetrievedContext(
+                        citations.map((c: string) => {
+                            const parts = c.split(" | ");
+                            return { file: parts[0] || c, score: parts.length > 1 ? "cited" : "-" };
+                        }),
+                    );
+                },
                 onDone: (data) => {
                     setStreamStatus(null);
                     // Final update with citations and reasoning
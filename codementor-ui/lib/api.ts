@@ -24,6 +24,7 @@ export async function askQuestionStream(
     callbacks: {
         onToken: (token: string) => void;
         onStatus: (status: string) => void;
+        onCitations?: (citations: string[]) => void;
         onDone: (data: { citations: string[]; reasoning_steps: string[] }) => void;
         onError: (error: string) => void;
     },
@@ -62,6 +63,9 @@ export async function askQuestionStream(
                         case "status":
                             callbacks.onStatus(data.content);
                             break;
+                        case "citations":
+                            callbacks.onCitations?.(data.citations);
+                            break;
                         case "done":
                             callbacks.onDone(data);
                             break;
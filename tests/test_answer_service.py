@@ -49,3 +49,80 @@ def test_answer_service_citations_include_line_ranges(tmp_path: Path) -> None:
     result = service.answer(repo_id="repo", question="foo")
     assert result.citations
     assert "lines 1-2" in result.citations[0]
+
+
+def test_context_packer_trims_files_and_dedupes_ranges(tmp_path: Path) -> None:
+    lines = [f"filler_{i} = {i}" for i in range(400)]
+    lines[10:12] = ["def load_config():", "    return read_settings()"]
+    lines[300] = "SETTINGS_PATH = 'settings.toml'  # read_settings reads this"
+    file_path = tmp_path / "big.py"
+    file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    function = EmbeddingRecord(
+        record_id=f"{file_path}:11-12",
+        scope="function",
+        vector=[1.0],
+        metadata={"path": str(file_path), "start_line": "11", "end_line": "12"},
+    )
+    whole_file = EmbeddingRecord(
+        record_id=str(file_path),
+        scope="file",
+        vector=[1.0],
+        metadata={"path": str(file_path)},
+    )
+    service = AnswerService(
+        retriever=StubRetriever([whole_file, function]),
+        embedder=StubEmbedder(),
+        llm=None,
+        context_token_budget=200,
+        context_window_lines=3,
+    )
+
+    retrieved = service.retrieve("repo", "where are settings read via read_settings?")
+
+    context = retrieved.context
+    # The function record leads and the file windows skip its lines
+    assert context.startswith(f"[{file_path} (lines 11-12)]")
+    assert context.count("def load_config():") == 1
+    assert "SETTINGS_PATH" in context
+    assert "filler_200" not in context
+    assert len(context) <= 200 * 4
+    assert any(step.startswith("Prompt size: ~") for step in retrieved.reasoning_steps)
+
+
+def test_retrieve_reads_each_file_once_and_skips_stale_ranges(
+    tmp_path: Path, monkeypatch
+) -> None:
+    from codeatlas.services.qa import context_packer
+
+    file_path = tmp_path / "a.py"
+    file_path.write_text("def foo():\n    return 1\n", encoding="utf-8")
+    reads: list[Path] = []
+    read_lines = context_packer._read_lines
+
+    def counting_read(path: Path) -> list[str]:
+        reads.append(path)
+        return read_lines(path)
+
+    monkeypatch.setattr(context_packer, "_read_lines", counting_read)
+    records = [
+        EmbeddingRecord(
+            record_id=f"{file_path}:{start}-{end}",
+            scope="function",
+            vector=[1.0],
+            metadata={"path": str(file_path), "start_line": start, "end_line": end},
+        )
+        # The second range was recorded before the file shrank
+        for start, end in (("1", "2"), ("40", "45"))
+    ]
+    records.append(
+        EmbeddingRecord(
+            record_id=str(file_path), scope="file", vector=[1.0], metadata={"path": str(file_path)}
+        )
+    )
+    service = AnswerService(retriever=StubRetriever(records), embedder=StubEmbedder(), llm=None)
+
+    retrieved = service.retrieve("repo", "what does foo return?")
+
+    assert reads == [file_path]
+    assert "lines 40" not in retrieved.context
+    assert all(chunk.strip() for chunk in retrieved.context.split("\n\n"))
@@ -0,0 +1,73 @@
+import asyncio
+
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.interfaces import Agent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.qa.answer_service import AnswerService, RetrievedContext
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.services.retrieval.interfaces import CodeRetriever
+
+
+class StubRetriever(CodeRetriever):
+    def index(self, repo_id, records) -> None:
+        return None
+
+    def search(self, repo_id, query_vector, top_k):
+        return []
+
+
+class StubEmbedder(EmbeddingService):
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0] for _ in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0]
+
+
+class StubRetrievalAgent(Agent):
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        raise AssertionError("fast path must use retrieve()")
+
+    def retrieve(self, prompt: str, repo_id: str, top_k: int = 5) -> RetrievedContext:
+        return RetrievedContext(
+            records=[],
+            citations=["a.py (lines 1-2) | def foo():"],
+            context="[a.py]\ndef foo():\n    return 1",
+            reasoning_steps=[],
+        )
+
+    async def aretrieve(self, prompt: str, repo_id: str, top_k: int = 5) -> RetrievedContext:
+        return self.retrieve(prompt, repo_id, top_k)
+
+
+class UnusedAgent(Agent):
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        raise AssertionError("fast path must not call this agent")
+
+
+def test_fast_stream_sends_citations_before_tokens() -> None:
+    answer_service = AnswerService(retriever=StubRetriever(), embedder=StubEmbedder())
+    mentor = CodingMentorAgent(
+        answer_service=answer_service,
+        llm=StubChatModel(responses=["Use foo in a.py to do it."]),
+    )
+    orchestrator = AgentOrchestrator(
+        planner=UnusedAgent(),
+        retrieval_agent=StubRetrievalAgent(),
+        analyst_agent=UnusedAgent(),
+        mentor_agent=mentor,
+        memory_agent=UnusedAgent(),
+    )
+
+    async def collect() -> list[dict]:
+        return [event async for event in orchestrator.astream_question_fast("q", "repo")]
+
+    events = asyncio.run(collect())
+    types = [event["type"] for event in events]
+    assert types[0] == "citations"
+    assert events[0]["citations"] == ["a.py (lines 1-2) | def foo():"]
+    tokens = [event["content"] for event in events if event["type"] == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Use foo in a.py to do it."
+    assert types[-1] == "done"
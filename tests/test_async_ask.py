@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+
+from codeatlas.app.di import get_agent_orchestrator
+from codeatlas.app.main import app
+from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.intent_router import IntentRouter
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.planner_agent import PlannerAgent
+from codeatlas.services.agents.retrieval_agent import RetrievalAgent
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.services.retrieval.interfaces import CodeRetriever
+
+
+class OneRecordRetriever(CodeRetriever):
+    def __init__(self, file_path) -> None:
+        self._file_path = file_path
+
+    def index(self, repo_id, records) -> None:
+        return None
+
+    def search(self, repo_id, query_vector, top_k):
+        return [
+            EmbeddingRecord(
+                record_id=f"{self._file_path}:1-2",
+                scope="function",
+                vector=[1.0],
+                metadata={
+                    "path": str(self._file_path),
+                    "start_line": "1",
+                    "end_line": "2",
+                    "signature": "def foo():",
+                },
+            )
+        ]
+
+
+class StubEmbedder(EmbeddingService):
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0] for _ in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0]
+
+
+class ConcurrencyProbe(StubChatModel):
+    """Counts how many async LLM calls are waiting at the same time."""
+
+    in_flight: int = 0
+    peak: int = 0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def test_ask_waits_on_the_llm_without_holding_threads(tmp_path) -> None:
+    file_path = tmp_path / "a.py"
+    file_path.write_text("def foo():\n    return 1\n")
+    llm = ConcurrencyProbe(latency_seconds=0.5)
+    answer_service = AnswerService(
+        retriever=OneRecordRetriever(file_path), embedder=StubEmbedder(), llm=llm
+    )
+    orchestrator = AgentOrchestrator(
+        planner=PlannerAgent(llm=llm),
+        retrieval_agent=RetrievalAgent(answer_service=answer_service),
+        analyst_agent=None,
+        mentor_agent=CodingMentorAgent(answer_service=answer_service, llm=llm),
+        memory_agent=None,
+        intent_router=IntentRouter(),
+    )
+
+    async def drive() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(
+                    client.post("/ask", json={"repo_id": "r", "question": f"Where is foo defined? ({i})"})
+                    for i in range(100)
+                )
+            )
+
+    app.dependency_overrides[get_agent_orchestrator] = lambda: orchestrator
+    try:
+        responses = asyncio.run(drive())
+    finally:
+        app.dependency_overrides.pop(get_agent_orchestrator, None)
+
+    assert all(response.status_code == 200 for response in responses)
+    assert "a.py" in responses[0].json()["answer"] + " ".join(responses[0].json()["citations"])
+    # More requests wait on the LLM at once than FastAPI's 40-thread pool allows
+    assert llm.peak > 40
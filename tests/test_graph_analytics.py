@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import networkx as nx
+import pytest
+from fastapi.testclient import TestClient
+
+from codeatlas.app.di import get_repo_state_store
+from codeatlas.app.main import app
+from codeatlas.models.parsed_repository import ParsedRepository
+from codeatlas.models.source_file import SourceFile
+from codeatlas.services.dependency.graph_analytics import compute_graph_analytics, pagerank
+from codeatlas.services.state.repo_state_store import RepoState, RepoStateStore
+
+ROOT = "/clones/r1"
+IMPORTS = {
+    "app/main.py": ["app.models", "app.views", "os"],
+    "app/models.py": ["app.views"],
+    "app/views.py": [".models", "json"],
+    "app/__init__.py": [],
+    "web/index.js": ["./api", "react"],
+    "web/api.js": ["../shared/util"],
+    "shared/util.ts": [],
+}
+
+
+def _state() -> RepoState:
+    files = [SourceFile(path=f"{ROOT}/{path}", language="", size_bytes=1) for path in IMPORTS]
+    graph = nx.DiGraph()
+    graph.add_nodes_from(source.path for source in files)
+    for path, targets in IMPORTS.items():
+        for target in targets:
+            graph.add_edge(f"{ROOT}/{path}", target, relation="imports")
+    return RepoState(
+        parsed_repo=ParsedRepository(repository_id="r1", files=files, functions=[]),
+        import_graph=graph,
+        root_path=ROOT,
+        name="r1",
+    )
+
+
+def test_analytics_resolve_imports_to_files() -> None:
+    state = _state()
+    analytics = compute_graph_analytics(state.import_graph, state.parsed_repo.files, ROOT)
+
+    assert analytics.edge_count == 9 and analytics.internal_edge_count == 6
+    assert analytics.cycles == [["app/models.py", "app/views.py"]]
+    assert analytics.layers == [
+        ["app/__init__.py", "app/models.py", "app/views.py", "shared/util.ts"],
+        ["app/main.py", "web/api.js"],
+        ["web/index.js"],
+    ]
+    assert analytics.most_imported[:2] == [("app/models.py", 2), ("app/views.py", 2)]
+    assert ("react", 1) in analytics.most_imported
+    packages = {package.package: package for package in analytics.packages}
+    assert packages["app"].internal_edges == 4 and packages["app"].external_imports == 2
+    assert packages["web"].efferent == 1 and packages["shared"].afferent == 1
+    assert packages["shared"].instability == 0.0 and packages["web"].instability == 1.0
+
+
+def test_absolute_imports_resolve_from_source_roots_only() -> None:
+    imports = {
+        "pkg/__init__.py": [],
+        "pkg/logging.py": ["logging"],
+        "pkg/service.py": ["logging", "pkg.logging", "helpers.text"],
+        "src/helpers/__init__.py": [],
+        "src/helpers/text.py": [],
+        "scripts/run.py": ["pkg.service", "service"],
+    }
+    graph = nx.DiGraph()
+    for path, targets in imports.items():
+        graph.add_node(f"{ROOT}/{path}")
+        for target in targets:
+            graph.add_edge(f"{ROOT}/{path}", target)
+    files = [SourceFile(path=f"{ROOT}/{path}", language="", size_bytes=1) for path in imports]
+
+    analytics = compute_graph_analytics(graph, files, ROOT)
+
+    imported = dict(analytics.most_imported)
+    # The stdlib module stays external even though pkg/logging.py exists
+    assert imported["logging"] == 2 and imported["pkg/logging.py"] == 1
+    assert imported["src/helpers/text.py"] == 1 and imported["pkg/service.py"] == 1
+    assert imported["service"] == 1
+    assert analytics.internal_edge_count == 3
+
+
+def test_pagerank_power_iteration() -> None:
+    graph = nx.DiGraph([("a", "hub"), ("b", "hub"), ("c", "hub"), ("hub", "a")])
+    graph.add_node("lonely")
+
+    rank = pagerank(graph)
+
+    assert sum(rank.values()) == pytest.approx(1.0)
+    assert max(rank, key=rank.get) == "hub"
+    assert rank["b"] == pytest.approx(rank["c"]) == pytest.approx(rank["lonely"])
+    assert pagerank(nx.DiGraph()) == {}
+
+
+def test_analytics_are_stored_and_served(tmp_path: Path) -> None:
+    store = RepoStateStore(base_dir=str(tmp_path))
+    store.save("r1", _state())
+    # A repo saved before analytics existed is backfilled on first read
+    with store._conn:
+        store._conn.execute("DELETE FROM graph_analytics")
+
+    reloaded = RepoStateStore(base_dir=str(tmp_path))
+    # Materializing the repo does not write; only get_analytics backfills
+    assert reloaded.get("r1").analytics is None
+    assert reloaded._read_analytics("r1") is None
+    analytics = reloaded.get_analytics("r1")
+    assert analytics is not None and analytics.cycle_count == 1
+    assert reloaded.get_analytics("r1") == analytics
+    assert reloaded.get_analytics("missing") is None
+
+    app.dependency_overrides[get_repo_state_store] = lambda: reloaded
+    try:
+        client = TestClient(app)
+        response = client.post("/dependencies/metrics", json={"repo_id": "r1", "limit": 2})
+        missing = client.post("/dependencies/metrics", json={"repo_id": "missing"})
+    finally:
+        app.dependency_overrides.pop(get_repo_state_store, None)
+
+    assert response.status_code == 200 and missing.status_code == 404
+    body = response.json()
+    assert len(body["most_imported"]) == 2
+    assert body["cycles"] == [["app/models.py", "app/views.py"]]
+    assert body["pagerank"][0]["node"] in {"app/models.py", "app/views.py"}
+    assert {package["package"] for package in body["packages"]} == {"app", "web", "shared"}
@@ -0,0 +1,84 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from codeatlas.observability.http_metrics import RequestMetricsMiddleware
+from codeatlas.observability import metrics
+from codeatlas.observability.metrics import request_latency_histogram
+from codeatlas.utils.config import load_config
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, latency_buckets=(0.1, 1.0))
+
+    @app.get("/probe-items/{item_id}")
+    def item(item_id: str) -> dict:
+        return {"item_id": item_id}
+
+    @app.get("/probe-stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(iter([b"a" * 600, b"b" * 400]))
+
+    return app
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_labelled_by_route_template() -> None:
+    client = TestClient(_app())
+    before_items = _sample(
+        "codeatlas_request_total", method="GET", path="/probe-items/{item_id}", status="200"
+    )
+    before_other = _sample("codeatlas_request_total", method="GET", path="other", status="404")
+
+    for item_id in ("a", "b", "c"):
+        assert client.get(f"/probe-items/{item_id}").status_code == 200
+    client.get("/.env")
+    client.get("/wp-login.php")
+
+    assert (
+        _sample(
+            "codeatlas_request_total", method="GET", path="/probe-items/{item_id}", status="200"
+        )
+        == before_items + 3
+    )
+    assert (
+        _sample("codeatlas_request_total", method="GET", path="other", status="404")
+        == before_other + 2
+    )
+    assert _sample("codeatlas_request_total", method="GET", path="/probe-items/a", status="200") == 0
+    assert _sample("codeatlas_requests_in_flight") == 0
+
+
+def test_streamed_response_size_counts_every_chunk() -> None:
+    client = TestClient(_app())
+    before = _sample("codeatlas_response_size_bytes_sum", path="/probe-stream")
+
+    client.get("/probe-stream")
+
+    assert _sample("codeatlas_response_size_bytes_sum", path="/probe-stream") == before + 1000
+
+
+def test_latency_buckets_come_from_config(monkeypatch) -> None:
+    monkeypatch.setenv("CODEATLAS_REQUEST_LATENCY_BUCKETS", "5, 0.5,1")
+    assert load_config().request_latency_buckets == (0.5, 1.0, 5.0)
+
+
+def test_latency_histogram_warns_on_conflicting_buckets(caplog) -> None:
+    histogram = request_latency_histogram((0.1, 1.0))
+    # Whichever app built its middleware first chose the buckets
+    buckets = metrics._request_latency_buckets
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="codeatlas.observability.metrics"):
+        assert request_latency_histogram(tuple(reversed(buckets))) is histogram
+        assert not caplog.records
+        assert request_latency_histogram((0.25, 7.5)) is histogram
+
+    assert "ignoring (0.25, 7.5)" in caplog.text
@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = [
+    "faiss",
+    "langgraph",
+    "langchain_openai",
+    "langchain_core",
+    "networkx",
+    "tree_sitter_languages",
+    "sentence_transformers",
+    "torch",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import codeatlas.app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_main() -> dict:
+    root = Path(__file__).resolve().parents[1]
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_app_import_skips_heavy_dependencies() -> None:
+    loaded = set(_import_main()["modules"])
+    assert [name for name in HEAVY_MODULES if name in loaded] == []
+
+
+def test_app_import_within_budget() -> None:
+    budget = float(os.getenv("CODEATLAS_IMPORT_BUDGET_SECONDS", "2.0"))
+    assert _import_main()["seconds"] < budget
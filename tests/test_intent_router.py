@@ -0,0 +1,87 @@
+import json
+
+from codeatlas.services.agents.intent_router import IntentRouter
+from codeatlas.services.agents.interfaces import Agent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.retrieval.embedding import EmbeddingService
+
+
+class BagOfWordsEmbedder(EmbeddingService):
+    VOCAB = ["login", "handler", "cache", "invalidation", "packages", "organized"]
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        words = text.lower().split()
+        return [float(word in words) for word in self.VOCAB]
+
+
+class CountingPlanner(Agent):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        self.calls += 1
+        return json.dumps({"steps": [{"id": 1, "agent": "mentor", "instruction": prompt}]})
+
+
+class EchoAgent(Agent):
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        return "ok"
+
+
+def test_keyword_rules_produce_plans() -> None:
+    router = IntentRouter()
+    decision = router.route("Where is the login handler defined?")
+    assert decision is not None and decision.intent == "locate"
+    assert [step["agent"] for step in decision.plan["steps"]] == ["retrieval", "mentor"]
+
+    saved = router.route("remember that tests need docker")
+    assert saved is not None
+    assert saved.plan["steps"][0]["instruction"] == "save: tests need docker"
+    noted = router.route("Note: the staging DB is read-only")
+    assert noted is not None and noted.intent == "memory_save"
+    assert noted.plan["steps"][0]["instruction"] == "save: the staging DB is read-only"
+
+
+def test_questions_are_not_saved_as_notes() -> None:
+    router = IntentRouter()
+    for question in (
+        "Save files to S3 – how?",
+        "Note: why does the indexer fail on large repos?",
+        "remember that flag we added for retries?",
+        "Noted the login handler is slow, where is it defined",
+        "save the cache to disk",
+    ):
+        decision = router.route(question)
+        assert decision is None or decision.intent != "memory_save", question
+
+
+def test_embedding_fallback_and_miss() -> None:
+    router = IntentRouter(embedder=BagOfWordsEmbedder(), min_confidence=0.8)
+    decision = router.route("packages organized how")
+    assert decision is not None
+    assert decision.intent == "architecture" and decision.source == "embedding"
+
+    assert router.route("refactor the billing flow to use events") is None
+    stats = router.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["saved_seconds"] > 0
+
+
+def test_orchestrator_skips_planner_on_router_hit() -> None:
+    planner = CountingPlanner()
+    orchestrator = AgentOrchestrator(
+        planner=planner,
+        retrieval_agent=EchoAgent(),
+        analyst_agent=EchoAgent(),
+        mentor_agent=EchoAgent(),
+        memory_agent=EchoAgent(),
+        intent_router=IntentRouter(),
+    )
+    orchestrator.handle_question("where is the config loaded?", "repo")
+    assert planner.calls == 0
+    orchestrator.handle_question("refactor the billing flow to use events", "repo")
+    assert planner.calls == 1
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage
+
+from codeatlas.services.llm.cached_chat_model import CachedChatModel
+from codeatlas.services.llm.in_memory_cache import InMemoryLlmCache
+from codeatlas.services.llm.interfaces import cache_config
+from codeatlas.services.llm.sqlite_cache import SqliteLlmCache
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+
+
+def test_cached_chat_model_serves_repeated_prompt_from_cache() -> None:
+    stub = StubChatModel()
+    model = CachedChatModel(
+        inner=stub, response_cache=InMemoryLlmCache(), model_name="stub", temperature=0.2
+    )
+    first = model.invoke([HumanMessage(content="explain foo")])
+    second = model.invoke([HumanMessage(content="explain foo")])
+    assert first.content == second.content
+    assert stub.call_count == 1
+
+    model.invoke([HumanMessage(content="explain bar")])
+    assert stub.call_count == 2
+
+
+def test_cache_key_includes_temperature() -> None:
+    stub = StubChatModel()
+    cache = InMemoryLlmCache()
+    for temperature in (0.0, 0.7):
+        CachedChatModel(
+            inner=stub, response_cache=cache, model_name="stub", temperature=temperature
+        ).invoke("same prompt")
+    assert stub.call_count == 2
+
+
+def test_in_memory_cache_lru_and_ttl() -> None:
+    cache = InMemoryLlmCache(max_entries=2)
+    cache.put("a", "ns", "A")
+    cache.put("b", "ns", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "ns", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    expiring = InMemoryLlmCache(ttl_seconds=0.01)
+    expiring.put("a", "ns", "A")
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = SqliteLlmCache(db_path, max_entries=2)
+    cache.put("a", "ns", "A")
+    cache.put("b", "ns", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "ns", "C")
+
+    reopened = SqliteLlmCache(db_path, max_entries=2)
+    assert reopened.get("a") == "A"
+    assert reopened.get("b") is None
+    assert len(reopened) == 2
+
+    # Larger caches trim a tenth of their capacity at a time
+    bulk = SqliteLlmCache(str(tmp_path / "bulk.sqlite3"), max_entries=20)
+    for index in range(50):
+        bulk.put(str(index), "ns", "x")
+    assert 18 <= len(bulk) <= 20
+    assert bulk.get("49") == "x" and bulk.get("0") is None
+
+
+def test_semantic_hit_above_threshold(tmp_path: Path) -> None:
+    stub = StubChatModel()
+    model = CachedChatModel(
+        inner=stub,
+        response_cache=SqliteLlmCache(str(tmp_path / "cache.sqlite3")),
+        model_name="stub",
+        embedder=HashEmbeddingService(),
+        similarity_threshold=0.85,
+    )
+    for question in (
+        "where is the faiss index persisted to disk",
+        "where is the faiss index persisted on disk",
+    ):
+        model.invoke(question, config=cache_config(question))
+    assert stub.call_count == 1
+
+    question = "how are repositories cloned"
+    model.invoke(question, config=cache_config(question))
+    assert stub.call_count == 2
+
+
+def test_semantic_hits_are_scoped_to_the_surrounding_prompt(tmp_path: Path) -> None:
+    stub = StubChatModel()
+    model = CachedChatModel(
+        inner=stub,
+        response_cache=SqliteLlmCache(str(tmp_path / "cache.sqlite3")),
+        model_name="stub",
+        embedder=HashEmbeddingService(),
+        similarity_threshold=0.85,
+    )
+
+    def ask(question: str, context: str) -> None:
+        model.invoke(f"Context:\n{context}\n\nQuestion: {question}", config=cache_config(question))
+
+    ask("where is the faiss index persisted to disk", "def save_index(): ...")
+    ask("where is the faiss index persisted on disk", "def save_index(): ...")
+    assert stub.call_count == 1
+    # A near-identical question over different code is not served from cache
+    ask("where is the faiss index persisted on disk", "class IndexStore: ...")
+    assert stub.call_count == 2
+    # Without a named question only exact prompts hit
+    model.invoke("where is the faiss index stored on disk")
+    assert stub.call_count == 3
+
+
+def test_async_cache_calls_run_on_the_executor() -> None:
+    threads: list[str] = []
+
+    class RecordingCache(InMemoryLlmCache):
+        def get(self, key: str) -> str | None:
+            threads.append(threading.current_thread().name)
+            return super().get(key)
+
+        def put(self, key, namespace, content, vector=None) -> None:
+            threads.append(threading.current_thread().name)
+            super().put(key, namespace, content, vector)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-test") as executor:
+        model = CachedChatModel(
+            inner=StubChatModel(),
+            response_cache=RecordingCache(),
+            model_name="stub",
+            executor=executor,
+        )
+        asyncio.run(model.ainvoke("explain foo"))
+
+    assert len(threads) == 2
+    assert all(name.startswith("cache-test") for name in threads)
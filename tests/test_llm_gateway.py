@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from codeatlas.services.llm.gateway import LlmGateway, LlmGatewayTimeout, TokenBucket
+from codeatlas.services.llm.gateway_chat_model import GatewayChatModel
+from codeatlas.services.llm.stub import StubChatModel
+
+
+def test_identical_in_flight_calls_are_coalesced() -> None:
+    gateway = LlmGateway(name="test-coalesce", max_concurrency=4)
+    calls = []
+
+    def upstream() -> str:
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: gateway.call("same", upstream), range(10)))
+
+    assert results == ["answer"] * 10
+    assert len(calls) == 1
+
+
+def test_concurrency_is_capped() -> None:
+    gateway = LlmGateway(name="test-cap", max_concurrency=2)
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def upstream() -> None:
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: gateway.call(f"k{i}", upstream), range(8)))
+
+    assert active[1] == 2
+
+
+def test_queued_call_past_deadline_is_rejected() -> None:
+    gateway = LlmGateway(name="test-deadline", max_concurrency=1, queue_timeout_seconds=0.05)
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(gateway.call, "slow", release.wait)
+        time.sleep(0.02)
+        with pytest.raises(LlmGatewayTimeout):
+            gateway.call("other", lambda: None)
+        release.set()
+
+
+def test_token_bucket_limits_rate() -> None:
+    bucket = TokenBucket(rate_per_second=20, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        assert bucket.acquire(deadline=time.monotonic() + 1)
+    assert time.monotonic() - start >= 0.18
+    assert not bucket.acquire(deadline=time.monotonic())
+
+
+def test_gateway_chat_model_coalesces_identical_prompts() -> None:
+    class SlowStub(StubChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(0.1)
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+    stub = SlowStub()
+    model = GatewayChatModel(
+        inner=stub, gateway=LlmGateway(name="test-model"), model_name="stub"
+    )
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        replies = list(pool.map(lambda _: model.invoke("popular question").content, range(5)))
+    assert len(set(replies)) == 1
+    assert stub.call_count == 1
+
+
+def test_followers_of_a_hung_leader_are_rejected_at_the_deadline() -> None:
+    gateway = LlmGateway(name="test-hung", max_concurrency=2, queue_timeout_seconds=0.05)
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(gateway.call, "same", lambda: release.wait() and "late")
+        time.sleep(0.02)
+        started = time.monotonic()
+        with pytest.raises(LlmGatewayTimeout):
+            gateway.call("same", lambda: "never called")
+        assert time.monotonic() - started < 1
+        release.set()
+        assert leader.result() == "late"
+
+
+def test_cancelled_async_waiters_do_not_leak_slots() -> None:
+    gateway = LlmGateway(name="test-cancel", max_concurrency=2, queue_timeout_seconds=5)
+
+    async def scenario() -> list[str]:
+        release = asyncio.Event()
+
+        async def hold() -> str:
+            async with gateway.aslot():
+                await release.wait()
+            return "held"
+
+        holders = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        # Saturated: these queue for a slot, then their clients go away
+        waiters = [asyncio.create_task(hold()) for _ in range(10)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hold(), timeout=0.01)
+        release.set()
+        await asyncio.gather(*holders)
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        async def quick(index: int) -> str:
+            async with gateway.aslot():
+                await asyncio.sleep(0.01)
+            return f"q{index}"
+
+        # Full capacity is back: two calls run at once, none are rejected
+        started = time.monotonic()
+        results = await asyncio.wait_for(
+            asyncio.gather(*(quick(index) for index in range(4))), timeout=1
+        )
+        assert time.monotonic() - started < 0.5
+        return results
+
+    assert asyncio.run(scenario()) == ["q0", "q1", "q2", "q3"]
+    assert gateway._slots._free == 2 and not gateway._slots._waiters
+
+
+def test_slot_released_by_a_thread_wakes_an_async_waiter() -> None:
+    gateway = LlmGateway(name="test-mixed", max_concurrency=1, queue_timeout_seconds=2)
+    release = threading.Event()
+
+    async def scenario() -> str:
+        async with gateway.aslot():
+            return "async"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        holder = pool.submit(gateway.call, "sync", release.wait)
+        time.sleep(0.02)
+        threading.Timer(0.05, release.set).start()
+        assert asyncio.run(scenario()) == "async"
+        holder.result()
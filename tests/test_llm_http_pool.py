@@ -0,0 +1,183 @@
+import asyncio
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from codeatlas.services.llm.http_pool import LlmHttpPool, RetryPolicy
+from codeatlas.services.llm.provider import LlmProvider
+from codeatlas.utils.config import AppConfig
+
+
+class _StubOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            server.client_ports.add(self.client_address[1])
+            fail = server.failures_left > 0
+            server.failures_left -= 1 if fail else 0
+        if fail:
+            self._send(429, {"error": {"message": "rate limited"}}, {"Retry-After": "0"})
+            return
+        self._send(
+            200,
+            {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "pong"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            },
+        )
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        return None
+
+
+def _start_server(failures: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOpenAIHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.client_ports = set()
+    server.failures_left = failures
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _config(base_url: str, max_connections: int) -> AppConfig:
+    return AppConfig(
+        embedding_provider="hash",
+        embedding_model="",
+        index_dir=".codeatlas/indexes",
+        state_dir=".codeatlas/state",
+        llm_provider="openai",
+        llm_model="stub-model",
+        llm_temperature=0.0,
+        api_key=None,
+        auth_enabled=False,
+        llm_cache_backend="none",
+        llm_base_url=base_url,
+        llm_max_connections=max_connections,
+        llm_max_keepalive_connections=max_connections,
+    )
+
+
+def test_provider_reuses_one_pooled_client_under_load(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    server = _start_server()
+    try:
+        provider = LlmProvider(_config(f"http://127.0.0.1:{server.server_port}/v1", 4))
+        model = provider.get_chat_model()
+        assert provider.get_chat_model() is model
+
+        # One caller per connection, as the gateway's concurrency cap keeps it in
+        # production: httpcore's sync pool can close a socket another thread is
+        # reading when more threads than connections contend for it.
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            replies = list(pool.map(lambda i: model.invoke(f"ping {i}").content, range(64)))
+
+        assert replies == ["pong"] * 64
+        assert server.requests == 64
+        # Keep-alive: 64 requests rode on at most max_connections sockets.
+        assert len(server.client_ports) <= 4
+        stats = provider.get_http_pool().stats()
+        assert stats.requests == 64
+        assert stats.in_flight == 0
+        assert 0 < stats.open_connections <= stats.max_connections == 4
+    finally:
+        server.shutdown()
+
+
+def test_pool_retries_rate_limited_requests(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    server = _start_server(failures=2)
+    try:
+        provider = LlmProvider(_config(f"http://127.0.0.1:{server.server_port}/v1", 2))
+        assert provider.get_chat_model().invoke("ping").content == "pong"
+        assert server.requests == 3
+        assert provider.get_http_pool().stats().retries == 2
+    finally:
+        server.shutdown()
+
+
+def test_retry_backoff_is_jittered_and_capped() -> None:
+    policy = RetryPolicy(base_delay=0.5, max_delay=2.0)
+    delays = [policy.delay(attempt) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= delay <= 2.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+class _HangUpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        # Read the whole request, then drop the socket without answering
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.requests += 1
+        self.close_connection = True
+
+    def log_message(self, *args) -> None:
+        return None
+
+
+def test_pool_does_not_resend_a_request_the_server_may_have_seen() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _HangUpHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    pool = LlmHttpPool(retry_policy=RetryPolicy(max_retries=3, base_delay=0.0))
+    try:
+        with pytest.raises(httpx.RemoteProtocolError):
+            pool.client.post(f"http://127.0.0.1:{server.server_port}/v1/chat", json={})
+        assert server.requests == 1
+        assert pool.stats().retries == 0
+    finally:
+        server.shutdown()
+        pool.close()
+
+
+def test_pool_retries_connect_failures_and_closes_both_clients() -> None:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    pool = LlmHttpPool(retry_policy=RetryPolicy(max_retries=2, base_delay=0.0))
+
+    with pytest.raises(httpx.ConnectError):
+        pool.client.post(f"http://127.0.0.1:{port}/v1/chat", json={})
+    assert pool.stats().retries == 2
+
+    async def attempt() -> None:
+        with pytest.raises(httpx.ConnectError):
+            await pool.async_client.post(f"http://127.0.0.1:{port}/v1/chat", json={})
+
+    asyncio.run(attempt())
+    assert pool.stats().retries == 4
+
+    pool.close()
+    assert pool.client.is_closed and pool.async_client.is_closed
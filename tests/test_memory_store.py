@@ -0,0 +1,149 @@
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from codeatlas.models.agent_memory import AgentMemory
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.memory_agent import MemoryAgent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.memory.in_memory_store import InMemoryStore
+from codeatlas.services.memory.sqlite_store import SqliteMemoryStore
+from codeatlas.services.qa.answer_service import RetrievedContext
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+
+
+class EmptyRetrieval:
+    def retrieve(self, prompt: str, repo_id: str, top_k: int = 5) -> RetrievedContext:
+        return RetrievedContext(records=[], citations=[], context="", reasoning_steps=[])
+
+
+class RecordingMentor(CodingMentorAgent):
+    def __init__(self) -> None:
+        self.notes: list[str] | None = None
+
+    def run(self, prompt, repo_id=None, retrieved=None, notes=None) -> str:
+        self.notes = notes
+        return "answer"
+
+
+def _memory(index: int, scope: str = "repo:r") -> AgentMemory:
+    return AgentMemory(
+        memory_id=f"{scope}-{index}",
+        scope=scope,
+        content=f"note {index}",
+        created_at=datetime(2024, 1, 1, 12, 0, index % 60),
+    )
+
+
+def test_recent_pages_newest_first_within_scope(tmp_path: Path) -> None:
+    store = SqliteMemoryStore(db_path=str(tmp_path / "memory.sqlite3"))
+    for index in range(25):
+        store.save(_memory(index))
+    store.save(_memory(0, scope="repo:other"))
+
+    assert store.count("repo:r") == 25
+    newest = store.recent("repo:r", limit=3)
+    assert [m.content for m in newest] == ["note 24", "note 23", "note 22"]
+    assert [m.content for m in store.recent("repo:r", limit=3, offset=23)] == ["note 1", "note 0"]
+    assert [m.content for m in store.list("repo:other")] == ["note 0"]
+
+
+def test_writers_on_separate_connections_do_not_lose_saves(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "memory.sqlite3")
+    stores = [SqliteMemoryStore(db_path=db_path) for _ in range(4)]
+
+    def write(worker: int) -> None:
+        for index in range(50):
+            stores[worker].save(_memory(worker * 1000 + index))
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SqliteMemoryStore(db_path=db_path).count("repo:r") == 200
+
+
+def test_compaction_keeps_newest_per_scope_and_legacy_json_imports(tmp_path: Path) -> None:
+    legacy = tmp_path / "agent_memory.json"
+    legacy.write_text(
+        json.dumps(
+            [
+                {
+                    "memory_id": "old",
+                    "scope": "global",
+                    "content": "from the json store",
+                    "created_at": "2023-05-01T10:00:00",
+                }
+            ]
+        ),
+        encoding="utf-8",
+    )
+    store = SqliteMemoryStore(
+        db_path=str(tmp_path / "memory.sqlite3"),
+        max_per_scope=5,
+        compact_every=10,
+        legacy_json_path=str(legacy),
+    )
+    for index in range(10):
+        store.save(_memory(index))
+
+    assert store.count("repo:r") == 5
+    assert store.recent("repo:r", limit=1)[0].content == "note 9"
+    assert store.list("global")[0].content == "from the json store"
+
+
+def test_memory_agent_lists_one_page(tmp_path: Path) -> None:
+    store = SqliteMemoryStore(db_path=str(tmp_path / "memory.sqlite3"))
+    agent = MemoryAgent(memory_store=store, page_size=2)
+    for index in range(5):
+        agent.run(f"save: tip {index}", repo_id="r")
+
+    first = agent.run("list", repo_id="r")
+    assert "tip 4" in first and "tip 3" in first and "tip 2" not in first
+    assert "list page 2" in first
+    assert "tip 0" in agent.run("list page 3", repo_id="r")
+
+
+def test_recall_returns_relevant_notes_only(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "memory.sqlite3")
+    store = SqliteMemoryStore(db_path=db_path, embedder=HashEmbeddingService())
+    notes = [
+        "the billing service retries stripe webhooks three times",
+        "frontend build uses vite and pnpm workspaces",
+        "auth tokens are refreshed by the session middleware",
+    ]
+    for index, content in enumerate(notes):
+        store.save(AgentMemory(f"m{index}", "repo:r", content, datetime(2024, 1, 1)))
+    # Saved by another worker without a vector; embedded on first recall
+    other = SqliteMemoryStore(db_path=db_path)
+    other.save(
+        AgentMemory("m3", "repo:r", "webhooks for stripe are verified", datetime(2024, 1, 2))
+    )
+
+    recalled = store.recall("repo:r", "how are stripe webhooks retried?", top_k=2)
+
+    assert {memory.memory_id for memory in recalled} == {"m0", "m3"}
+    assert store.recall("repo:other", "stripe webhooks") == []
+
+
+def test_orchestrator_passes_recalled_notes_to_mentor() -> None:
+    store = InMemoryStore()
+    store.save(AgentMemory("1", "repo:r", "payments use the ledger module", datetime(2024, 1, 1)))
+    store.save(AgentMemory("2", "repo:r", "css lives in styles folder", datetime(2024, 1, 1)))
+    mentor = RecordingMentor()
+    orchestrator = AgentOrchestrator(
+        planner=None,
+        retrieval_agent=EmptyRetrieval(),
+        analyst_agent=None,
+        mentor_agent=mentor,
+        memory_agent=None,
+        memory_store=store,
+    )
+
+    result = orchestrator.handle_question_fast("how do payments hit the ledger?", "r")
+
+    assert mentor.notes == ["payments use the ledger module"]
+    assert "Recalled 1 saved notes." in result.reasoning_steps
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.retrieval_agent import RetrievalAgent
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.services.retrieval.interfaces import CodeRetriever
+
+
+class CountingRetriever(CodeRetriever):
+    def __init__(self, records: list[EmbeddingRecord]) -> None:
+        self._records = records
+        self.searches = 0
+
+    def index(self, repo_id: str, records: list[EmbeddingRecord]) -> None:
+        return None
+
+    def search(self, repo_id: str, query_vector: list[float], top_k: int) -> list[EmbeddingRecord]:
+        self.searches += 1
+        return self._records[:top_k]
+
+
+class StubEmbedder(EmbeddingService):
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0] for _ in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0]
+
+
+def _orchestrator(tmp_path: Path) -> tuple[AgentOrchestrator, CountingRetriever, StubChatModel]:
+    source = tmp_path / "a.py"
+    source.write_text("def foo():\n    return 1\n", encoding="utf-8")
+    retriever = CountingRetriever(
+        [
+            EmbeddingRecord(
+                record_id=f"{source}:1-2",
+                scope="function",
+                vector=[1.0],
+                metadata={"path": str(source), "start_line": "1", "end_line": "2"},
+            )
+        ]
+    )
+    llm = StubChatModel()
+    answer_service = AnswerService(retriever=retriever, embedder=StubEmbedder(), llm=llm)
+    orchestrator = AgentOrchestrator(
+        planner=None,
+        retrieval_agent=RetrievalAgent(answer_service=answer_service),
+        analyst_agent=None,
+        mentor_agent=CodingMentorAgent(answer_service=answer_service, llm=llm),
+        memory_agent=None,
+    )
+    return orchestrator, retriever, llm
+
+
+def test_fast_path_makes_one_search_and_one_llm_call(tmp_path: Path) -> None:
+    orchestrator, retriever, llm = _orchestrator(tmp_path)
+    result = orchestrator.handle_question_fast("what does foo return?", "repo")
+    assert retriever.searches == 1
+    assert llm.call_count == 1
+    assert "lines 1-2" in result.citations[0]
+    assert "return 1" in result.answer
+
+
+def test_generation_reuses_retrieved_context(tmp_path: Path) -> None:
+    orchestrator, retriever, llm = _orchestrator(tmp_path)
+    result = orchestrator.handle_generation("call foo twice", "repo")
+    assert retriever.searches == 1
+    assert llm.call_count == 1
+    assert result.citations
@@ -0,0 +1,85 @@
+import json
+import threading
+import time
+
+from codeatlas.services.agents.interfaces import Agent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.plan import execution_waves, parse_plan_steps
+
+
+class PlanAgent(Agent):
+    def __init__(self, plan: dict) -> None:
+        self._plan = plan
+
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        return json.dumps(self._plan)
+
+
+class SlowAgent(Agent):
+    def __init__(self, name: str, delay: float = 0.0) -> None:
+        self.name = name
+        self.delay = delay
+        self.prompts: list[str] = []
+        self.threads: set[str] = set()
+
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        self.prompts.append(prompt)
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return f"{self.name} output"
+
+
+def test_parse_plan_defaults_to_sequential_dependencies() -> None:
+    steps = parse_plan_steps(
+        {"steps": [{"agent": "retrieval", "instruction": "a"}, {"agent": "mentor", "instruction": "b"}]}
+    )
+    assert [step.step_id for step in steps] == ["1", "2"]
+    assert steps[1].depends_on == ("1",)
+    assert len(execution_waves(steps)) == 2
+
+
+def test_forward_references_are_dropped() -> None:
+    steps = parse_plan_steps(
+        {
+            "steps": [
+                {"id": 1, "agent": "retrieval", "instruction": "a", "depends_on": [2]},
+                {"id": 2, "agent": "analyst", "instruction": "b", "depends_on": [1]},
+            ]
+        }
+    )
+    assert steps[0].depends_on == ()
+    assert [[step.step_id for step in wave] for wave in execution_waves(steps)] == [["1"], ["2"]]
+
+
+def test_independent_steps_run_concurrently() -> None:
+    plan = {
+        "steps": [
+            {"id": 1, "agent": "retrieval", "instruction": "find", "depends_on": []},
+            {"id": 2, "agent": "analyst", "instruction": "analyze", "depends_on": []},
+            {"id": 3, "agent": "mentor", "instruction": "explain", "depends_on": [1, 2]},
+        ]
+    }
+    retrieval = SlowAgent("retrieval", delay=0.3)
+    analyst = SlowAgent("analyst", delay=0.3)
+    mentor = SlowAgent("mentor")
+    orchestrator = AgentOrchestrator(
+        planner=PlanAgent(plan),
+        retrieval_agent=retrieval,
+        analyst_agent=analyst,
+        mentor_agent=mentor,
+        memory_agent=SlowAgent("memory"),
+    )
+
+    started = time.perf_counter()
+    result = orchestrator.handle_question("how does auth work?", "repo")
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.55
+    assert retrieval.threads.isdisjoint(analyst.threads)
+    # The mentor step sees both dependency outputs; its short answer skips validation
+    assert "retrieval output" in mentor.prompts[0]
+    assert "analyst output" in mentor.prompts[0]
+    assert len(mentor.prompts) == 1
+    assert any("wave 1" in step and "prompt tokens" in step for step in result.reasoning_steps)
+    assert [usage.agent for usage in result.step_tokens] == ["retrieval", "analyst", "mentor"]
+    assert any(step.startswith("Executed 3 steps in 2 waves") for step in result.reasoning_steps)
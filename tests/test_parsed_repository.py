@@ -0,0 +1,41 @@
+from codeatlas.models.function_node import FunctionNode
+from codeatlas.models.parsed_repository import ParsedRepository, ParsedRepositoryBuilder
+from codeatlas.models.source_file import SourceFile
+
+
+def test_columnar_repository_round_trips_records() -> None:
+    root = "/tmp/.codeatlas/repos/0b1c/src"
+    files = [
+        SourceFile(path=f"{root}/a.py", language="python", size_bytes=120),
+        SourceFile(path=f"{root}/b.ts", language="typescript", size_bytes=80),
+    ]
+    functions = [
+        FunctionNode("foo", f"{root}/a.py", 1, 4, "def foo(x: int) -> int:"),
+        FunctionNode("grüße", f"{root}/a.py", 6, 9, "def grüße() -> str:"),
+        FunctionNode("<anonymous>", f"{root}/b.ts", 2, 2, "() => 1"),
+    ]
+
+    parsed = ParsedRepository(repository_id="repo", files=files, functions=functions)
+
+    assert parsed.repository_id == "repo"
+    assert len(parsed.files) == 2
+    assert list(parsed.files) == files
+    assert list(parsed.functions) == functions
+    assert parsed.functions[-1] == functions[-1]
+    assert parsed.functions[1:] == functions[1:]
+    # Each path is stored once however many records point at it
+    assert parsed.paths == [f"{root}/a.py", f"{root}/b.ts"]
+
+
+def test_builder_matches_constructor() -> None:
+    builder = ParsedRepositoryBuilder("repo")
+    builder.add_file("a.py", "python", 10)
+    builder.add_function("foo", "a.py", 1, 2, "def foo():")
+
+    built = builder.build()
+
+    assert built == ParsedRepository(
+        repository_id="repo",
+        files=[SourceFile("a.py", "python", 10)],
+        functions=[FunctionNode("foo", "a.py", 1, 2, "def foo():")],
+    )
@@ -0,0 +1,101 @@
+import json
+
+from codeatlas.services.agents.interfaces import Agent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.plan_cache import PlanCache
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+
+PLAN = {"steps": [{"id": 1, "agent": "retrieval", "instruction": "find it", "depends_on": []}]}
+
+
+class CountingPlanner(Agent):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        self.calls += 1
+        return json.dumps(PLAN)
+
+
+class EchoAgent(Agent):
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        return "ok"
+
+
+def test_normalized_hits_are_counted_per_repo() -> None:
+    cache = PlanCache()
+    assert cache.put("How is auth wired?", "repo-a", PLAN)
+    assert cache.get("how is  AUTH wired", "repo-a") == PLAN
+    assert cache.get("How is auth wired?", "repo-b") is None
+    assert cache.entries()[0].hits == 1
+
+
+def test_invalid_and_fallback_plans_are_not_cached() -> None:
+    cache = PlanCache()
+    assert not cache.put("q", "r", {"steps": []})
+    assert not cache.put("q", "r", {"steps": [{"agent": "unknown", "instruction": "x"}]})
+    assert not cache.put("q", "r", {**PLAN, "fallback": True})
+    assert len(cache) == 0
+
+
+def test_lru_eviction() -> None:
+    cache = PlanCache(max_entries=2)
+    cache.put("one", "r", PLAN)
+    cache.put("two", "r", PLAN)
+    cache.get("one", "r")
+    cache.put("three", "r", PLAN)
+    assert cache.get("two", "r") is None
+    assert cache.get("one", "r") is not None
+
+
+def test_similar_question_matches() -> None:
+    cache = PlanCache(embedder=HashEmbeddingService(), similarity_threshold=0.8)
+    cache.put("how is the auth middleware wired into the app", "r", PLAN)
+    assert cache.get("how is the auth middleware wired into the application", "r") is not None
+    assert cache.get("list every database migration", "r") is None
+
+
+def test_similar_hit_is_rebound_to_the_new_question() -> None:
+    cache = PlanCache(embedder=HashEmbeddingService(), similarity_threshold=0.8)
+    old = "how is the auth middleware wired into the app"
+    new = "how is the auth middleware wired into the application"
+    cache.put(
+        old,
+        "r",
+        {
+            "steps": [
+                {"id": 1, "agent": "retrieval", "instruction": f"Search for: {old}", "depends_on": []},
+                {"id": 2, "agent": "mentor", "instruction": f"Answer '{old}'", "depends_on": [1]},
+            ]
+        },
+    )
+
+    plan = cache.get(new, "r")
+
+    assert plan is not None
+    assert [step["instruction"] for step in plan["steps"]] == [new, new]
+    assert [step["depends_on"] for step in plan["steps"]] == [[], [1]]
+    # The exact question still gets its own wording back
+    assert cache.get(old, "r")["steps"][0]["instruction"] == f"Search for: {old}"
+
+
+def test_similar_hit_never_reuses_memory_steps() -> None:
+    cache = PlanCache(embedder=HashEmbeddingService(), similarity_threshold=0.8)
+    memory_plan = {"steps": [{"id": 1, "agent": "memory", "instruction": "save: use tabs"}]}
+    cache.put("remember that the team uses tabs", "r", memory_plan)
+    assert cache.get("remember that the team uses spaces", "r") is None
+
+
+def test_orchestrator_reuses_cached_plan() -> None:
+    planner = CountingPlanner()
+    orchestrator = AgentOrchestrator(
+        planner=planner,
+        retrieval_agent=EchoAgent(),
+        analyst_agent=EchoAgent(),
+        mentor_agent=EchoAgent(),
+        memory_agent=EchoAgent(),
+        plan_cache=PlanCache(),
+    )
+    orchestrator.handle_question("Refactor billing to use events", "repo")
+    orchestrator.handle_question("refactor billing to use events!", "repo")
+    assert planner.calls == 1
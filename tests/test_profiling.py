@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from dataclasses import replace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from codeatlas.app.di import get_config
+from codeatlas.app import main
+from codeatlas.observability.profiling import (
+    MemoryProfiler,
+    RequestProfiler,
+    RequestProfilerMiddleware,
+    RequestProfileStore,
+    SamplingProfiler,
+)
+from codeatlas.utils.config import load_config
+
+
+def _spin_until(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _admin_app(monkeypatch, admin_api_key: str | None) -> FastAPI:
+    config = replace(load_config(), admin_api_key=admin_api_key)
+    monkeypatch.setattr(main, "get_config", lambda: config)
+    admin_app = main.create_app()
+    admin_app.dependency_overrides[get_config] = lambda: config
+    return admin_app
+
+
+def test_admin_routes_are_hidden_without_an_admin_key(monkeypatch) -> None:
+    client = TestClient(_admin_app(monkeypatch, None))
+    assert client.get("/admin/profile/requests").status_code == 404
+
+    client = TestClient(_admin_app(monkeypatch, "s3cret"))
+    assert client.get("/admin/profile/requests").status_code == 403
+    # Non-ASCII header values must be rejected, not crash compare_digest
+    for wrong in ("wrong", "s3crét"):
+        response = client.get("/admin/profile/requests", headers={"X-Admin-Key": wrong.encode()})
+        assert response.status_code == 403
+    response = client.get("/admin/profile/requests", headers={"X-Admin-Key": "s3cret"})
+    assert response.status_code == 200
+
+
+def test_sampling_profiler_collapses_stacks_of_busy_threads() -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin_until, args=(stop,), name="busy worker")
+    worker.start()
+    try:
+        stacks = SamplingProfiler(interval_seconds=0.001).sample(0.2)
+    finally:
+        stop.set()
+        worker.join()
+
+    busy = [stack for stack in stacks if "_spin_until" in stack]
+    assert busy and all(stack.startswith("busy_worker;") for stack in busy)
+
+
+def test_profiled_slow_request_keeps_a_cprofile_summary() -> None:
+    profiler = RequestProfiler(RequestProfileStore(), slow_ms=10)
+    probe = FastAPI()
+    probe.add_middleware(RequestProfilerMiddleware, profiler=profiler, admin_key="s3cret")
+
+    @probe.get("/slow")
+    async def slow() -> dict:
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    @probe.get("/fast")
+    async def fast() -> dict:
+        return {"ok": True}
+
+    client = TestClient(probe)
+    headers = {"X-Codeatlas-Profile": "1", "X-Admin-Key": "s3cret"}
+
+    assert "x-codeatlas-profile-id" not in client.get("/slow").headers
+    assert "x-codeatlas-profile-id" not in client.get("/fast", headers=headers).headers
+    forged = {**headers, "X-Admin-Key": "s3crét".encode()}
+    assert "x-codeatlas-profile-id" not in client.get("/slow", headers=forged).headers
+    profile_id = client.get("/slow", headers=headers).headers["x-codeatlas-profile-id"]
+
+    profile = profiler.store.get(profile_id)
+    assert profile.path == "/slow" and profile.elapsed_ms >= 50
+    assert "cumulative" in profile.summary and "slow" in profile.summary
+
+
+def test_memory_snapshot_reports_growth_between_snapshots() -> None:
+    profiler = MemoryProfiler()
+    profiler.start(frames=5)
+    try:
+        profiler.snapshot()
+        retained = [bytearray(10_000) for _ in range(100)]
+        report = profiler.snapshot(match="test_profiling")
+    finally:
+        profiler.stop()
+
+    assert retained
+    assert report["growth_since_last"][0]["size_diff_bytes"] >= 1_000_000
+    assert all(
+        any("test_profiling" in line for line in stat["traceback"]) for stat in report["top"]
+    )
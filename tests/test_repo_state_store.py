@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import networkx as nx
@@ -33,3 +34,47 @@ def test_repo_state_persist_and_load(tmp_path: Path) -> None:
     assert len(state.parsed_repo.files) == 1
     assert len(state.parsed_repo.functions) == 1
     assert state.import_graph.number_of_edges() == 1
+
+
+def test_repo_state_queries_and_legacy_json_import(tmp_path: Path) -> None:
+    legacy = {
+        "repo_id": "old-repo",
+        "root_path": "/src/old",
+        "name": "old",
+        "url": "",
+        "files": [
+            {"path": "a.py", "language": "python", "size_bytes": 10},
+            {"path": "b.py", "language": "python", "size_bytes": 5},
+            {"path": "c.js", "language": "javascript", "size_bytes": 7},
+        ],
+        "functions": [
+            {
+                "name": "foo",
+                "file_path": "a.py",
+                "start_line": 1,
+                "end_line": 2,
+                "signature": "def foo():",
+            }
+        ],
+        "edges": [
+            {"source": "a.py", "target": "b.py", "relation": "imports"},
+            {"source": "c.js", "target": "b.py", "relation": "imports"},
+            {"source": "a.py", "target": "os", "relation": "imports"},
+        ],
+    }
+    (tmp_path / "old-repo.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    store = RepoStateStore(base_dir=str(tmp_path))
+
+    overview = store.overview("old-repo")
+    assert overview is not None
+    assert (overview.file_count, overview.function_count, overview.dependency_edges) == (3, 1, 3)
+    assert overview.language_counts == {"python": 2, "javascript": 1}
+    assert store.neighbors("old-repo", "b.py", "inbound") == ["a.py", "c.js"]
+    assert store.neighbors("old-repo", "a.py", "outbound") == ["b.py", "os"]
+    assert store.has_node("old-repo", "os")
+    assert not store.has_node("old-repo", "missing.py")
+    assert store.most_imported("old-repo", limit=1) == [("b.py", 2)]
+    assert store.find_functions("old-repo", "foo")[0].file_path == "a.py"
+    assert store.get_info("old-repo").root_path == "/src/old"
+    assert store.overview("unknown") is None
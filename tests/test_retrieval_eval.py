@@ -0,0 +1,94 @@
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.services.eval.retrieval_eval import (
+    EvalCase,
+    RetrievalConfig,
+    evaluate_configs,
+    hybrid_search,
+    load_eval_cases,
+)
+from codeatlas.services.retrieval.faiss_retriever import FaissCodeRetriever
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+from codeatlas.services.retrieval.lexical import BM25Index, tokenize
+
+
+def _record(record_id: str, vector: list[float] | None = None) -> EmbeddingRecord:
+    return EmbeddingRecord(record_id=record_id, scope="file", vector=vector or [], metadata={})
+
+
+def _fixed(*record_ids: str):
+    def search(question: str, vector: list[float], top_k: int) -> list[EmbeddingRecord]:
+        return [_record(record_id) for record_id in record_ids[:top_k]]
+
+    return search
+
+
+def test_metrics_over_several_k_with_relative_ids() -> None:
+    cases = [
+        EvalCase(query="q1", relevant=("src/a.py",)),
+        EvalCase(query="q2", relevant=("src/b.py", "src/c.py")),
+    ]
+    config = RetrievalConfig(
+        name="fixed", search=_fixed("/clone/src/x.py", "/clone/src/a.py", "/clone/src/b.py")
+    )
+
+    report = evaluate_configs(cases, HashEmbeddingService(), [config], ks=(1, 3), batch_size=1)
+
+    result = report.configs[0]
+    assert result.recall == {1: 0.0, 3: pytest.approx(0.75)}
+    assert result.mrr == pytest.approx((1 / 2 + 1 / 3) / 2, abs=1e-4)
+    ndcg_q1 = 1 / math.log2(3)
+    ndcg_q2 = (1 / math.log2(4)) / (1 + 1 / math.log2(3))
+    assert result.ndcg[3] == pytest.approx((ndcg_q1 + ndcg_q2) / 2, abs=1e-4)
+    assert set(result.latency_ms) == {"p50", "p95", "p99", "mean"}
+
+
+def test_load_eval_cases_accepts_both_forms(tmp_path: Path) -> None:
+    path = tmp_path / "queries.jsonl"
+    path.write_text(
+        json.dumps({"query": "a", "relevant": ["x.py", "y.py"]})
+        + "\n\n"
+        + json.dumps({"query": "b", "expected_record_id": "z.py:1-3"})
+        + "\n"
+    )
+    assert load_eval_cases(path) == [
+        EvalCase(query="a", relevant=("x.py", "y.py")),
+        EvalCase(query="b", relevant=("z.py:1-3",)),
+    ]
+
+    path.write_text(json.dumps({"query": "c"}) + "\n")
+    with pytest.raises(ValueError, match="queries.jsonl:1"):
+        load_eval_cases(path)
+
+
+def test_hybrid_search_surfaces_keyword_matches_missed_by_dense() -> None:
+    records = [_record("load.py"), _record("render.py"), _record("cache.py")]
+    lexical = BM25Index()
+    lexical.index(
+        records,
+        ["def loadConfig(): pass", "def render_page(): pass", "def cache_token(): pass"],
+    )
+    search = hybrid_search(_fixed("render.py", "cache.py"), lexical)
+
+    assert "config" in tokenize("loadConfig") and "token" in tokenize("cache_token")
+    assert lexical.search("load the config", 1)[0].record_id == "load.py"
+    assert "load.py" in [record.record_id for record in search("load config", [], 3)]
+
+
+def test_hnsw_index_persists_and_finds_nearest(tmp_path: Path) -> None:
+    records = [
+        _record(f"r{i}.py", [1.0 if j == i else 0.0 for j in range(8)]) for i in range(8)
+    ]
+    FaissCodeRetriever(base_dir=str(tmp_path), index_type="hnsw").index("repo", records)
+
+    reloaded = FaissCodeRetriever(base_dir=str(tmp_path), index_type="hnsw", hnsw_ef_search=16)
+    results = reloaded.search("repo", [0.0, 0.0, 1.0, 0.1, 0.0, 0.0, 0.0, 0.0], top_k=2)
+
+    assert [record.record_id for record in results] == ["r2.py", "r3.py"]
+    with pytest.raises(ValueError, match="index type"):
+        FaissCodeRetriever(index_type="ivf")
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from codeatlas.observability.sketch import DDSketch
+from codeatlas.observability.tracker import SessionTracker
+
+
+@pytest.fixture
+def tracker():
+    tracker = SessionTracker()
+    tracker.reset()
+    yield tracker
+    tracker.reset()
+
+
+def test_sketch_quantiles_stay_within_relative_accuracy() -> None:
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 1.2) for _ in range(20_000)]
+    sketch = DDSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.02 * exact
+    assert sketch.count == len(values)
+
+
+def test_sketch_merge_matches_single_sketch() -> None:
+    left, right, combined = DDSketch(), DDSketch(), DDSketch()
+    for value in range(1, 1001):
+        (left if value % 2 else right).add(float(value))
+        combined.add(float(value))
+    left.merge(right)
+
+    assert left.count == combined.count
+    assert left.quantile(0.95) == combined.quantile(0.95)
+
+
+def test_stats_keep_dashboard_keys_and_bound_recent_history(tracker) -> None:
+    for index in range(500):
+        tracker.record_query(f"q{index}", "r", 100.0 + index, 2, ["retrieval", "mentor"])
+
+    stats = tracker.get_stats()
+
+    assert stats["total_queries"] == 500
+    assert stats["avg_citations"] == 2
+    assert stats["avg_latency_ms"] == pytest.approx(349.5, abs=0.1)
+    assert stats["p50_latency_ms"] <= stats["p95_latency_ms"] <= stats["p99_latency_ms"]
+    assert stats["p95_latency_ms"] == pytest.approx(574, rel=0.02)
+    assert stats["agent_usage"]["mentor"]["invocations"] == 500
+    assert stats["agent_usage"]["mentor"]["avg_time_ms"] == pytest.approx(174.75, abs=0.1)
+    assert [r["question"] for r in stats["recent_queries"]][-1] == "q499"
+    assert len(stats["recent_queries"]) == 20
+    assert len(tracker._recent) == 100
+
+
+def test_windows_only_count_recent_queries(tracker) -> None:
+    now = 1_700_000_000.0
+    tracker.record_query("old", None, 900.0, 1, [], timestamp=now - 2 * 3600)
+    tracker.record_query("hour", None, 500.0, 1, [], timestamp=now - 30 * 60)
+    tracker.record_query("fresh", None, 100.0, 3, [], timestamp=now - 60)
+
+    windows = tracker.get_stats(now=now)["windows"]
+
+    assert windows["5m"]["queries"] == 1
+    assert windows["5m"]["avg_citations"] == 3
+    assert windows["1h"]["queries"] == 2
+    assert windows["24h"]["queries"] == 3
+    assert tracker.get_stats(now=now + 2 * 86400)["windows"]["24h"]["queries"] == 0
@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.interfaces import Agent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.retrieval_agent import RetrievalAgent
+from codeatlas.services.agents.step_context import (
+    StepContextManager,
+    StepRecord,
+    count_tokens,
+    truncate_to_tokens,
+)
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.services.retrieval.interfaces import CodeRetriever
+
+
+class CountingRetriever(CodeRetriever):
+    def __init__(self, records: list[EmbeddingRecord]) -> None:
+        self._records = records
+        self.searches = 0
+
+    def index(self, repo_id: str, records: list[EmbeddingRecord]) -> None:
+        return None
+
+    def search(self, repo_id: str, query_vector: list[float], top_k: int) -> list[EmbeddingRecord]:
+        self.searches += 1
+        return self._records[:top_k]
+
+
+class StubEmbedder(EmbeddingService):
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0] for _ in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0]
+
+
+class PlanAgent(Agent):
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        return json.dumps(
+            {
+                "steps": [
+                    {"id": 1, "agent": "retrieval", "instruction": prompt, "depends_on": []},
+                    {"id": 2, "agent": "mentor", "instruction": prompt, "depends_on": [1]},
+                ]
+            }
+        )
+
+
+def test_truncate_keeps_leading_lines() -> None:
+    text = "\n".join(f"line number {i}" for i in range(100))
+    truncated = truncate_to_tokens(text, 30)
+    assert truncated.startswith("line number 0")
+    assert "more tokens truncated" in truncated
+    assert count_tokens(truncated) < 45
+
+
+def test_render_respects_budget_and_dedupes_citations() -> None:
+    manager = StepContextManager(token_budget=120)
+    manager.add(StepRecord("1", "analyst", "short note", citations=["a.py"]))
+    manager.add(StepRecord("2", "memory", "word " * 500, citations=["a.py", "b.py"]))
+    rendered = manager.render(["1", "2"])
+    assert "Step 1 (analyst): short note" in rendered
+    assert rendered.count("- a.py") == 1
+    assert count_tokens(rendered) < 160
+
+
+def test_retrieval_hands_structured_context_to_mentor(tmp_path: Path) -> None:
+    source = tmp_path / "a.py"
+    source.write_text("def foo():\n    return 1\n", encoding="utf-8")
+    retriever = CountingRetriever(
+        [
+            EmbeddingRecord(
+                record_id=f"{source}:1-2",
+                scope="function",
+                vector=[1.0],
+                metadata={"path": str(source), "start_line": "1", "end_line": "2"},
+            )
+        ]
+    )
+    llm = StubChatModel()
+    answer_service = AnswerService(retriever=retriever, embedder=StubEmbedder(), llm=llm)
+    orchestrator = AgentOrchestrator(
+        planner=PlanAgent(),
+        retrieval_agent=RetrievalAgent(answer_service=answer_service),
+        analyst_agent=None,
+        mentor_agent=CodingMentorAgent(answer_service=answer_service, llm=llm),
+        memory_agent=None,
+    )
+    result = orchestrator.handle_question("what does foo return?", "repo")
+    # One search and one LLM call: no retrieval answer, no second search by the mentor
+    assert retriever.searches == 1
+    assert llm.call_count == 1
+    assert result.citations and "lines 1-2" in result.citations[0]
+    assert result.step_tokens[0].agent == "retrieval"
+    assert result.step_tokens[1].prompt_tokens > 0
@@ -0,0 +1,66 @@
+import asyncio
+import statistics
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from codeatlas.services.llm.stub import StubChatModel, StubLlmError
+from codeatlas.services.retrieval.hash_embedder import HashEmbeddingService
+from codeatlas.services.retrieval.stub_embedder import StubEmbeddingService
+
+
+def test_latency_distributions_keep_the_configured_mean() -> None:
+    for distribution in ("uniform", "exponential", "lognormal"):
+        llm = StubChatModel(latency_seconds=0.2, latency_distribution=distribution, seed=7)
+        draws = [llm._round_trip_seconds() for _ in range(5000)]
+        assert statistics.mean(draws) == pytest.approx(0.2, rel=0.1)
+        assert len(set(draws)) > 1
+
+    with pytest.raises(ValueError, match="latency distribution"):
+        StubChatModel(latency_seconds=0.1, latency_distribution="gamma").invoke("hi")
+
+
+def test_failure_injection_is_seeded_and_counts_the_call() -> None:
+    outcomes = []
+    for seed in (1, 1):
+        llm = StubChatModel(failure_rate=0.5, seed=seed)
+        run = []
+        for _ in range(20):
+            try:
+                llm.invoke("hi")
+                run.append(True)
+            except StubLlmError:
+                run.append(False)
+        assert llm.call_count == 20
+        outcomes.append(run)
+
+    assert outcomes[0] == outcomes[1]
+    assert 0 < outcomes[0].count(False) < 20
+
+
+def test_streaming_spaces_tokens_and_pads_to_response_length() -> None:
+    llm = StubChatModel(responses=["alpha beta"], response_tokens=5, token_latency_seconds=0.02)
+
+    async def collect() -> list[tuple[float, str]]:
+        started = time.perf_counter()
+        return [
+            (time.perf_counter() - started, chunk.content)
+            async for chunk in llm.astream([HumanMessage(content="q")])
+        ]
+
+    chunks = asyncio.run(collect())
+
+    assert "".join(content for _, content in chunks) == "alpha beta alpha beta alpha"
+    assert chunks[0][0] < 0.015 and chunks[-1][0] >= 0.08
+
+
+def test_stub_embedder_matches_hash_vectors_and_charges_per_text() -> None:
+    embedder = StubEmbeddingService(latency_seconds=0.01, seconds_per_text=0.005)
+
+    started = time.perf_counter()
+    vectors = embedder.embed_texts(["a b", "c d", "e f", "g h"])
+    elapsed = time.perf_counter() - started
+
+    assert vectors == HashEmbeddingService().embed_texts(["a b", "c d", "e f", "g h"])
+    assert elapsed >= 0.03
@@ -0,0 +1,127 @@
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from codeatlas.app.di import get_agent_orchestrator
+from codeatlas.app.main import app
+from codeatlas.models.embedding_record import EmbeddingRecord
+from codeatlas.observability.tracing import FileSpanExporter, InMemorySpanExporter, tracer
+from codeatlas.observability.tracker import tracker
+from codeatlas.services.agents.coding_mentor_agent import CodingMentorAgent
+from codeatlas.services.agents.intent_router import IntentRouter
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.retrieval_agent import RetrievalAgent
+from codeatlas.services.llm.stub import StubChatModel
+from codeatlas.services.qa.answer_service import AnswerService
+from codeatlas.services.retrieval.embedding import EmbeddingService
+from codeatlas.services.retrieval.interfaces import CodeRetriever
+
+
+class OneRecordRetriever(CodeRetriever):
+    def __init__(self, file_path: Path) -> None:
+        self._file_path = file_path
+
+    def index(self, repo_id, records) -> None:
+        return None
+
+    def search(self, repo_id, query_vector, top_k):
+        return [
+            EmbeddingRecord(
+                record_id=f"{self._file_path}:1-2",
+                scope="function",
+                vector=[1.0],
+                metadata={"path": str(self._file_path), "start_line": "1", "end_line": "2"},
+            )
+        ]
+
+
+class StubEmbedder(EmbeddingService):
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0] for _ in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0]
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    previous = tracer.set_exporter(exporter)
+    yield exporter
+    tracer.set_exporter(previous)
+
+
+def _orchestrator(tmp_path: Path) -> AgentOrchestrator:
+    source = tmp_path / "a.py"
+    source.write_text("def foo():\n    return 1\n", encoding="utf-8")
+    llm = StubChatModel(latency_seconds=0.05)
+    answer_service = AnswerService(
+        retriever=OneRecordRetriever(source), embedder=StubEmbedder(), llm=llm
+    )
+    return AgentOrchestrator(
+        planner=None,
+        retrieval_agent=RetrievalAgent(answer_service=answer_service),
+        analyst_agent=None,
+        mentor_agent=CodingMentorAgent(answer_service=answer_service, llm=llm),
+        memory_agent=None,
+        intent_router=IntentRouter(),
+    )
+
+
+def test_spans_nest_and_report_errors(exporter, tmp_path: Path) -> None:
+    file_exporter = FileSpanExporter(str(tmp_path / "spans.jsonl"))
+    tracer.set_exporter(file_exporter)
+    with tracer.span("ask") as root:
+        with tracer.span("agent.retrieval", agent="retrieval"):
+            pass
+        with pytest.raises(RuntimeError):
+            with tracer.span("agent.mentor", agent="mentor"):
+                raise RuntimeError("boom")
+    file_exporter.shutdown()
+
+    lines = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["agent.retrieval", "agent.mentor", "ask"]
+    assert {line["trace_id"] for line in lines} == {root.trace_id}
+    assert lines[0]["parent_id"] == root.span_id and lines[2]["parent_id"] is None
+    assert lines[1]["status"] == "error" and "boom" in lines[1]["error"]
+    assert set(root.totals_by("agent")) == {"retrieval", "mentor"}
+
+
+def test_orchestrator_spans_nest_under_graph_nodes(exporter, tmp_path: Path) -> None:
+    orchestrator = _orchestrator(tmp_path)
+
+    with tracer.span("ask"):
+        orchestrator.handle_question("Where is foo defined?", "r")
+
+    spans = {span.name: span for span in exporter.finished_spans()}
+    assert {"node.planner", "node.executor", "node.validator"} <= set(spans)
+    assert spans["node.executor"].parent_id == spans["ask"].span_id
+    retrieval = spans["agent.retrieval"]
+    assert retrieval.parent_id == spans["node.executor"].span_id
+    # Embedding and search ran under the retrieval agent, each in its own span
+    assert spans["embed.query"].parent_id == retrieval.span_id
+    assert spans["faiss.search"].parent_id == retrieval.span_id
+    assert spans["agent.mentor"].duration_ms >= 50
+
+
+def test_ask_records_measured_agent_times(exporter, tmp_path: Path) -> None:
+    orchestrator = _orchestrator(tmp_path)
+    tracker.reset()
+    app.dependency_overrides[get_agent_orchestrator] = lambda: orchestrator
+    try:
+        response = TestClient(app).post(
+            "/ask", json={"repo_id": "r", "question": "Where is foo defined?"}
+        )
+    finally:
+        app.dependency_overrides.pop(get_agent_orchestrator, None)
+
+    assert response.status_code == 200
+    usage = tracker.get_stats()["agent_usage"]
+    tracker.reset()
+    # The intent router planned the question, so no planner time was spent
+    assert "planner" not in usage
+    assert usage["mentor"]["avg_time_ms"] >= 50
+    assert usage["retrieval"]["avg_time_ms"] < usage["mentor"]["avg_time_ms"]
+    assert exporter.finished_spans("ask")
@@ -0,0 +1,96 @@
+import json
+
+from codeatlas.services.agents.interfaces import Agent
+from codeatlas.services.agents.orchestration import AgentOrchestrator
+from codeatlas.services.agents.validation import (
+    ValidationPolicy,
+    assess_answer,
+    citation_coverage,
+)
+from codeatlas.utils.tokens import count_tokens
+
+CITATIONS = ["src/auth.py (lines 1-9) | def login(user): ..."]
+
+
+class PlanAgent(Agent):
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        return json.dumps({"steps": [{"id": 1, "agent": "mentor", "instruction": prompt}]})
+
+
+class FixedAgent(Agent):
+    def __init__(self, answer: str) -> None:
+        self.answer = answer
+        self.calls = 0
+
+    def run(self, prompt: str, repo_id: str | None = None) -> str:
+        self.calls += 1
+        return self.answer
+
+
+def test_citation_coverage_matches_file_or_symbol() -> None:
+    assert citation_coverage("See auth.py for details", CITATIONS) == 1.0
+    assert citation_coverage("Call login() first", CITATIONS) == 1.0
+    assert citation_coverage("Unrelated text", CITATIONS) == 0.0
+    assert citation_coverage("Anything", []) == 1.0
+
+
+def test_auto_policy_decisions() -> None:
+    policy = ValidationPolicy(min_answer_chars=50)
+    assert assess_answer(policy, "Short.", CITATIONS).reason == "short"
+    long_uncited = "This answer talks at length about something else entirely. " * 2
+    assert assess_answer(policy, long_uncited, CITATIONS).review
+    long_cited = long_uncited + "The login function does it."
+    assert not assess_answer(policy, long_cited, CITATIONS).review
+    assert assess_answer(policy, "Error executing mentor: boom", []).review
+    assert assess_answer(ValidationPolicy(mode="always"), "Short.", []).review
+
+
+def test_orchestrator_reports_skipped_validation() -> None:
+    mentor = FixedAgent("It returns 1.")
+    orchestrator = AgentOrchestrator(
+        planner=PlanAgent(),
+        retrieval_agent=FixedAgent(""),
+        analyst_agent=FixedAgent(""),
+        mentor_agent=mentor,
+        memory_agent=FixedAgent(""),
+    )
+    result = orchestrator.handle_question("what does foo return?", "repo")
+    assert mentor.calls == 1
+    assert result.answer == "It returns 1."
+    assert any(step.startswith("Validation: skipped") for step in result.reasoning_steps)
+    stats = orchestrator.validation_stats()
+    assert stats["skipped"] == 1 and stats["skip_rate"] == 1.0
+    assert stats["saved_seconds"] > 0
+
+
+def test_reviewer_gets_an_oversized_answer_trimmed_to_the_budget() -> None:
+    long_answer = "\n".join(f"Line {index}: the login flow checks the session." for index in range(200))
+
+    class ReviewingMentor(FixedAgent):
+        def __init__(self) -> None:
+            super().__init__(long_answer)
+            self.prompts: list[str] = []
+
+        def run(self, prompt: str, repo_id: str | None = None) -> str:
+            self.prompts.append(prompt)
+            return long_answer if len(self.prompts) == 1 else "Reviewed head."
+
+    mentor = ReviewingMentor()
+    orchestrator = AgentOrchestrator(
+        planner=PlanAgent(),
+        retrieval_agent=FixedAgent(""),
+        analyst_agent=FixedAgent(""),
+        mentor_agent=mentor,
+        memory_agent=FixedAgent(""),
+        validation_policy=ValidationPolicy(mode="always", token_budget=200),
+    )
+
+    result = orchestrator.handle_question("how does login work? " * 100, "repo")
+
+    review_prompt = mentor.prompts[-1]
+    assert count_tokens(review_prompt) < count_tokens(long_answer) // 5
+    assert "Line 0:" in review_prompt and "Line 199:" not in review_prompt
+    assert "[... " in review_prompt  # the question was cut too
+    # The unreviewed tail of the answer is kept as is
+    assert result.answer.startswith("Reviewed head.\nLine ")
+    assert result.answer.endswith("Line 199: the login flow checks the session.")